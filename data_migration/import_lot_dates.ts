@@ -1,4 +1,5 @@
 // LOT 제조일 CSV 데이터 임포트 스크립트
+// ※ 사용 중단: scripts/create_lot_csv.py가 cm_lot_manufacturing_dates.csv를 만들고 load_supabase.py가 적재
 // 사용법: npx ts-node data_migration/import_lot_dates.ts
 
 import { createClient } from '@supabase/supabase-js'
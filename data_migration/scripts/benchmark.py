@@ -0,0 +1,198 @@
+"""
+마이그레이션 단계별 벤치마크 (합성 데이터, 배수별)
+
+- 배수마다 작업 디렉토리에 synth_data로 원본 생성 + scripts 복사
+  (각 스크립트는 BASE_DIR = scripts의 상위 폴더 기준이므로 복사본이 합성 데이터를 읽음)
+- 단계마다 새 프로세스에서 실행 → 소요 시간, 입력 행/초, 최대 메모리(RSS, 그 프로세스 자신의 VmHWM) 측정
+- --baseline 결과와 비교해서 처리량이 --tolerance 이상 떨어진 단계가 있으면 exit 1
+
+사용법:
+  python scripts/benchmark.py --scales 1 10 100
+  python scripts/benchmark.py --scales 10 --output bench.json
+  python scripts/benchmark.py --scales 10 --baseline bench.json
+"""
+import argparse
+import csv
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import NamedTuple
+
+from run_all import STAGES
+from schema import MIGRATIONS_DIR
+from synth_data import SynthData
+
+SCRIPTS_DIR = Path(__file__).parent
+
+
+class BenchStage(NamedTuple):
+    name: str
+    module: str
+    func: str
+    inputs: tuple
+
+
+# run_all 단계
+BENCH_STAGES = [BenchStage(s.name, s.module, s.func, s.inputs) for s in STAGES]
+
+# 워커 프로세스: 단계 함수를 run_report.instrument로 계측한 통계를 결과 파일에 기록
+RUNNER = """
+import importlib, json, sys
+from run_report import instrument
+name, module, func, result_file = sys.argv[1:5]
+with instrument(name) as stats:
+    getattr(importlib.import_module(module), func)()
+with open(result_file, "w") as f:
+    json.dump(stats.as_dict(), f)
+"""
+
+
+def count_records(path: Path) -> int:
+    """CSV 레코드 수 (헤더 제외, 따옴표 안 줄바꿈은 한 레코드)"""
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        return max(0, sum(1 for _ in csv.reader(f)) - 1)
+
+
+def prepare_workspace(work_dir: Path, scale: float, seed: int) -> dict:
+    """합성 원본 + scripts 복사본 준비, {입력 파일: 레코드 수} 반환"""
+    if work_dir.exists():
+        shutil.rmtree(work_dir)
+    shutil.copytree(SCRIPTS_DIR, work_dir / "scripts",
+                    ignore=shutil.ignore_patterns("__pycache__", "_archive"))
+    # schema.py가 읽는 ../supabase/migrations (저장소와 같은 상대 위치)
+    shutil.copytree(MIGRATIONS_DIR, work_dir.parent / "supabase" / "migrations",
+                    ignore=shutil.ignore_patterns("_archive"), dirs_exist_ok=True)
+    (work_dir / "supabase_ready").mkdir(parents=True)
+
+    SynthData(scale, seed).write_all(work_dir)
+    return {name: count_records(work_dir / name) for name in
+            {i for stage in BENCH_STAGES for i in stage.inputs if "/" not in i}}
+
+
+def run_stage(work_dir: Path, stage: BenchStage) -> dict:
+    """단계 하나를 새 프로세스에서 실행"""
+    result_file = work_dir / f".bench_{stage.name}.json"
+    proc = subprocess.run(
+        [sys.executable, "-c", RUNNER, stage.name, stage.module, stage.func, str(result_file)],
+        cwd=work_dir / "scripts", stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{stage.name} failed:\n{proc.stderr}")
+    return json.loads(result_file.read_text())
+
+
+def benchmark(scales: list, stages: list = BENCH_STAGES, seed: int = 42,
+              work_root: Path = None, repeat: int = 1) -> list:
+    """배수 × 단계별 측정 결과 목록 (repeat > 1 이면 가장 빠른 회차)"""
+    results = []
+    with tempfile.TemporaryDirectory(prefix="migration_bench_") as tmp:
+        root = work_root or Path(tmp)
+        for scale in scales:
+            work_dir = root / f"scale_{scale:g}"
+            input_rows = prepare_workspace(work_dir, scale, seed)
+            print(f"\n--- scale {scale:g} ({', '.join(f'{k}: {v}' for k, v in sorted(input_rows.items()))}) ---")
+
+            for stage in stages:
+                runs = [run_stage(work_dir, stage) for _ in range(repeat)]
+                best = min(runs, key=lambda r: r["seconds"])
+                # 다른 단계 출력(supabase_ready/...)을 읽는 단계는 실제 읽은 행 수 사용
+                if all(i in input_rows for i in stage.inputs):
+                    rows = sum(input_rows[i] for i in stage.inputs)
+                else:
+                    rows = best["rows_in"]
+                input_bytes = sum((work_dir / i).stat().st_size for i in stage.inputs)
+                result = {
+                    "scale": scale,
+                    "stage": stage.name,
+                    "rows": rows,
+                    "seconds": best["seconds"],
+                    "rows_per_sec": rows / best["seconds"] if best["seconds"] > 0 else 0,
+                    "mb_per_sec": input_bytes / 1e6 / best["seconds"] if best["seconds"] > 0 else 0,
+                    "max_rss_mb": max(r["max_rss_mb"] or 0 for r in runs),
+                    "dropped": best["dropped"],
+                }
+                results.append(result)
+                print(f"  {stage.name:<42} {rows:>9} rows  {result['seconds']:7.2f}s  "
+                      f"{result['rows_per_sec']:>10,.0f} rows/sec  {result['max_rss_mb']:7.1f} MB")
+    return results
+
+
+def compare(results: list, baseline: list, tolerance: float) -> list:
+    """기준 대비 처리량 저하 / 메모리 증가 항목 목록"""
+    base = {(r["scale"], r["stage"]): r for r in baseline}
+    regressions = []
+    for r in results:
+        b = base.get((r["scale"], r["stage"]))
+        if b is None:
+            continue
+        if r["rows_per_sec"] < b["rows_per_sec"] * (1 - tolerance):
+            regressions.append(f"{r['stage']} @ {r['scale']:g}x: "
+                               f"{b['rows_per_sec']:,.0f} → {r['rows_per_sec']:,.0f} rows/sec")
+        if r["max_rss_mb"] > b["max_rss_mb"] * (1 + tolerance):
+            regressions.append(f"{r['stage']} @ {r['scale']:g}x: "
+                               f"{b['max_rss_mb']:.1f} → {r['max_rss_mb']:.1f} MB")
+    return regressions
+
+
+def print_scaling(results: list):
+    """가장 작은 배수 대비 행당 처리 시간 비율 (1.0 ≈ 선형)"""
+    scales = sorted({r["scale"] for r in results})
+    if len(scales) < 2:
+        return
+    by_key = {(r["scale"], r["stage"]): r for r in results}
+    print(f"\n=== Scaling (time per row vs {scales[0]:g}x) ===")
+    for stage in dict.fromkeys(r["stage"] for r in results):
+        base = by_key[scales[0], stage]
+        ratios = []
+        for scale in scales[1:]:
+            r = by_key[scale, stage]
+            ratios.append(f"{scale:g}x: {base['rows_per_sec'] / r['rows_per_sec']:.2f}"
+                          if r["rows_per_sec"] else f"{scale:g}x: -")
+        print(f"  {stage:<42} {'  '.join(ratios)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark migration stages on synthetic data")
+    parser.add_argument("--scales", type=float, nargs="+", default=[1, 10])
+    parser.add_argument("--only", nargs="+", metavar="STAGE", help="benchmark only these stages")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per stage (fastest is kept)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workdir", type=Path, help="keep workspaces here instead of a temp dir")
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    parser.add_argument("--baseline", type=Path, help="previous --output to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed throughput drop / memory growth (default 0.25)")
+    args = parser.parse_args()
+
+    stages = BENCH_STAGES
+    if args.only:
+        unknown = set(args.only) - {s.name for s in BENCH_STAGES}
+        if unknown:
+            parser.error(f"unknown stage(s): {', '.join(sorted(unknown))}")
+        stages = [s for s in BENCH_STAGES if s.name in args.only]
+
+    print("=== Benchmarking migration stages ===")
+    results = benchmark(args.scales, stages, args.seed, args.workdir, args.repeat)
+    print_scaling(results)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+        print(f"\nSaved: {args.output}")
+
+    if args.baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+        if regressions:
+            print(f"\nRegressions (tolerance {args.tolerance:.0%}):")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nNo regressions against {args.baseline.name}")
+
+    print("\n=== Done! ===")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""
+supabase_ready/*.csv 컬럼 값 검사 (DDL에서 컴파일한 컬럼별 검증 함수)
+
+schema.load_schema()의 컬럼 타입/제약을 검증 함수로 변환해 모든 행에 적용:
+- NOT NULL                     빈 값(COPY에서 NULL) 금지
+- varchar(n) / char(n)         글자 수 <= n
+- integer / smallint / bigint  정수 형식 + 범위
+- numeric(p, s)                숫자 형식 + 소수 s자리 반올림 후 정수부 p-s 자리 이하
+- date / uuid / boolean        형식
+- CHECK (col > 0 등 비교)       숫자 비교
+- CHECK (col IN (...) / col = any (array[...]))  허용값 목록
+해석할 수 없는 CHECK는 검사 생략 목록에 표시
+
+사용법:
+  python scripts/check_columns.py              # 위반이 있으면 exit 1
+"""
+import argparse
+import csv
+import re
+import sys
+from datetime import date
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from pathlib import Path
+from typing import Callable, Optional
+
+from check_integrity import Violation, print_violations
+from run_report import current_stats
+from schema import Column, load_schema
+
+BASE_DIR = Path(__file__).parent.parent
+OUTPUT_DIR = BASE_DIR / "supabase_ready"
+
+# 검증 함수: 값 → 위반 설명 (정상이면 None)
+Validator = Callable[[str], Optional[str]]
+
+_INT_RANGES = {
+    "smallint": (-2 ** 15, 2 ** 15 - 1),
+    "integer": (-2 ** 31, 2 ** 31 - 1),
+    "bigint": (-2 ** 63, 2 ** 63 - 1),
+}
+_INT_ALIASES = {"int2": "smallint", "int": "integer", "int4": "integer", "serial": "integer",
+                "int8": "bigint", "bigserial": "bigint"}
+_INT_PATTERN = re.compile(r"\s*[+-]?\d+\s*$")
+_NUMERIC_PATTERN = re.compile(r"\s*[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?\s*$")
+_UUID_PATTERN = re.compile(r"[0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{12}$")
+_BOOLEANS = {"t", "f", "true", "false", "y", "n", "yes", "no", "on", "off", "1", "0"}
+
+_COMPARISON = re.compile(r"^\(*\s*(\w+)\s*(>=|<=|<>|!=|>|<|=)\s*(-?\d+(?:\.\d+)?)\s*\)*$")
+_ENUM = re.compile(r"^\(*\s*\(?(\w+)\)?(?:::[\w ]+)?\s*(?:=\s*any|in)\s*\(", re.I)
+_OPERATORS = {
+    ">": lambda a, b: a > b, ">=": lambda a, b: a >= b,
+    "<": lambda a, b: a < b, "<=": lambda a, b: a <= b,
+    "=": lambda a, b: a == b, "<>": lambda a, b: a != b, "!=": lambda a, b: a != b,
+}
+
+
+def _length_validator(limit: int) -> Validator:
+    def check(value):
+        if len(value) > limit:
+            return f"{len(value)} chars > {limit}"
+    return check
+
+
+def _int_validator(type_name: str) -> Validator:
+    low, high = _INT_RANGES[type_name]
+
+    def check(value):
+        if not _INT_PATTERN.match(value):
+            return f"not an {type_name}"
+        if not low <= int(value) <= high:
+            return f"out of {type_name} range"
+    return check
+
+
+def _numeric_validator(precision: Optional[int], scale: int) -> Validator:
+    quantum = Decimal(1).scaleb(-scale)
+    max_integer_digits = None if precision is None else precision - scale
+
+    def check(value):
+        if not _NUMERIC_PATTERN.match(value):
+            return "not a number"
+        if max_integer_digits is None:
+            return None
+        rounded = Decimal(value).quantize(quantum, rounding=ROUND_HALF_UP)
+        integer_digits = len(str(abs(int(rounded)))) if int(rounded) else 0
+        if integer_digits > max_integer_digits:
+            return f"exceeds numeric({precision}, {scale})"
+    return check
+
+
+def _date_validator(value):
+    try:
+        date.fromisoformat(value)
+    except ValueError:
+        return "not a YYYY-MM-DD date"
+
+
+def _uuid_validator(value):
+    if not _UUID_PATTERN.match(value.strip("{}")):
+        return "not a uuid"
+
+
+def _boolean_validator(value):
+    if value.strip().lower() not in _BOOLEANS:
+        return "not a boolean"
+
+
+def type_validators(column: Column) -> list:
+    """컬럼 타입 → [(제약 이름, 검증 함수)]"""
+    col_type = column.type
+    match = re.match(r"(character varying|varchar|character|char|bpchar)\s*\((\d+)\)", col_type)
+    if match:
+        limit = int(match.group(2))
+        return [(col_type, _length_validator(limit))]
+
+    base = _INT_ALIASES.get(col_type, col_type)
+    if base in _INT_RANGES:
+        return [(base, _int_validator(base))]
+
+    match = re.match(r"(numeric|decimal)\s*(?:\((\d+)\s*(?:,\s*(\d+))?\))?$", col_type)
+    if match:
+        precision = int(match.group(2)) if match.group(2) else None
+        scale = int(match.group(3) or 0)
+        return [(col_type, _numeric_validator(precision, scale))]
+
+    if col_type == "date":
+        return [("date", _date_validator)]
+    if col_type == "uuid":
+        return [("uuid", _uuid_validator)]
+    if col_type in ("boolean", "bool"):
+        return [("boolean", _boolean_validator)]
+    return []
+
+
+def compile_check(expression: str) -> Optional[tuple]:
+    """CHECK 식 → (컬럼, 검증 함수), 해석할 수 없으면 None"""
+    text = re.sub(r"\s+", " ", expression).strip()
+
+    match = _COMPARISON.match(text)
+    if match:
+        column, operator, literal = match.groups()
+        bound = Decimal(literal)
+        compare = _OPERATORS[operator]
+
+        def check(value):
+            try:
+                number = Decimal(value)
+            except InvalidOperation:
+                return None  # 형식 오류는 타입 검증에서 처리
+            if not compare(number, bound):
+                return f"violates {column} {operator} {literal}"
+        return column.lower(), check
+
+    match = _ENUM.match(text)
+    if match:
+        allowed = frozenset(re.findall(r"'([^']*)'", text))
+
+        def check(value):
+            if value not in allowed:
+                return f"not one of {', '.join(sorted(allowed))}"
+        return match.group(1).lower(), check
+
+    return None
+
+
+def compile_table(table) -> tuple:
+    """테이블 → ({컬럼: [(제약 이름, 검증 함수)]}, 검사 생략 목록)"""
+    validators = {name: [(f"{table.name}.{name} {c}", v) for c, v in type_validators(column)]
+                  for name, column in table.columns.items()}
+    skipped = []
+    for check in table.checks:
+        compiled = compile_check(check.expression)
+        if compiled is None or compiled[0] not in validators:
+            expression = re.sub(r"\s+", " ", check.expression)
+            skipped.append(f"{check.name}: cannot compile CHECK {expression}")
+            continue
+        column, validator = compiled
+        validators[column].append((check.name, validator))
+    return validators, skipped
+
+
+def check_file(table, csv_path: Path) -> tuple:
+    """CSV 하나를 검사, (위반 목록, 검사 생략 목록)"""
+    validators, skipped = compile_table(table)
+    violations = []
+
+    with open(csv_path, "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+
+        unknown = [c for c in header if c not in table.columns]
+        for name in unknown:
+            violations.append(Violation(f"{table.name}: unknown column", table.name, 0, (name,),
+                                        "column does not exist in table"))
+        for name, column in table.columns.items():
+            if column.not_null and not column.has_default and name not in header:
+                violations.append(Violation(f"{table.name}.{name} not null", table.name, 0, (name,),
+                                            "required column missing from CSV"))
+
+        # (위치, 컬럼명, NOT NULL 여부, 검증 함수 목록)
+        plan = [(i, name, table.columns[name].not_null, validators[name])
+                for i, name in enumerate(header) if name in table.columns]
+
+        row_number = 0
+        for row_number, row in enumerate(reader, 1):
+            for i, name, not_null, checks in plan:
+                value = row[i] if i < len(row) else ""
+                if value == "":
+                    if not_null:
+                        violations.append(Violation(f"{table.name}.{name} not null", table.name,
+                                                    row_number, ("",), "empty value"))
+                    continue
+                for constraint, validator in checks:
+                    detail = validator(value)
+                    if detail:
+                        violations.append(Violation(constraint, table.name, row_number,
+                                                    (value,), detail))
+        current_stats().read(csv_path, row_number)
+
+    return violations, skipped
+
+
+def check_columns(output_dir: Path = OUTPUT_DIR, schema: dict = None) -> tuple:
+    """supabase_ready 전체 검사, (위반 목록, 검사 생략 목록)"""
+    schema = load_schema() if schema is None else schema
+    violations, skipped = [], []
+    for name, table in schema.items():
+        csv_path = output_dir / f"{name}.csv"
+        if not csv_path.exists():
+            continue
+        file_violations, file_skipped = check_file(table, csv_path)
+        violations += file_violations
+        skipped += file_skipped
+    return violations, skipped
+
+
+def validate(output_dir: Path = OUTPUT_DIR, limit: int = 10):
+    """run_all 단계: 위반이 있으면 ValueError"""
+    violations, skipped = check_columns(output_dir)
+    for reason in skipped:
+        print(f"Not checked: {reason}")
+    if violations:
+        print_violations(violations, limit)
+        constraints = sorted({v.constraint for v in violations})
+        raise ValueError(f"{len(violations)} column violations ({', '.join(constraints)})")
+    print("All column types / lengths / CHECK constraints OK")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check column types and CHECK constraints on supabase_ready CSVs")
+    parser.add_argument("--dir", type=Path, default=OUTPUT_DIR, help="directory with <table>.csv files")
+    parser.add_argument("--limit", type=int, default=10, help="rows shown per constraint")
+    args = parser.parse_args()
+
+    print("=== Checking column values ===\n")
+    try:
+        validate(args.dir, args.limit)
+    except ValueError as e:
+        print(f"\nFAILED: {e}")
+        sys.exit(1)
+    print("\n=== Done! ===")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+supabase_ready/*.csv 참조 무결성 검사 (PK / UNIQUE / FOREIGN KEY)
+
+- 제약은 supabase/migrations/*.sql에서 파싱 (schema.load_schema), CSV 파일명 = 테이블명
+- 참조되는 테이블부터 파일마다 한 번만 읽으면서
+  - PK/UNIQUE 키를 해시 인덱스에 넣고 (이미 있으면 중복 위반)
+  - FK 값은 먼저 읽은 부모 테이블의 인덱스에서 조회 (없으면 위반)
+- CSV에 없는 컬럼(DB 기본값으로 채워지는 id 등)이 걸린 제약은 검사 생략
+- 빈 값은 NULL로 보고 UNIQUE/FK 검사에서 제외 (NOT NULL은 컬럼 검증에서 처리)
+
+사용법:
+  python scripts/check_integrity.py              # 위반이 있으면 exit 1
+  python scripts/check_integrity.py --limit 50   # 제약별 출력 행 수
+"""
+import argparse
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import NamedTuple
+
+from pipeline import read_header, read_rows
+from schema import load_schema
+
+BASE_DIR = Path(__file__).parent.parent
+OUTPUT_DIR = BASE_DIR / "supabase_ready"
+
+
+class Violation(NamedTuple):
+    constraint: str
+    table: str
+    row: int          # 데이터 행 번호 (헤더 제외, 1부터)
+    key: tuple
+    detail: str
+
+
+def load_order(tables: dict) -> list:
+    """FK 부모 테이블이 먼저 오도록 정렬 (자기 참조 제외)"""
+    deps = {name: {fk.ref_table for fk in t.foreign_keys if fk.ref_table in tables} - {name}
+            for name, t in tables.items()}
+    order = []
+    while deps:
+        ready = sorted(name for name, d in deps.items() if not d)
+        if not ready:
+            raise ValueError(f"Foreign key cycle between tables: {sorted(deps)}")
+        order.extend(ready)
+        for name in ready:
+            del deps[name]
+        for d in deps.values():
+            d.difference_update(ready)
+    return order
+
+
+def check_integrity(output_dir: Path = OUTPUT_DIR, schema: dict = None) -> tuple:
+    """(위반 목록, 검사 생략한 제약 목록) 반환"""
+    schema = load_schema() if schema is None else schema
+    tables = {name: t for name, t in schema.items() if (output_dir / f"{name}.csv").exists()}
+    headers = {name: set(read_header(output_dir / f"{name}.csv")) for name in tables}
+
+    # 다른 테이블이 참조하는 키 (부모 쪽 인덱스 대상)
+    referenced = defaultdict(set)
+    for t in tables.values():
+        for fk in t.foreign_keys:
+            referenced[fk.ref_table].add(fk.ref_columns)
+
+    indexes = {}      # (테이블, 컬럼들) → {키: 행 번호}
+    violations = []
+    skipped = []
+
+    for name in load_order(tables):
+        table = tables[name]
+        header = headers[name]
+
+        unique_keys = []
+        if table.primary_key:
+            unique_keys.append((f"{name}_pkey", table.primary_key))
+        unique_keys += [(c, cols) for c, cols in table.unique if cols != table.primary_key]
+
+        checked_unique = []
+        for constraint, columns in unique_keys:
+            if set(columns) <= header:
+                checked_unique.append((constraint, columns))
+            else:
+                skipped.append(f"{constraint}: {', '.join(sorted(set(columns) - header))} not in {name}.csv")
+
+        # 중복 검사가 없는 참조 키는 인덱스만 생성
+        index_only = [cols for cols in referenced.get(name, ())
+                      if set(cols) <= header and cols not in {c for _, c in checked_unique}]
+
+        checked_fks = []
+        for fk in table.foreign_keys:
+            if not set(fk.columns) <= header:
+                skipped.append(f"{fk.name}: {', '.join(fk.columns)} not in {name}.csv")
+            elif fk.ref_table not in tables:
+                skipped.append(f"{fk.name}: {fk.ref_table}.csv not found")
+            elif (fk.ref_table, fk.ref_columns) not in indexes:
+                skipped.append(f"{fk.name}: {', '.join(fk.ref_columns)} not in {fk.ref_table}.csv")
+            else:
+                checked_fks.append((fk, indexes[fk.ref_table, fk.ref_columns]))
+
+        unique_indexes = [(constraint, columns, indexes.setdefault((name, columns), {}))
+                          for constraint, columns in checked_unique]
+        plain_indexes = [(columns, indexes.setdefault((name, columns), {})) for columns in index_only]
+
+        # 파일당 1회 스캔
+        for row_number, row in enumerate(read_rows(output_dir / f"{name}.csv"), 1):
+            for constraint, columns, index in unique_indexes:
+                key = tuple(row[c] for c in columns)
+                if "" in key:
+                    continue
+                first = index.setdefault(key, row_number)
+                if first != row_number:
+                    violations.append(Violation(constraint, name, row_number, key,
+                                                f"duplicate of row {first}"))
+
+            for columns, index in plain_indexes:
+                key = tuple(row[c] for c in columns)
+                if "" not in key:
+                    index.setdefault(key, row_number)
+
+            for fk, parent_index in checked_fks:
+                key = tuple(row[c] for c in fk.columns)
+                if "" in key or key in parent_index:
+                    continue
+                violations.append(Violation(fk.name, name, row_number, key,
+                                            f"not found in {fk.ref_table}({', '.join(fk.ref_columns)})"))
+
+    return violations, skipped
+
+
+def print_violations(violations: list, limit: int = 10):
+    """제약별로 묶어서 출력"""
+    by_constraint = defaultdict(list)
+    for v in violations:
+        by_constraint[v.table, v.constraint].append(v)
+
+    for (table, constraint), rows in sorted(by_constraint.items()):
+        print(f"\n{constraint} ({table}.csv): {len(rows)} violations")
+        for v in rows[:limit]:
+            print(f"  row {v.row}: {', '.join(v.key)} - {v.detail}")
+        if len(rows) > limit:
+            print(f"  ... {len(rows) - limit} more")
+
+
+def validate(output_dir: Path = OUTPUT_DIR, limit: int = 10):
+    """run_all 단계: 위반이 있으면 ValueError"""
+    violations, skipped = check_integrity(output_dir)
+    for reason in skipped:
+        print(f"Not checked: {reason}")
+    if violations:
+        print_violations(violations, limit)
+        constraints = sorted({v.constraint for v in violations})
+        raise ValueError(f"{len(violations)} integrity violations ({', '.join(constraints)})")
+    print("All foreign key / unique constraints OK")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check PK/UNIQUE/FK constraints on supabase_ready CSVs")
+    parser.add_argument("--dir", type=Path, default=OUTPUT_DIR, help="directory with <table>.csv files")
+    parser.add_argument("--limit", type=int, default=10, help="rows shown per constraint")
+    args = parser.parse_args()
+
+    print("=== Checking referential integrity ===\n")
+    try:
+        validate(args.dir, args.limit)
+    except ValueError as e:
+        print(f"\nFAILED: {e}")
+        sys.exit(1)
+    print("\n=== Done! ===")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,15 @@
 """
 CSV 파일을 Supabase 임포트용으로 변환하는 스크립트
 """
-import csv
 import re
+import sys
 from pathlib import Path
-from datetime import datetime
+
+from dates import normalize_date
+from manifest import run_stage
+from pipeline import CsvSink, read_records
+from records import record_class, table_record
+from run_report import current_stats
 
 BASE_DIR = Path(__file__).parent.parent
 OUTPUT_DIR = BASE_DIR / "supabase_ready"
@@ -21,9 +26,13 @@ def clean_price(value: str) -> int:
 
 def clean_date(value: str) -> str:
     """날짜 형식 정리 (YYYY-MM-DD)"""
-    if not value:
-        return ""
-    # "2025-01-27 00:00:00" -> "2025-01-27"
+    # "2025-01-27 00:00:00" / "20250127" -> "2025-01-27"
+    return normalize_date(value)
+
+
+def clean_invoice_number(value: str) -> str:
+    """인보이스 번호에서 시간 부분 제거"""
+    # "20250127 00:00:00" -> "20250127"
     return value.split()[0] if " " in value else value
 
 
@@ -38,68 +47,66 @@ def clean_product_name(value: str) -> str:
     return value.replace("\n", " ").strip()
 
 
+PRODUCT_FIELDS = ["product_code", "brand", "name_ko", "name_en", "name_ru",
+                  "barcode", "pcs_per_carton", "width_cm", "height_cm",
+                  "depth_cm", "cbm", "hscode", "status"]
+# product_info.csv 에서 읽는 컬럼
+ProductInfoRow = record_class("ProductInfoRow", [
+    "product_code", "brand", "name_ko", "name_en", "name_ru", "barcode", "pcs_per_carton",
+    "price_supply", "commission", "price_unit", "W", "H", "L", "CBM", "hscode"])
+PACKING_LIST_FIELDS = ["id", "order_id", "pl_number", "invoice_number", "invoice_date",
+                       "consignee_name", "consignee_address", "consignee_tel",
+                       "consignee_email", "exporter_name", "manufacturer",
+                       "shipping_port", "departure_date", "destination",
+                       "vessel_flight", "payment_term", "total_cartons",
+                       "total_nw_kg", "total_gw_kg", "total_cbm", "total_pallets"]
+PACKING_ITEM_FIELDS = ["id", "packing_list_id", "product_code", "product_name", "qty",
+                       "cartons", "nw_kg", "gw_kg", "cbm", "pallet_number"]
+
+
 def process_product_info():
-    """product_info.csv -> ru_products.csv + ru_prices.csv"""
+    """product_info.csv -> ru_products.csv (ru_prices.csv는 prices.py에서 주문 이력과 함께 생성, product_code 중복은 첫 행만)"""
     input_file = BASE_DIR / "product_info.csv"
     products_file = OUTPUT_DIR / "ru_products.csv"
-    prices_file = OUTPUT_DIR / "ru_prices.csv"
 
-    products = []
-    prices = []
+    stats = current_stats()
+    Product = table_record("ru_products", PRODUCT_FIELDS)
+    written = set()
 
-    with open(input_file, "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
+    with CsvSink(products_file, PRODUCT_FIELDS) as products:
+        for row in read_records(input_file, ProductInfoRow, encoding="utf-8"):
             # Skip rows with empty product_code
-            if not row.get("product_code", "").strip():
+            if not row.product_code.strip():
+                stats.drop("empty product_code")
                 continue
+            # product_code는 UNIQUE: 같은 코드가 여러 번이면 첫 행만 (prices.py와 같은 규칙)
+            if row.product_code in written:
+                stats.drop("duplicate product_code (first row kept)")
+                continue
+            written.add(row.product_code)
 
             # ru_products
-            product = {
-                "product_code": row["product_code"],
-                "brand": row["brand"],
-                "name_ko": row["name_ko"],
-                "name_en": row.get("name_en", ""),
-                "name_ru": row.get("name_ru", ""),
-                "barcode": row.get("barcode", ""),
-                "pcs_per_carton": row.get("pcs_per_carton", "1"),
-                "width_cm": row.get("W", ""),
-                "height_cm": row.get("H", ""),
-                "depth_cm": row.get("L", ""),
-                "cbm": row.get("CBM", ""),
-                "hscode": row.get("hscode", ""),
-                "status": "active"
-            }
-            products.append(product)
-
-            # ru_prices
-            price = {
-                "product_code": row["product_code"],
-                "supply_price": clean_price(row.get("price_supply", "0")),
-                "commission": clean_price(row.get("commission", "0")),
-                "final_price": clean_price(row.get("price_unit", "0")),
-                "effective_date": "2025-01-01"
-            }
-            prices.append(price)
-
-    # Write ru_products.csv
-    with open(products_file, "w", encoding="utf-8", newline="") as f:
-        fieldnames = ["product_code", "brand", "name_ko", "name_en", "name_ru",
-                     "barcode", "pcs_per_carton", "width_cm", "height_cm",
-                     "depth_cm", "cbm", "hscode", "status"]
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(products)
-
-    # Write ru_prices.csv
-    with open(prices_file, "w", encoding="utf-8", newline="") as f:
-        fieldnames = ["product_code", "supply_price", "commission", "final_price", "effective_date"]
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(prices)
-
-    print(f"Created: {products_file.name} ({len(products)} rows)")
-    print(f"Created: {prices_file.name} ({len(prices)} rows)")
+            products.write_values(Product(
+                row.product_code, row.brand, row.name_ko, row.name_en, row.name_ru,
+                row.barcode, row.pcs_per_carton, row.W, row.H, row.L, row.CBM,
+                row.hscode, "active",
+            ))
+
+    print(f"Created: {products_file.name} ({products.count} rows)")
+
+
+# PACKING_LIST_FIELDS의 id는 원본 컬럼 (ru_packing_lists 테이블에는 없음)
+PackingList = record_class("PackingListRow", PACKING_LIST_FIELDS)
+PackingItem = table_record("ru_packing_items", PACKING_ITEM_FIELDS)
+
+
+def clean_packing_list(row):
+    """ru_packing_lists 한 행 정리 (레코드를 직접 수정해 반환)"""
+    row.pl_number = clean_pl_number(row.pl_number)
+    row.invoice_number = clean_invoice_number(row.invoice_number)
+    row.invoice_date = clean_date(row.invoice_date)
+    row.departure_date = clean_date(row.departure_date)
+    return row
 
 
 def process_packing_lists():
@@ -107,42 +114,20 @@ def process_packing_lists():
     input_file = BASE_DIR / "ru_packing_lists.csv"
     output_file = OUTPUT_DIR / "ru_packing_lists.csv"
 
-    rows = []
-    with open(input_file, "r", encoding="utf-8-sig") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            cleaned = {
-                "id": row["id"],
-                "order_id": row["order_id"],
-                "pl_number": clean_pl_number(row["pl_number"]),
-                "invoice_number": clean_date(row.get("invoice_number", "")),
-                "invoice_date": clean_date(row.get("invoice_date", "")),
-                "consignee_name": row.get("consignee_name", ""),
-                "consignee_address": row.get("consignee_address", ""),
-                "consignee_tel": row.get("consignee_tel", ""),
-                "consignee_email": row.get("consignee_email", ""),
-                "exporter_name": row.get("exporter_name", ""),
-                "manufacturer": row.get("manufacturer", ""),
-                "shipping_port": row.get("shipping_port", ""),
-                "departure_date": clean_date(row.get("departure_date", "")),
-                "destination": row.get("destination", ""),
-                "vessel_flight": row.get("vessel_flight", ""),
-                "payment_term": row.get("payment_term", ""),
-                "total_cartons": row.get("total_cartons", "0"),
-                "total_nw_kg": row.get("total_nw_kg", "0"),
-                "total_gw_kg": row.get("total_gw_kg", "0"),
-                "total_cbm": row.get("total_cbm", "0"),
-                "total_pallets": row.get("total_pallets", "0"),
-            }
-            rows.append(cleaned)
-
-    with open(output_file, "w", encoding="utf-8", newline="") as f:
-        fieldnames = list(rows[0].keys())
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(rows)
-
-    print(f"Created: {output_file.name} ({len(rows)} rows)")
+    with CsvSink(output_file, PACKING_LIST_FIELDS) as sink:
+        for row in read_records(input_file, PackingList):
+            sink.write_values(clean_packing_list(row))
+
+    print(f"Created: {output_file.name} ({sink.count} rows)")
+
+
+def clean_packing_item(row):
+    """ru_packing_items 한 행 정리 (레코드를 직접 수정해 반환)"""
+    # pallet_number: 1.0 -> 1
+    if row.pallet_number:
+        row.pallet_number = str(int(float(row.pallet_number)))
+    row.product_name = clean_product_name(row.product_name)
+    return row
 
 
 def process_packing_items():
@@ -150,47 +135,32 @@ def process_packing_items():
     input_file = BASE_DIR / "ru_packing_items_final.csv"
     output_file = OUTPUT_DIR / "ru_packing_items.csv"
 
-    rows = []
-    with open(input_file, "r", encoding="utf-8-sig") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            # pallet_number: 1.0 -> 1
-            pallet_num = row.get("pallet_number", "")
-            if pallet_num:
-                pallet_num = str(int(float(pallet_num)))
-
-            cleaned = {
-                "id": row["id"],
-                "packing_list_id": row["packing_list_id"],
-                "product_code": row["product_code"],
-                "product_name": clean_product_name(row.get("product_name", "")),
-                "qty": row.get("qty", "0"),
-                "cartons": row.get("cartons", "0"),
-                "nw_kg": row.get("nw_kg", "0"),
-                "gw_kg": row.get("gw_kg", "0"),
-                "cbm": row.get("cbm", "0"),
-                "pallet_number": pallet_num,
-            }
-            rows.append(cleaned)
-
-    with open(output_file, "w", encoding="utf-8", newline="") as f:
-        fieldnames = list(rows[0].keys())
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(rows)
-
-    print(f"Created: {output_file.name} ({len(rows)} rows)")
+    with CsvSink(output_file, PACKING_ITEM_FIELDS) as sink:
+        for row in read_records(input_file, PackingItem):
+            sink.write_values(clean_packing_item(row))
+
+    print(f"Created: {output_file.name} ({sink.count} rows)")
 
 
 if __name__ == "__main__":
     print("=== CSV Cleaning for Supabase Import ===\n")
+    force = "--force" in sys.argv[1:]
 
-    process_product_info()
+    run_stage("clean_csv.product_info", process_product_info,
+              inputs=[BASE_DIR / "product_info.csv"],
+              outputs=[OUTPUT_DIR / "ru_products.csv"],
+              sources=[__file__], force=force)
     print()
 
-    process_packing_lists()
+    run_stage("clean_csv.packing_lists", process_packing_lists,
+              inputs=[BASE_DIR / "ru_packing_lists.csv"],
+              outputs=[OUTPUT_DIR / "ru_packing_lists.csv"],
+              sources=[__file__], force=force)
     print()
 
-    process_packing_items()
+    run_stage("clean_csv.packing_items", process_packing_items,
+              inputs=[BASE_DIR / "ru_packing_items_final.csv"],
+              outputs=[OUTPUT_DIR / "ru_packing_items.csv"],
+              sources=[__file__], force=force)
 
     print(f"\n=== Done! Output files in: {OUTPUT_DIR} ===")
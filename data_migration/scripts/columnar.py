@@ -0,0 +1,224 @@
+"""
+원본 CSV 컬럼 캐시 (NumPy) - 분석용으로 CSV를 다시 토큰화하지 않고 컬럼을 읽음
+- read_columns: 컬럼별 값 배열, read_encoded: 컬럼별 (고유값, 행별 코드)
+
+컬럼 캐시 (.column_cache/<파일명>.<sha256 앞 16자리>/)
+- 원본 CSV를 처음 읽을 때 컬럼마다 문자열 표(고유값 UTF-8 연결 + 오프셋) + 행별 코드(codes.npy)로 저장
+- 이후에는 CSV를 다시 토큰화하지 않고 코드 배열은 np.load(mmap_mode='r')로 복사 없이 열고,
+  문자열 표는 컬럼을 처음 쓸 때 고유값만 디코딩
+- 파일 크기+mtime이 같으면 해시 생략, 다르면 sha256으로 확인 (내용이 바뀌면 새로 생성)
+- MIGRATION_COLUMN_CACHE=0 이면 캐시 사용 안 함
+
+사용법 (캐시 미리 생성 / 내용 확인):
+  python scripts/columnar.py product_info.csv merged_order_history.csv ru_packing_items_final.csv
+
+※ numpy 필요 (pip install numpy)
+"""
+import csv
+import json
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from manifest import sha256_file
+from run_report import current_stats
+
+BASE_DIR = Path(__file__).parent.parent
+CACHE_DIR = BASE_DIR / ".column_cache"
+CACHE_VERSION = 2   # 2: 빈 행 건너뜀 (csv.DictReader와 같은 행)
+
+
+def _tokenize(path: Path, encoding: str) -> tuple:
+    """CSV → (헤더, 컬럼별 값 목록) (빈 행은 건너뛰고 짧은 행은 빈 문자열로 채움, pipeline.read_records와 같은 행)"""
+    with open(path, "r", encoding=encoding, newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        width = len(header)
+        columns = [[] for _ in header]
+        appends = [c.append for c in columns]
+
+        for row in reader:
+            if not row:
+                continue
+            if len(row) < width:
+                row = row + [""] * (width - len(row))
+            for append, value in zip(appends, row):
+                append(value)
+    return header, columns
+
+
+class CachedTable:
+    """컬럼 캐시 하나 (컬럼별 고유값 표 + 코드 배열, 메모리 매핑)"""
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+        meta = json.loads((self.cache_dir / "meta.json").read_text(encoding="utf-8"))
+        self.source = meta["source"]
+        self.header = meta["header"]
+        self.n_rows = meta["rows"]
+        self._index = {name: i for i, name in enumerate(self.header)}
+
+    def values(self, name: str) -> np.ndarray:
+        """컬럼의 고유값 배열 (정렬됨, 문자열 표 디코딩)"""
+        i = self._index[name]
+        offsets = np.load(self.cache_dir / f"{i}.offsets.npy").tolist()
+        blob = (self.cache_dir / f"{i}.strings.bin").read_bytes()
+        return np.array([blob[start:end].decode("utf-8") for start, end in zip(offsets, offsets[1:])],
+                        dtype=str)
+
+    def codes(self, name: str) -> np.ndarray:
+        """행별 고유값 번호 (메모리 매핑, 복사 없음)"""
+        return np.load(self.cache_dir / f"{self._index[name]}.codes.npy", mmap_mode="r")
+
+    def encoded(self, name: str) -> tuple:
+        """(고유값 배열, 행별 코드 배열)"""
+        return self.values(name), self.codes(name)
+
+    def column(self, name: str) -> np.ndarray:
+        """행별 문자열 배열 (없는 컬럼은 빈 문자열)"""
+        if name not in self._index:
+            return np.full(self.n_rows, "", dtype=str)
+        values, codes = self.encoded(name)
+        return values[codes]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._index
+
+    def __repr__(self):
+        return f"CachedTable({self.source!r}, rows={self.n_rows}, columns={len(self.header)})"
+
+
+def _cache_entries(path: Path) -> list:
+    return sorted(CACHE_DIR.glob(f"{Path(path).name}.*")) if CACHE_DIR.exists() else []
+
+
+def _write_cache(path: Path, digest: str, encoding: str) -> Path:
+    """
+    CSV를 한 번 토큰화해 컬럼 캐시 생성 (작성자마다 다른 임시 폴더에 쓴 뒤 교체)
+
+    동시에 같은 캐시를 만든 다른 프로세스가 먼저 교체했으면 그 캐시를 사용
+    """
+    header, columns = _tokenize(path, encoding)
+    target = CACHE_DIR / f"{path.name}.{digest[:16]}"
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(prefix=f"{target.name}.", suffix=".tmp", dir=CACHE_DIR))
+
+    for i, values in enumerate(columns):
+        uniques, inverse = np.unique(np.array(values, dtype=str), return_inverse=True)
+        code_type = np.uint16 if len(uniques) <= np.iinfo(np.uint16).max else np.uint32
+        encoded = [v.encode("utf-8") for v in uniques.tolist()]
+        (tmp / f"{i}.strings.bin").write_bytes(b"".join(encoded))
+        np.save(tmp / f"{i}.offsets.npy", np.cumsum([0] + [len(v) for v in encoded], dtype=np.int64))
+        np.save(tmp / f"{i}.codes.npy", inverse.reshape(-1).astype(code_type))
+
+    stat = os.stat(path)
+    (tmp / "meta.json").write_text(json.dumps({
+        "version": CACHE_VERSION,
+        "source": path.name,
+        "encoding": encoding,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": digest,
+        "header": header,
+        "rows": len(columns[0]) if columns else 0,
+    }, ensure_ascii=False), encoding="utf-8")
+
+    try:
+        os.replace(tmp, target)
+    except OSError:
+        if not (target / "meta.json").exists():
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        shutil.rmtree(tmp, ignore_errors=True)  # 다른 작성자가 먼저 만든 같은 내용의 캐시
+
+    # 같은 원본의 이전 캐시 정리 (다른 작성자의 임시 폴더는 건드리지 않음)
+    for old in _cache_entries(path):
+        if old != target and not old.name.endswith(".tmp"):
+            shutil.rmtree(old, ignore_errors=True)
+    return target
+
+
+def open_table(path: Path, encoding: str = "utf-8-sig") -> CachedTable:
+    """원본 CSV의 컬럼 캐시 열기 (없거나 내용이 바뀌었으면 생성)"""
+    path = Path(path)
+    stat = os.stat(path)
+    digest = None
+    for entry in _cache_entries(path):
+        meta_file = entry / "meta.json"
+        if entry.name.endswith(".tmp") or not meta_file.exists():
+            continue
+        meta = json.loads(meta_file.read_text(encoding="utf-8"))
+        if meta.get("version") != CACHE_VERSION or meta.get("encoding") != encoding:
+            continue
+        if meta["size"] == stat.st_size and meta["mtime_ns"] == stat.st_mtime_ns:
+            return CachedTable(entry)
+        digest = digest or sha256_file(path)
+        if meta["sha256"] == digest:
+            # 내용은 같고 mtime만 바뀐 경우 → 다음부터 해시 생략
+            meta.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+            meta_file.write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+            return CachedTable(entry)
+    return CachedTable(_write_cache(path, digest or sha256_file(path), encoding))
+
+
+def cache_enabled() -> bool:
+    return os.environ.get("MIGRATION_COLUMN_CACHE", "1") != "0"
+
+
+def read_columns(path: Path, names: list, encoding: str = "utf-8-sig") -> dict:
+    """CSV의 {컬럼명: 문자열 배열} 반환 (없는 컬럼은 빈 문자열, 컬럼 캐시 사용)"""
+    if cache_enabled():
+        table = open_table(path, encoding)
+        current_stats().read(path, table.n_rows)
+        return {name: table.column(name) for name in names}
+
+    header, columns = _tokenize(path, encoding)
+    index = {name: i for i, name in enumerate(header)}
+    n_rows = len(columns[0]) if columns else 0
+    current_stats().read(path, n_rows)
+    return {name: np.array(columns[index[name]], dtype=str) if name in index
+            else np.full(n_rows, "", dtype=str) for name in names}
+
+
+def read_encoded(path: Path, names: list, encoding: str = "utf-8-sig") -> dict:
+    """CSV의 {컬럼명: (고유값 배열, 행별 코드 배열)} 반환 (캐시가 있으면 복사 없이 매핑)"""
+    if cache_enabled():
+        table = open_table(path, encoding)
+        n_rows = table.n_rows
+        encoded = {name: table.encoded(name) for name in names if name in table}
+    else:
+        header, columns = _tokenize(path, encoding)
+        n_rows = len(columns[0]) if columns else 0
+        encoded = {}
+        for name in names:
+            if name in header:
+                uniques, inverse = np.unique(np.array(columns[header.index(name)], dtype=str),
+                                             return_inverse=True)
+                encoded[name] = (uniques, inverse.reshape(-1))
+
+    current_stats().read(path, n_rows)
+    empty = (np.array([""], dtype=str), np.zeros(n_rows, dtype=np.uint16))
+    return {name: encoded.get(name, empty) for name in names}
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    for name in sys.argv[1:]:
+        path = Path(name) if Path(name).exists() else BASE_DIR / name
+        table = open_table(path)
+        size = sum(f.stat().st_size for f in table.cache_dir.iterdir())
+        print(f"{path.name}: {table.n_rows} rows, {len(table.header)} columns, "
+              f"cache {size / 1e6:.1f} MB (csv {path.stat().st_size / 1e6:.1f} MB) → {table.cache_dir}")
+        for column in table.header:
+            print(f"  {column:<24} {len(table.values(column)):>8} distinct")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,101 +1,62 @@
 """
-PRODUCTION2.csv → cm_production_lots.csv 변환
-(합산 없이 모든 행 개별 유지)
+PRODUCTION2.csv (+ LOTHX.csv, LOTHX_1.csv) → cm_production_lots.csv + cm_lot_manufacturing_dates.csv 변환
+(합산 없이 모든 행 개별 유지, 생산일/제조일은 lot_reconcile 규칙으로 정합)
 """
-import csv
-from datetime import datetime
+import sys
 from pathlib import Path
 
+from dates import calculate_expiry
+from lot_reconcile import (CONFLICTS_FILE, LOTHX_FILE, MFG_DATE_FIELDS, PRODUCTION_FILE, REGISTER_FILE,
+                           print_conflicts, reconcile, write_conflicts)
+from manifest import run_stage
+from pipeline import CsvSink, write_rows
+
 BASE_DIR = Path(__file__).parent.parent
 OUTPUT_DIR = BASE_DIR / "supabase_ready"
 OUTPUT_DIR.mkdir(exist_ok=True)
 
 
-def parse_date(date_str: str) -> str:
-    """'Mar 26, 2025 12:00 AM' → '2025-03-26'"""
-    if not date_str:
-        return ""
-    try:
-        dt = datetime.strptime(date_str.strip(), "%b %d, %Y %I:%M %p")
-        return dt.strftime("%Y-%m-%d")
-    except:
-        return date_str.split()[0] if date_str else ""
-
-
-def calculate_expiry(prod_date: str, years: int = 3) -> str:
-    """생산일 + 3년 = 유통기한"""
-    if not prod_date:
-        return ""
-    try:
-        dt = datetime.strptime(prod_date, "%Y-%m-%d")
-        expiry = dt.replace(year=dt.year + years)
-        return expiry.strftime("%Y-%m-%d")
-    except:
-        return ""
+LOT_FIELDS = ['lot_number', 'product_id', 'produced_qty',
+              'production_date', 'expiry_date']
 
 
 def main():
     print("=== Creating cm_production_lots.csv ===\n")
 
-    input_file = BASE_DIR / "PRODUCTION2.csv"
     output_file = OUTPUT_DIR / "cm_production_lots.csv"
+    dates_file = OUTPUT_DIR / "cm_lot_manufacturing_dates.csv"
 
-    lots = []
-
-    with open(input_file, "r", encoding="utf-8-sig") as f:
-        reader = csv.reader(f)
-        header = next(reader)  # Skip header
-
-        for row in reader:
-            if len(row) < 4:
-                continue
-
-            lot_number = row[0].strip()
-            product_id = row[1].strip()
-            qty = row[2].strip()
-            date_str = row[3]
-
-            if not lot_number or not product_id:
-                continue
-
-            production_date = parse_date(date_str)
-
-            # 날짜가 없으면 건너뛰기
-            if not production_date:
-                continue
-
-            try:
-                produced_qty = int(float(qty))
-            except:
-                produced_qty = 0
-
-            expiry_date = calculate_expiry(production_date)
+    # 세 원본을 LOT 번호로 조인해 생산일 확정 + 제조일 목록
+    lots, mfg_dates, conflicts = reconcile()
 
-            lots.append({
-                'lot_number': lot_number,
-                'product_id': product_id,
-                'produced_qty': produced_qty,
-                'production_date': production_date,
-                'expiry_date': expiry_date,
-            })
+    # 유통기한 = 생산일 + 3년 (일괄 계산)
+    expiries = calculate_expiry(lot['production_date'] for lot in lots)
+    for lot, expiry_date in zip(lots, expiries):
+        lot['expiry_date'] = expiry_date
 
     # CSV 저장
-    with open(output_file, "w", encoding="utf-8", newline="") as f:
-        fieldnames = ['lot_number', 'product_id', 'produced_qty',
-                     'production_date', 'expiry_date']
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(lots)
+    write_rows(output_file, LOT_FIELDS, lots)
+    with CsvSink(dates_file, MFG_DATE_FIELDS) as out:
+        for row in mfg_dates:
+            out.write_values(row)
+    write_conflicts(conflicts)
 
     print(f"Created: {output_file.name} ({len(lots)} rows)")
+    print(f"Created: {dates_file.name} ({len(mfg_dates)} rows)")
+    print(f"Created: {CONFLICTS_FILE.parent.name}/{CONFLICTS_FILE.name} ({len(conflicts)} rows)")
 
     # 통계
     products = set(l['product_id'] for l in lots)
     lot_numbers = set(l['lot_number'] for l in lots)
     print(f"Unique products: {len(products)}")
-    print(f"Unique lot numbers: {len(lot_numbers)}")
+    print(f"Unique lot numbers: {len(lot_numbers)}\n")
+    print_conflicts(conflicts)
 
 
 if __name__ == "__main__":
-    main()
+    run_stage("create_lot_csv", main,
+              inputs=[PRODUCTION_FILE, LOTHX_FILE, REGISTER_FILE],
+              outputs=[OUTPUT_DIR / "cm_production_lots.csv", OUTPUT_DIR / "cm_lot_manufacturing_dates.csv",
+                       CONFLICTS_FILE],
+              sources=[__file__], force="--force" in sys.argv[1:])
     print("\n=== Done! ===")
@@ -1,28 +1,44 @@
 """
 merged_order_history.csv에서 모든 행 유지하여 orders/order_items 생성
 - order_id: RU-2025-01 형식 (월별)
-- destination: 각 행에 유지
+- destination: 각 행에 유지 (ru_orders는 varchar(100) 이내로 자름)
+- requested_qty <= 0 인 행 제외 (CHECK requested_qty > 0)
+- 단가는 ru_prices.csv(prices.py)의 주문일 기준 가격으로 대조
+  - 가격 컬럼이 한 칸씩 밀린 것으로 보이는 행(공급가 자리에 다른 값, 수수료 = 공급가, 결제단가 = 수수료)은
+    price_reconcile/shifted_prices.csv에 기록하고 원본 값 유지 (--fix-shifted-prices: 단가/합계 복원)
+  - 그 밖에 기준 가격과 다른 행은 원본 값 유지 (통계에만 기록)
+- total_cartons: 아이템별 ceil(수량 / 입수) 합계, 입수는 ru_products.csv 우선 (order_logistics.ProductIndex)
+- ProductCode가 빈 행은 EnglishName을 제품명 n-gram 색인(product_matcher)으로 확정한 코드로 채움 (확정 못 하면 제외)
+- Destination은 목적지 분류기(destinations)의 표준 표기로 통일 (분류할 수 없는 값은 원본 유지, 통계에 기록)
 - SourceFile 컬럼만 제외
 """
-import csv
 import re
+import sys
+from functools import partial
 from pathlib import Path
 from collections import defaultdict
+from typing import Iterator, Optional
+
+from dates import normalize_date
+from destinations import classify
+from manifest import run_stage
+from order_logistics import PRODUCTS_FILE, load_product_index
+from pipeline import CsvSink, read_header, read_records, transform_csv, write_rows
+from prices import PRICES_FILE, Price, PriceIndex, consistent
+from product_matcher import load_name_index
+from records import record_class, table_record
+from run_report import current_stats
 
 BASE_DIR = Path(__file__).parent.parent
 OUTPUT_DIR = BASE_DIR / "supabase_ready"
 OUTPUT_DIR.mkdir(exist_ok=True)
+PRICE_REPORT_DIR = BASE_DIR / "price_reconcile"
+SHIFTED_PRICES_FILE = PRICE_REPORT_DIR / "shifted_prices.csv"
 
 
 def extract_year_month(date_str: str) -> str:
     """날짜에서 YYYY-MM 추출"""
-    if not date_str:
-        return ""
-    date_str = date_str.strip()
-    match = re.match(r'(\d{4})-(\d{2})', date_str)
-    if match:
-        return f"{match.group(1)}-{match.group(2)}"
-    return ""
+    return normalize_date(date_str)[:7]
 
 
 def generate_order_id(year_month: str) -> str:
@@ -32,123 +48,215 @@ def generate_order_id(year_month: str) -> str:
     return f"RU-{year_month}"
 
 
-def process_order_history():
-    """merged_order_history.csv → ru_orders.csv + ru_order_items.csv"""
-    input_file = BASE_DIR / "merged_order_history.csv"
-    orders_file = OUTPUT_DIR / "ru_orders.csv"
-    items_file = OUTPUT_DIR / "ru_order_items.csv"
+ORDER_FIELDS = ['id', 'order_number', 'order_date', 'destination', 'status',
+                'total_qty', 'total_cartons', 'total_amount', 'remarks']
+ORDER_ITEM_FIELDS = ['order_id', 'product_code', 'product_name', 'destination',
+                     'pcs_per_ctn', 'requested_qty', 'supply_price', 'commission',
+                     'unit_price', 'supply_total', 'commission_total', 'subtotal']
 
-    # 월별 데이터 수집
-    month_data = defaultdict(lambda: {
-        'items': [],
+SHIFTED_PRICE_FIELDS = ['order_id', 'order_date', 'product_code', 'requested_qty',
+                        'supply_price', 'commission', 'unit_price', 'supply_total', 'commission_total', 'subtotal',
+                        'asof_supply_price', 'asof_commission', 'asof_final_price']
+
+# ru_orders.destination varchar(100)
+DESTINATION_LIMIT = 100
+
+
+# ru_order_items 숫자 필드 ← 원본 컬럼
+NUMERIC_FIELDS = {
+    'pcs_per_ctn': 'PcsPerCtn',
+    'requested_qty': 'Quantity',
+    'supply_price': 'SupplyPriceUnit',
+    'commission': 'CommissionUnit',
+    'unit_price': 'PaymentAmountUnit',
+    'supply_total': 'SupplyPriceTotal',
+    'commission_total': 'CommissionTotal',
+    'subtotal': 'PaymentAmountTotal',
+}
+
+
+def parse_int(val) -> Optional[int]:
+    """숫자 필드 변환 ("3348.0" → 3348, 빈 값 → 0, 변환 실패 → None)"""
+    try:
+        return int(float(val)) if val else 0
+    except (ValueError, TypeError, OverflowError):
+        return None
+
+
+# merged_order_history.csv 에서 읽는 컬럼
+HistoryRow = record_class("HistoryRow", ['OrderDate', 'ProductCode', 'EnglishName', 'Destination',
+                                         *NUMERIC_FIELDS.values()])
+OrderItem = table_record("ru_order_items", ORDER_ITEM_FIELDS)
+
+
+def iter_order_items(input_file: Path) -> Iterator[tuple]:
+    """merged_order_history.csv → (주문일, ru_order_items 레코드) 스트리밍"""
+    stats = current_stats()
+    month_ids = {}  # 원본 날짜 문자열 → order_id (날짜 종류가 적어 한 번만 변환)
+    names = None    # 제품명 색인 (ProductCode가 빈 행이 나올 때 생성)
+    for row in read_records(input_file, HistoryRow):
+        order_date = row.OrderDate
+        order_id = month_ids.get(order_date)
+        if order_id is None:
+            order_id = month_ids[order_date] = generate_order_id(extract_year_month(order_date))
+
+        # 데이터 추출
+        product_code = row.ProductCode.strip()
+        if not product_code:
+            if names is None:
+                names = load_name_index()
+            match = names.match(row.EnglishName)
+            if match is None:
+                stats.drop("empty ProductCode (no name match)")
+                continue
+            product_code = match.product_code
+            stats.coerce("empty ProductCode (matched by EnglishName)")
+
+        numbers = []
+        for column in NUMERIC_FIELDS.values():
+            number = parse_int(getattr(row, column))
+            if number is None:
+                stats.coerce(f"unparsable {column}")
+                number = 0
+            numbers.append(number)
+
+        destination = classify(row.Destination)
+        item = OrderItem(order_id, product_code, row.EnglishName.replace('\n', ' ').strip(),
+                         destination.name if destination else row.Destination.strip(), *numbers)
+        if item.requested_qty <= 0:
+            stats.drop("requested_qty <= 0")
+            continue
+        if destination is None and item.destination:
+            stats.coerce("unrecognized Destination (kept)")
+        yield order_date, item
+
+
+def load_price_index() -> Optional[PriceIndex]:
+    """ru_prices.csv → PriceIndex (파일이 없으면 None → 단가 대조 생략)"""
+    if not PRICES_FILE.exists():
+        print(f"{PRICES_FILE.name} not found: skipping as-of price reconciliation (run prices.py first)")
+        return None
+    return PriceIndex.from_csv(PRICES_FILE)
+
+
+def is_shifted(item, asof) -> bool:
+    """밀린 행: 공급가+수수료≠결제단가 이고 (수수료, 결제단가) = 기준 (공급가, 수수료)"""
+    price = Price(item.supply_price, item.commission, item.unit_price)
+    return not consistent(price) and (price.commission, price.final_price) == asof[:2]
+
+
+def reconcile_price(item, asof, fix_shifted: bool = False) -> Optional[str]:
+    """
+    아이템 단가를 주문일 기준 가격(asof)과 대조, 처리 내용(통계 사유) 반환
+
+    밀린 행은 fix_shifted일 때만 단가/합계를 한 칸씩 당기고 결제단가/결제합계는 합으로 다시 계산
+    """
+    if asof is None:
+        return None
+    if is_shifted(item, asof):
+        if not fix_shifted:
+            return "shifted price columns (kept, see shifted_prices.csv)"
+        item.supply_price, item.commission = item.commission, item.unit_price
+        item.unit_price = item.supply_price + item.commission
+        item.supply_total, item.commission_total = item.commission_total, item.subtotal
+        item.subtotal = item.supply_total + item.commission_total
+        return "shifted price columns (restored from as-of price)"
+    if Price(item.supply_price, item.commission, item.unit_price) != asof:
+        return "price differs from as-of (kept)"
+    return None
+
+
+def new_month() -> dict:
+    """월별 누적 집계 초기값"""
+    return {
+        'item_count': 0,
         'destinations': set(),
         'total_qty': 0,
+        'total_cartons': 0,
         'total_amount': 0,
         'order_date': ''
-    })
-
-    all_items = []
-    item_count = 0
+    }
 
-    with open(input_file, "r", encoding="utf-8-sig") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            order_date = row.get('OrderDate', '')
-            year_month = extract_year_month(order_date)
-            order_id = generate_order_id(year_month)
 
-            # 데이터 추출
-            product_code = row.get('ProductCode', '').strip()
-            if not product_code:
-                continue
-
-            product_name = row.get('EnglishName', '').replace('\n', ' ').strip()
-            destination = row.get('Destination', '').strip()
-
-            # 숫자 필드 안전하게 변환
-            def safe_int(val):
-                try:
-                    return int(float(val)) if val else 0
-                except (ValueError, TypeError):
-                    return 0
-
-            pcs_per_ctn = safe_int(row.get('PcsPerCtn', 0))
-            qty = safe_int(row.get('Quantity', 0))
-            supply_price = safe_int(row.get('SupplyPriceUnit', 0))
-            commission = safe_int(row.get('CommissionUnit', 0))
-            unit_price = safe_int(row.get('PaymentAmountUnit', 0))
-            supply_total = safe_int(row.get('SupplyPriceTotal', 0))
-            commission_total = safe_int(row.get('CommissionTotal', 0))
-            subtotal = safe_int(row.get('PaymentAmountTotal', 0))
-
-            # 월별 집계
-            month_data[order_id]['destinations'].add(destination)
-            month_data[order_id]['total_qty'] += qty
-            month_data[order_id]['total_amount'] += subtotal
-            if not month_data[order_id]['order_date']:
-                month_data[order_id]['order_date'] = order_date
-
-            # 개별 아이템 (모든 행 유지)
-            item_count += 1
-            all_items.append({
-                'order_id': order_id,
-                'product_code': product_code,
-                'product_name': product_name,
-                'destination': destination,
-                'pcs_per_ctn': pcs_per_ctn,
-                'requested_qty': qty,
-                'supply_price': supply_price,
-                'commission': commission,
-                'unit_price': unit_price,
-                'supply_total': supply_total,
-                'commission_total': commission_total,
-                'subtotal': subtotal,
-            })
-
-    # ru_orders 생성
-    orders = []
+def iter_orders(month_data: dict) -> Iterator[dict]:
+    """월별 집계 → ru_orders 행"""
     for order_id in sorted(month_data.keys()):
         data = month_data[order_id]
         destinations = ', '.join(sorted(d for d in data['destinations'] if d))
 
-        orders.append({
+        yield {
             'id': order_id,
             'order_number': order_id,
             'order_date': data['order_date'],
-            'destination': destinations[:200] if len(destinations) > 200 else destinations,
+            'destination': destinations[:DESTINATION_LIMIT],
             'status': 'COMPLETED',
             'total_qty': data['total_qty'],
-            'total_cartons': 0,
+            'total_cartons': data['total_cartons'],
             'total_amount': data['total_amount'],
             'remarks': f"{len(data['destinations'])} destinations",
-        })
-
-    # Write ru_orders.csv
-    with open(orders_file, "w", encoding="utf-8", newline="") as f:
-        fieldnames = ['id', 'order_number', 'order_date', 'destination', 'status',
-                     'total_qty', 'total_cartons', 'total_amount', 'remarks']
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(orders)
-
-    # Write ru_order_items.csv (모든 필드 유지)
-    with open(items_file, "w", encoding="utf-8", newline="") as f:
-        fieldnames = ['order_id', 'product_code', 'product_name', 'destination',
-                     'pcs_per_ctn', 'requested_qty', 'supply_price', 'commission',
-                     'unit_price', 'supply_total', 'commission_total', 'subtotal']
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(all_items)
+        }
 
-    print(f"Created: {orders_file.name} ({len(orders)} orders)")
-    print(f"Created: {items_file.name} ({len(all_items)} items)")
+
+def write_orders(orders_file: Path, items_file: Path, month_data: dict, item_count: int):
+    """ru_orders.csv 저장 + 월별 통계 출력"""
+    order_count = write_rows(orders_file, ORDER_FIELDS, iter_orders(month_data))
+
+    print(f"Created: {orders_file.name} ({order_count} orders)")
+    print(f"Created: {items_file.name} ({item_count} items)")
 
     # 월별 통계
     print("\nMonthly breakdown:")
     for order_id in sorted(month_data.keys()):
         data = month_data[order_id]
-        items_count = sum(1 for i in all_items if i['order_id'] == order_id)
-        print(f"  {order_id}: {items_count} items, {len(data['destinations'])} destinations")
+        print(f"  {order_id}: {data['item_count']} items, {len(data['destinations'])} destinations")
+
+
+def process_order_history(fix_shifted_prices: bool = False):
+    """merged_order_history.csv → ru_orders.csv + ru_order_items.csv (+ 밀린 가격 의심 행 보고서)"""
+    input_file = BASE_DIR / "merged_order_history.csv"
+    orders_file = OUTPUT_DIR / "ru_orders.csv"
+    items_file = OUTPUT_DIR / "ru_order_items.csv"
+
+    stats = current_stats()
+    index = load_price_index()
+    products = load_product_index()
+
+    # 월별 누적 집계 (아이템은 보관하지 않고 바로 파일에 기록)
+    month_data = defaultdict(new_month)
+
+    PRICE_REPORT_DIR.mkdir(exist_ok=True)
+    with CsvSink(items_file, ORDER_ITEM_FIELDS) as items, \
+            CsvSink(SHIFTED_PRICES_FILE, SHIFTED_PRICE_FIELDS) as shifted:
+        for order_date, item in iter_order_items(input_file):
+            if index is not None:
+                asof = index.lookup(item.product_code, normalize_date(order_date))
+                if asof is not None and is_shifted(item, asof):
+                    # 보고서는 원본 값 기준
+                    shifted.write_values((item.order_id, order_date, item.product_code, item.requested_qty,
+                                          item.supply_price, item.commission, item.unit_price,
+                                          item.supply_total, item.commission_total, item.subtotal, *asof))
+                reason = reconcile_price(item, asof, fix_shifted_prices)
+                if reason:
+                    stats.coerce(reason)
+
+            data = month_data[item.order_id]
+            data['item_count'] += 1
+            data['destinations'].add(item.destination)
+            data['total_qty'] += item.requested_qty
+            if products is not None:
+                data['total_cartons'] += products.cartons(item.product_code, item.pcs_per_ctn,
+                                                          item.requested_qty)
+            data['total_amount'] += item.subtotal
+            if not data['order_date']:
+                data['order_date'] = order_date
+
+            # 개별 아이템 (모든 행 유지)
+            items.write_values(item)
+
+    write_orders(orders_file, items_file, month_data, items.count)
+    if shifted.count:
+        action = "restored" if fix_shifted_prices else "kept (use --fix-shifted-prices to restore)"
+        print(f"Shifted price columns: {shifted.count} items {action} → {SHIFTED_PRICES_FILE}")
 
 
 def process_packing_lists():
@@ -156,35 +264,38 @@ def process_packing_lists():
     input_file = BASE_DIR / "ru_packing_lists.csv"
     output_file = OUTPUT_DIR / "ru_packing_lists.csv"
 
-    rows = []
-    with open(input_file, "r", encoding="utf-8-sig") as f:
-        reader = csv.DictReader(f)
-        fieldnames = reader.fieldnames
-
-        for row in reader:
-            invoice_date = row.get('invoice_date', '')
-            year_month = extract_year_month(invoice_date)
-            row['order_id'] = generate_order_id(year_month)
-
-            # pl_number 정리
-            pl = row.get('pl_number', '')
-            row['pl_number'] = re.sub(r'\s+\d{2}:\d{2}:\d{2}', '', pl)
-            row['invoice_date'] = invoice_date.split()[0] if ' ' in invoice_date else invoice_date
+    def transform(row):
+        invoice_date = row.get('invoice_date', '')
+        year_month = extract_year_month(invoice_date)
+        row['order_id'] = generate_order_id(year_month)
 
-            rows.append(row)
+        # pl_number 정리
+        pl = row.get('pl_number', '')
+        row['pl_number'] = re.sub(r'\s+\d{2}:\d{2}:\d{2}', '', pl)
+        row['invoice_date'] = normalize_date(invoice_date)
+        return row
 
-    with open(output_file, "w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(rows)
+    count = transform_csv(input_file, output_file, read_header(input_file), transform)
 
-    print(f"\nCreated: {output_file.name} ({len(rows)} rows)")
+    print(f"\nCreated: {output_file.name} ({count} rows)")
 
 
 if __name__ == "__main__":
     print("=== Creating Orders (All Rows Preserved) ===\n")
 
-    process_order_history()
-    process_packing_lists()
+    force = "--force" in sys.argv[1:]
+    fix_shifted_prices = "--fix-shifted-prices" in sys.argv[1:]
+
+    run_stage("create_orders_v3.order_history",
+              partial(process_order_history, fix_shifted_prices=fix_shifted_prices),
+              inputs=[BASE_DIR / "merged_order_history.csv",
+                      *[p for p in [PRICES_FILE, PRODUCTS_FILE] if p.exists()]],
+              outputs=[OUTPUT_DIR / "ru_orders.csv", OUTPUT_DIR / "ru_order_items.csv", SHIFTED_PRICES_FILE],
+              sources=[__file__], force=force,
+              options={"fix_shifted_prices": True} if fix_shifted_prices else None)
+    run_stage("create_orders_v3.packing_lists", process_packing_lists,
+              inputs=[BASE_DIR / "ru_packing_lists.csv"],
+              outputs=[OUTPUT_DIR / "ru_packing_lists.csv"],
+              sources=[__file__], force=force)
 
     print("\n=== Done! ===")
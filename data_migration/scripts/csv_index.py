@@ -0,0 +1,263 @@
+"""
+메모리 매핑 CSV 읽기 + 레코드 시작 위치(byte offset) 인덱스
+
+- 줄바꿈이 따옴표 안에 있으면 같은 레코드로 처리 (ru_packing_items_final.csv의 제품명 등)
+  → 줄 단위 split('\n')과 달리 레코드 경계가 정확함
+- 인덱스는 .row_index/<파일명>.<경로 sha256 앞 16자리>.offsets 에 저장 (같은 이름의 다른 경로 파일과 구분),
+  파일 크기+mtime(다르면 sha256)이 같으면 재사용
+- 인덱스가 있으면 n번째 레코드를 바로 읽고 (전체 순차 파싱 없음),
+  레코드 범위 단위로 나눠 여러 프로세스에서 동시에 스캔 가능
+
+사용법:
+  python scripts/csv_index.py ru_packing_items_final.csv                 # 인덱스 생성 + 요약
+  python scripts/csv_index.py ru_packing_items_final.csv --row 1234      # 레코드 하나 출력
+  python scripts/csv_index.py ru_packing_items_final.csv --multiline     # 여러 줄 레코드 목록
+  python scripts/csv_index.py ru_packing_items_final.csv --chunks 4      # 작업 분할 범위
+"""
+import argparse
+import csv
+import hashlib
+import io
+import json
+import mmap
+import os
+import tempfile
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterator
+
+from manifest import sha256_file
+
+BASE_DIR = Path(__file__).parent.parent
+INDEX_DIR = BASE_DIR / ".row_index"
+
+_BOM = b"\xef\xbb\xbf"
+
+
+def scan_offsets(data, start: int = 0) -> array:
+    """
+    레코드 시작 위치 목록 (마지막 값 = 데이터 끝)
+
+    줄 단위로 따옴표 개수를 세어, 따옴표가 짝수 개로 끝나는 줄바꿈만 레코드 경계로 본다.
+    ("" 이스케이프는 따옴표 2개라 짝수성에 영향 없음)
+    """
+    offsets = array("q", [start])
+    size = len(data)
+    pos = start
+    quotes = 0
+    while pos < size:
+        end = data.find(b"\n", pos)
+        end = size if end < 0 else end + 1
+        quotes += data[pos:end].count(b'"')   # mmap에는 count가 없어 줄 단위로 잘라서 셈
+        if quotes % 2 == 0:
+            offsets.append(end)
+            quotes = 0
+        pos = end
+    if offsets[-1] != size:   # 닫히지 않은 따옴표 → 나머지를 마지막 레코드로
+        offsets.append(size)
+    return offsets
+
+
+def _atomic_write(path: Path, data: bytes):
+    """같은 폴더의 임시 파일에 쓴 뒤 os.replace (동시에 만드는 프로세스끼리 덮어써도 반쯤 쓴 파일이 안 보임)"""
+    fd, tmp = tempfile.mkstemp(prefix=f"{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def index_name(path: Path) -> str:
+    """인덱스 파일 이름 (파일명 + 절대 경로 해시)"""
+    resolved = str(Path(path).resolve())
+    return f"{Path(path).name}.{hashlib.sha256(resolved.encode('utf-8')).hexdigest()[:16]}"
+
+
+class IndexedCsv:
+    """레코드 인덱스가 있는 CSV (with 문 또는 close()로 닫기)"""
+
+    def __init__(self, path: Path, encoding: str = "utf-8-sig", index_dir: Path = INDEX_DIR):
+        self.path = Path(path)
+        self.encoding = encoding
+        self._file = open(self.path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        # 빈 파일은 mmap 불가
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self.offsets = self._load_index(Path(index_dir))
+        self.header = self._parse(self.offsets[0], self.offsets[1])[0] if len(self.offsets) > 1 else []
+
+    # --- 인덱스 ---
+
+    def _load_index(self, index_dir: Path) -> array:
+        stat = os.stat(self.path)
+        name = index_name(self.path)
+        meta_file = index_dir / f"{name}.json"
+        offsets_file = index_dir / f"{name}.offsets"
+
+        digest = None
+        if meta_file.exists() and offsets_file.exists():
+            meta = json.loads(meta_file.read_text(encoding="utf-8"))
+            fresh = meta["size"] == stat.st_size and meta["mtime_ns"] == stat.st_mtime_ns
+            if not fresh:
+                digest = sha256_file(self.path)
+                fresh = meta["sha256"] == digest
+            if fresh:
+                offsets = array("q")
+                offsets.frombytes(offsets_file.read_bytes())
+                return offsets
+
+        start = len(_BOM) if self._data[:len(_BOM)] == _BOM else 0
+        offsets = scan_offsets(self._data, start)
+
+        index_dir.mkdir(parents=True, exist_ok=True)
+        _atomic_write(offsets_file, offsets.tobytes())
+        _atomic_write(meta_file, json.dumps({
+            "path": str(self.path.resolve()),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": digest or sha256_file(self.path),
+            "records": len(offsets) - 1,
+        }).encode("utf-8"))
+        return offsets
+
+    # --- 읽기 ---
+
+    def _parse(self, start: int, end: int) -> list:
+        """byte 범위 → 파싱된 레코드 목록"""
+        text = self._data[start:end].decode(self.encoding)
+        return list(csv.reader(io.StringIO(text, newline="")))
+
+    def __len__(self) -> int:
+        """데이터 레코드 수 (헤더 제외)"""
+        return max(0, len(self.offsets) - 2)
+
+    def span(self, i: int) -> tuple:
+        """i번째 데이터 레코드의 (시작, 끝) byte 위치"""
+        if not 0 <= i < len(self):
+            raise IndexError(f"record {i} out of range (0..{len(self) - 1})")
+        return self.offsets[i + 1], self.offsets[i + 2]
+
+    def raw(self, i: int) -> bytes:
+        start, end = self.span(i)
+        return self._data[start:end]
+
+    def row(self, i: int) -> list:
+        """i번째 데이터 레코드 값 목록"""
+        rows = self._parse(*self.span(i))
+        return rows[0] if rows else []
+
+    def __getitem__(self, i: int) -> dict:
+        """i번째 데이터 레코드 {컬럼명: 값}"""
+        return dict(zip(self.header, self.row(i)))
+
+    def rows(self, start: int = 0, stop: int = None) -> Iterator[list]:
+        """[start, stop) 범위 레코드 스트리밍 (해당 byte 범위만 파싱)"""
+        stop = len(self) if stop is None else min(stop, len(self))
+        if start >= stop:
+            return
+        text = self._data[self.offsets[start + 1]:self.offsets[stop + 1]].decode(self.encoding)
+        yield from csv.reader(io.StringIO(text, newline=""))
+
+    def chunks(self, n: int) -> list:
+        """byte 크기가 비슷한 n개 레코드 범위 [(start, stop)]"""
+        total = len(self)
+        if total == 0:
+            return []
+        first, last = self.offsets[1], self.offsets[-1]
+        bounds = [0]
+        for k in range(1, n):
+            target = first + (last - first) * k // n
+            bounds.append(max(bounds[-1], _bisect(self.offsets, target, 1, total + 1) - 1))
+        bounds.append(total)
+        return [(a, b) for a, b in zip(bounds, bounds[1:]) if a < b]
+
+    def close(self):
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def _bisect(offsets: array, target: int, lo: int, hi: int) -> int:
+    """offsets[lo:hi]에서 target 이상인 첫 위치"""
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if offsets[mid] < target:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def _scan_chunk(args: tuple):
+    path, encoding, start, stop, func = args
+    with IndexedCsv(path, encoding) as table:
+        return func(table.header, table.rows(start, stop))
+
+
+def scan_parallel(path: Path, func: Callable, workers: int = None, encoding: str = "utf-8-sig") -> list:
+    """
+    레코드 범위별로 나눠 func(header, rows)를 여러 프로세스에서 실행, 범위 순서대로 결과 목록
+
+    func은 모듈 최상위 함수여야 함 (프로세스 간 전달)
+    """
+    workers = workers or os.cpu_count() or 1
+    with IndexedCsv(path, encoding) as table:   # 인덱스를 먼저 만들어 워커가 재사용
+        ranges = table.chunks(workers)
+    if len(ranges) <= 1:
+        return [_scan_chunk((path, encoding, a, b, func)) for a, b in ranges]
+    with ProcessPoolExecutor(max_workers=len(ranges)) as pool:
+        return list(pool.map(_scan_chunk, [(path, encoding, a, b, func) for a, b in ranges]))
+
+
+def _multiline_rows(header: list, rows: Iterator[list]) -> int:
+    return sum(1 for row in rows if any("\n" in value for value in row))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Random access / chunked scanning of a CSV via a record index")
+    parser.add_argument("file", type=Path, help="CSV path (relative to data_migration/ if not found)")
+    parser.add_argument("--row", type=int, nargs="+", help="print these data records (0-based)")
+    parser.add_argument("--multiline", action="store_true", help="list records with embedded newlines")
+    parser.add_argument("--chunks", type=int, help="show N byte-balanced record ranges")
+    parser.add_argument("--encoding", default="utf-8-sig")
+    args = parser.parse_args()
+
+    path = args.file if args.file.exists() else BASE_DIR / args.file
+    with IndexedCsv(path, args.encoding) as table:
+        print(f"{path.name}: {len(table)} records, {len(table.header)} columns, "
+              f"index {INDEX_DIR / (path.name + '.offsets')}")
+
+        for i in args.row or []:
+            start, end = table.span(i)
+            print(f"\n--- record {i} (bytes {start}-{end}) ---")
+            for column, value in table[i].items():
+                print(f"  {column}: {value!r}")
+
+        if args.multiline:
+            print("\nRecords with embedded newlines:")
+            for i, row in enumerate(table.rows()):
+                if any("\n" in value for value in row):
+                    print(f"  {i}: {row[:4]}")
+
+        if args.chunks:
+            print(f"\n{args.chunks} chunks:")
+            for start, stop in table.chunks(args.chunks):
+                a, b = table.offsets[start + 1], table.offsets[stop + 1]
+                print(f"  records {start}-{stop - 1} ({stop - start} records, {b - a} bytes)")
+            counts = scan_parallel(path, _multiline_rows, args.chunks, args.encoding)
+            print(f"Multi-line records per chunk: {counts}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+날짜 정규화 (모든 스크립트 공용)
+
+지원 형식 → 'YYYY-MM-DD'
+- iso:     "2025-01-27", "2025-01-27 00:00:00"   (packing lists, order history)
+- text:    "Mar 26, 2025 12:00 AM"               (PRODUCTION2.csv, LOTHX.csv)
+- dotted:  "2025.6.13 0:00"                      (LOTHX_1.csv)
+- compact: "20250127", "20250127 00:00:00"       (일부 packing lists)
+
+컬럼별로 DateParser를 하나 만들어 쓰면 첫 값으로 형식을 감지한 뒤 해당 형식의
+빠른 경로로 파싱하고, 같은 값은 캐시에서 바로 반환한다.
+"""
+import re
+from datetime import date
+from typing import Callable, Iterable, Optional
+
+_MONTHS = {name: i for i, name in enumerate(
+    ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"], 1)}
+
+
+def _parse_iso(value: str) -> tuple:
+    year, month, day = value.split()[0].split("-")
+    return int(year), int(month), int(day)
+
+
+def _parse_text(value: str) -> tuple:
+    month, day, year = value.replace(",", " ").split()[:3]
+    return int(year), _MONTHS[month[:3].title()], int(day)
+
+
+def _parse_dotted(value: str) -> tuple:
+    year, month, day = value.split()[0].split(".")
+    return int(year), int(month), int(day)
+
+
+def _parse_compact(value: str) -> tuple:
+    digits = value.split()[0]
+    return int(digits[:4]), int(digits[4:6]), int(digits[6:8])
+
+
+# 형식명: (감지용 정규식, 빠른 파서)
+FORMATS = {
+    "iso": (re.compile(r"\d{4}-\d{1,2}-\d{1,2}(\s|$)"), _parse_iso),
+    "text": (re.compile(r"[A-Za-z]{3}[a-z]*\.?\s+\d{1,2},?\s+\d{4}(\s|$)"), _parse_text),
+    "dotted": (re.compile(r"\d{4}\.\d{1,2}\.\d{1,2}(\s|$)"), _parse_dotted),
+    "compact": (re.compile(r"\d{8}(\s|$)"), _parse_compact),
+}
+
+
+def detect_format(value: str) -> Optional[str]:
+    """값 하나로 형식 감지 (모르는 형식이면 None)"""
+    value = value.strip()
+    for name, (pattern, _) in FORMATS.items():
+        if pattern.match(value):
+            return name
+    return None
+
+
+class DateParser:
+    """컬럼 하나를 위한 날짜 파서 (형식 감지 1회 + 값 캐시)"""
+
+    def __init__(self, fmt: Optional[str] = None):
+        self.format = fmt
+        self._parse: Optional[Callable[[str], tuple]] = FORMATS[fmt][1] if fmt else None
+        self._cache = {}
+
+    def __call__(self, value: str) -> str:
+        """'YYYY-MM-DD' 반환 (빈 값/해석 불가 → '')"""
+        try:
+            return self._cache[value]
+        except KeyError:
+            pass
+        result = self._normalize(value)
+        self._cache[value] = result
+        return result
+
+    def _normalize(self, value: str) -> str:
+        text = value.strip() if value else ""
+        if not text:
+            return ""
+
+        if self._parse is None:
+            self.format = detect_format(text)
+            if self.format is None:
+                return ""
+            self._parse = FORMATS[self.format][1]
+
+        try:
+            return _format(*self._parse(text))
+        except (ValueError, KeyError, IndexError):
+            pass
+
+        # 감지된 형식과 다른 값이 섞인 경우
+        fmt = detect_format(text)
+        if fmt is None or fmt == self.format:
+            return ""
+        try:
+            return _format(*FORMATS[fmt][1](text))
+        except (ValueError, KeyError, IndexError):
+            return ""
+
+    def parse_all(self, values: Iterable[str]) -> list:
+        return [self(v) for v in values]
+
+
+def _format(year: int, month: int, day: int) -> str:
+    """존재하는 날짜인지 검증 후 'YYYY-MM-DD'"""
+    return date(year, month, day).isoformat()
+
+
+_shared_parser = DateParser()
+
+
+def normalize_date(value: str) -> str:
+    """컬럼 구분 없이 쓰는 공용 파서 (형식이 섞여 있어도 값별로 처리, 캐시 공유)"""
+    return _shared_parser(value)
+
+
+def add_years(iso_date: str, years: int) -> str:
+    """'YYYY-MM-DD' + n년 (대상 연도에 2월 29일이 없으면 2월 28일)"""
+    year, month, day = (int(p) for p in iso_date.split("-"))
+    try:
+        return date(year + years, month, day).isoformat()
+    except ValueError:
+        if month == 2 and day == 29:
+            return date(year + years, 2, 28).isoformat()
+        raise
+
+
+def calculate_expiry(prod_dates: Iterable[str], years: int = 3) -> list:
+    """생산일 목록 → 유통기한 목록 (생산일 + n년, 빈 값/잘못된 값은 '')"""
+    cache = {}
+    result = []
+    for prod_date in prod_dates:
+        expiry = cache.get(prod_date)
+        if expiry is None:
+            try:
+                expiry = add_years(prod_date, years) if prod_date else ""
+            except ValueError:
+                expiry = ""
+            cache[prod_date] = expiry
+        result.append(expiry)
+    return result
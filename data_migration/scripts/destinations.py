@@ -0,0 +1,192 @@
+"""
+목적지 / 지역 코드 분류 (목적지 사전 → Aho–Corasick 다중 패턴 매처 1개)
+
+- DESTINATIONS: 표준 표기(발주 이력과 같은 '한글 ENGLISH'), 지역 코드(RU/BY/KZ), 상위 도시, 별칭(한/영)
+  - 모든 별칭을 한 오토마톤으로 컴파일 → 문자열을 한 번 훑어 일치하는 별칭을 모두 찾음
+  - 영문 별칭은 단어 경계에서만 인정 ('pfo'가 다른 단어 안에 있으면 무시)
+  - 거래처 목적지(모스크바 PFO)와 상위 도시(모스크바)가 함께 맞으면 거래처 목적지
+  - 서로 다른 목적지가 함께 맞거나 아무것도 없으면 None
+- PL_SUFFIXES: pl_number 끝의 목적지 약어 (PL-20250127-OV5파렛트 → OV)
+  - 월별 발주 이력 목적지와 패킹리스트를 대조해 정한 값 (목적지 이름의 끝 글자)
+  - '스크'처럼 여러 목적지에 해당하는 약어는 후보가 하나로 좁혀질 때만 (within)
+- 같은 문자열은 한 번만 분류 (캐시)
+
+create_orders_v3 (Destination 표준 표기), fix_packing_v2 (빈 destination을 PL 약어로),
+pallet_planner (--destination)가 같은 매처를 씀
+
+사용법:
+  python scripts/destinations.py "블라디보스톡 VLADIVOSTOK" PL-20250127-OV5 "pcs / 1 CTN"
+"""
+import argparse
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Iterable, NamedTuple, Optional
+
+
+class Destination(NamedTuple):
+    name: str                      # 표준 표기
+    region: str                    # RU / BY / KZ
+    parent: Optional[str] = None   # 거래처 목적지의 상위 도시 표준 표기
+
+
+# 표준 표기 → (지역, 상위 도시, 별칭)
+DESTINATIONS = {
+    "모스크바 MOSCOW": ("RU", None, ("모스크바", "moscow", "москва")),
+    "모스크바 MOSCOW PFO": ("RU", "모스크바 MOSCOW", ("pfo",)),
+    "모스크바 MOSCOW EFIMOV": ("RU", "모스크바 MOSCOW", ("efimov", "에피모프")),
+    "모스크바 MOSCOW VLK": ("RU", "모스크바 MOSCOW", ("vlk",)),
+    "모스크바 MOSCOW AFRODITA": ("RU", "모스크바 MOSCOW", ("afrodita", "아프로디타")),
+    "블라디보스톡 VLADIVOSTOK": ("RU", None, ("블라디보스톡", "블라디보스토크", "vladivostok", "vladivistok",
+                                         "владивосток")),
+    "크라스노다르 KRASNODAR": ("RU", None, ("크라스노다르", "krasnodar", "краснодар")),
+    "노보시비르스크 NOVOSIBIRSK": ("RU", None, ("노보시비르스크", "novosibirsk", "новосибирск")),
+    "민스크 MINSK": ("BY", None, ("민스크", "minsk", "минск", "belarus", "벨라루스")),
+    "카자흐스탄 KAZAKHSTAN": ("KZ", None, ("카자흐스탄", "kazakhstan", "kazakh", "казахстан", "almaty", "알마티",
+                                     "астана", "astana")),
+}
+
+# pl_number 목적지 약어 → 표준 표기 후보
+PL_SUFFIXES = {
+    "OV": ("모스크바 MOSCOW EFIMOV",),
+    "FO": ("모스크바 MOSCOW PFO",),
+    "TA": ("모스크바 MOSCOW AFRODITA",),
+    "다르": ("크라스노다르 KRASNODAR",),
+    "블라": ("블라디보스톡 VLADIVOSTOK",),
+    "스톡": ("블라디보스톡 VLADIVOSTOK",),
+    "톡": ("블라디보스톡 VLADIVOSTOK",),
+    "스크": ("노보시비르스크 NOVOSIBIRSK", "민스크 MINSK"),
+    "크": ("노보시비르스크 NOVOSIBIRSK", "민스크 MINSK"),
+}
+
+_SPACES = re.compile(r"\s+")
+_PL_SUFFIX = re.compile(r"^PL-[^-]+-(\D+?)\d*(?:파렛트|파레트)?(?:-[A-Z]+)?$")
+
+
+def _normalize(text: str) -> str:
+    return _SPACES.sub(" ", text.lower()).strip()
+
+
+def _is_word(ch: str) -> bool:
+    return ch.isascii() and ch.isalnum()
+
+
+class DestinationMatcher:
+    """별칭 사전을 컴파일한 Aho–Corasick 오토마톤"""
+
+    def __init__(self, destinations: dict = DESTINATIONS):
+        self.destinations = {name: Destination(name, region, parent)
+                             for name, (region, parent, _) in destinations.items()}
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]   # 상태별 (별칭 길이, 영문 여부, 표준 표기)
+        for name, (_, _, aliases) in destinations.items():
+            for alias in (*aliases, name):
+                self._add(_normalize(alias), name)
+        self._link()
+        self.classify = lru_cache(maxsize=None)(self._classify)
+
+    def _add(self, pattern: str, name: str):
+        state = 0
+        for ch in pattern:
+            state = self._goto[state].setdefault(ch, len(self._goto))
+            if state == len(self._goto):
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+        self._output[state] += ((len(pattern), pattern.isascii(), name),)
+
+    def _link(self):
+        """실패 링크 (BFS), 출력은 실패 링크 상태의 출력까지 합침"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, child in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(ch, 0)
+                self._output[child] += self._output[self._fail[child]]
+                queue.append(child)
+
+    def find(self, text: str) -> list:
+        """text에서 일치한 표준 표기 목록 (등장 순서, 중복 포함)"""
+        text = _normalize(text)
+        found = []
+        state = 0
+        for end, ch in enumerate(text, 1):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for length, ascii_only, name in self._output[state]:
+                start = end - length
+                if ascii_only and ((start > 0 and _is_word(text[start - 1])) or
+                                   (end < len(text) and _is_word(text[end]))):
+                    continue
+                found.append(name)
+        return found
+
+    def _classify(self, text: str) -> Optional[Destination]:
+        names = set(self.find(text))
+        # 거래처 목적지가 맞으면 상위 도시는 제외
+        names -= {self.destinations[n].parent for n in names}
+        if len(names) != 1:
+            return None
+        return self.destinations[names.pop()]
+
+    def classify_pl(self, pl_number: str, within: Optional[Iterable[str]] = None) -> Optional[Destination]:
+        """pl_number 끝 약어 → 목적지 (후보가 여럿이면 within(표준 표기)으로 좁혀 하나일 때만)"""
+        candidates = PL_SUFFIXES.get(pl_suffix(pl_number), ())
+        if len(candidates) > 1 and within is not None:
+            within = set(within)
+            candidates = [c for c in candidates if c in within]
+        return self.destinations[candidates[0]] if len(candidates) == 1 else None
+
+
+def pl_suffix(pl_number: str) -> str:
+    """'PL-20250127-OV5' / 'PL-20250127 00:00:00-스크2파렛트-B' → 'OV' / '스크' (없으면 '')"""
+    match = _PL_SUFFIX.match(pl_number.strip())
+    return match.group(1) if match else ""
+
+
+_matcher = None
+
+
+def matcher() -> DestinationMatcher:
+    """공유 매처 (처음 호출할 때 컴파일)"""
+    global _matcher
+    if _matcher is None:
+        _matcher = DestinationMatcher()
+    return _matcher
+
+
+def classify(text: str) -> Optional[Destination]:
+    return matcher().classify(text)
+
+
+def canonical_destination(text: str) -> str:
+    """표준 표기, 분류할 수 없으면 원본 (앞뒤 공백 제거)"""
+    destination = classify(text)
+    return destination.name if destination else text.strip()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Classify destinations / PL numbers")
+    parser.add_argument("values", nargs="+", help="destination strings or pl_numbers")
+    args = parser.parse_args()
+
+    m = matcher()
+    for value in args.values:
+        is_pl = value.startswith("PL-")
+        destination = m.classify_pl(value) if is_pl else m.classify(value)
+        if destination:
+            result = f"{destination.name} ({destination.region})"
+        elif is_pl and PL_SUFFIXES.get(pl_suffix(value)):
+            result = f"ambiguous: {', '.join(PL_SUFFIXES[pl_suffix(value)])}"
+        else:
+            result = "unknown suffix" if is_pl else "unrecognized"
+        print(f"  {value:<40} → {result}")
+
+
+if __name__ == "__main__":
+    main()
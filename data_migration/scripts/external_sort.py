@@ -0,0 +1,265 @@
+"""
+외부 정렬 기반 중복 제거 / 그룹 집계 (메모리보다 큰 LOT·이력 파일용)
+
+- 행을 메모리 예산(--memory-mb)만큼 모아 키 순으로 정렬한 run을 임시 CSV로 내보내고,
+  run들을 heapq.merge로 k-way 병합 (run이 MAX_FAN_IN개를 넘으면 여러 단계로 병합)
+- 키: 복합 컬럼 (예: lot_number, product_id, production_date)
+  - --dates 컬럼은 YYYY-MM-DD로 정규화한 값으로 비교/기록 ('Mar 26, 2025 12:00 AM' 등 원본 형식)
+- 같은 키 안에서는 원본 순서 유지 (정렬은 안정 정렬, run은 원본 순서대로 만들어짐)
+- 모드
+  - suffix: 같은 키의 두 번째 행부터 --suffix-column 값에 -B, -C, ... (fix_packing_v2 pl_number 규칙)
+  - first:  키별 첫 행만
+  - sum:    키별 첫 행 + --sum 컬럼 합계
+- 출력은 키 순서
+
+사용법:
+  python scripts/external_sort.py PRODUCTION2.csv --key "Lot No" prdcode 생산일 --dates 생산일 \\
+      --mode sum --sum "생산 완료 수량" --out /tmp/production_grouped.csv
+  python scripts/external_sort.py supabase_ready/cm_production_lots.csv \\
+      --key lot_number product_id production_date --mode first --memory-mb 16 --out /tmp/lots.csv
+"""
+import argparse
+import csv
+import heapq
+import itertools
+import sys
+import tempfile
+from decimal import Decimal, InvalidOperation
+from operator import itemgetter
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+from dates import DateParser
+from pipeline import CsvSink, read_header
+from run_report import current_stats, instrument
+
+BASE_DIR = Path(__file__).parent.parent
+
+DEFAULT_MEMORY_MB = 256
+MAX_FAN_IN = 64       # 한 번에 병합하는 run 파일 수 (열린 파일 수 제한)
+MODES = ("suffix", "first", "sum")
+SAMPLE_EVERY = 16     # 행 크기는 16행마다 1행을 재서 추정
+
+
+def suffixed(base: str, occurrence: int) -> str:
+    """
+    occurrence번째(1부터) 값 → 첫 번째는 그대로, 이후 base-B, base-C, ... (fix_packing_v2 규칙)
+
+    Z 다음은 AA, AB, ... (스프레드시트 컬럼 방식)
+    """
+    if occurrence <= 1:
+        return base
+    n = occurrence - 1
+    letters = ""
+    while n >= 0:
+        letters = chr(ord('A') + n % 26) + letters
+        n = n // 26 - 1
+    return f"{base}-{letters}"
+
+
+def _row_bytes(row: list) -> int:
+    """메모리에 든 행 크기 추정 (리스트 + 문자열 객체, 행 번호/정렬 키 참조 포함)"""
+    return sys.getsizeof(row) + sum(map(sys.getsizeof, row)) + 64
+
+
+class ExternalSorter:
+    """
+    메모리 예산 안에서 정렬 (넘치면 정렬된 run을 임시 파일로 내보내고 k-way 병합)
+
+    with ExternalSorter(key, memory_bytes) as sorter:
+        for row in rows: sorter.add(row)
+        for row in sorter.sorted(): ...
+    """
+
+    def __init__(self, key: Callable[[list], tuple], memory_bytes: int,
+                 tmp_dir: Optional[Path] = None, fan_in: int = MAX_FAN_IN):
+        self.key = key
+        self.memory_bytes = memory_bytes
+        self.fan_in = fan_in
+        self.runs = []           # 임시 run 파일 (원본 순서)
+        self.spilled_runs = 0
+        self.merge_passes = 0
+        self._tmp_parent = tmp_dir
+        self._tmp = None
+        self._files = 0
+        self._buffer = []
+        self._buffer_bytes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._tmp is not None:
+            self._tmp.cleanup()
+            self._tmp = None
+        return False
+
+    def _run_path(self) -> Path:
+        if self._tmp is None:
+            self._tmp = tempfile.TemporaryDirectory(prefix="external_sort_", dir=self._tmp_parent)
+        self._files += 1
+        return Path(self._tmp.name) / f"run_{self._files:06d}.csv"
+
+    def add(self, row: list):
+        self._buffer.append(row)
+        if len(self._buffer) % SAMPLE_EVERY == 0:
+            self._buffer_bytes += _row_bytes(row) * SAMPLE_EVERY
+            if self._buffer_bytes >= self.memory_bytes:
+                self._spill()
+
+    def _spill(self):
+        """버퍼를 정렬해 run 파일 하나로 기록"""
+        self._buffer.sort(key=self.key)
+        path = self._run_path()
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            csv.writer(f).writerows(self._buffer)
+        self.runs.append(path)
+        self.spilled_runs += 1
+        self._buffer = []
+        self._buffer_bytes = 0
+
+    def _read_run(self, path: Path) -> Iterator[list]:
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            yield from csv.reader(f)
+
+    def _merge_runs(self, paths: list) -> Path:
+        """run 여러 개 → 병합한 run 하나 (입력 run 파일은 삭제)"""
+        self.merge_passes += 1
+        path = self._run_path()
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            csv.writer(f).writerows(heapq.merge(*map(self._read_run, paths), key=self.key))
+        for p in paths:
+            p.unlink()
+        return path
+
+    def sorted(self) -> Iterator[list]:
+        """키 순 (같은 키는 add 순서) 전체 행"""
+        if not self.runs:
+            self._buffer.sort(key=self.key)
+            yield from self._buffer
+            return
+        if self._buffer:
+            self._spill()
+        # heapq.merge는 키가 같으면 앞쪽 입력을 먼저 내보냄 → 인접 run끼리 묶어 병합하면 순서 유지
+        while len(self.runs) > self.fan_in:
+            batches = [self.runs[i:i + self.fan_in] for i in range(0, len(self.runs), self.fan_in)]
+            self.runs = [self._merge_runs(batch) if len(batch) > 1 else batch[0] for batch in batches]
+        yield from heapq.merge(*map(self._read_run, self.runs), key=self.key)
+
+
+def _decimal(value: str) -> Optional[Decimal]:
+    try:
+        return Decimal(value.replace(",", "")) if value.strip() else Decimal(0)
+    except InvalidOperation:
+        return None
+
+
+def resolve(rows: Iterator[list], key: Callable[[list], tuple], mode: str,
+            suffix_index: Optional[int] = None, sum_indexes: tuple = ()) -> Iterator[list]:
+    """키 순으로 정렬된 행 → 모드별 결과 행"""
+    stats = current_stats()
+    for _, group in itertools.groupby(rows, key=key):
+        if mode == "suffix":
+            for occurrence, row in enumerate(group, 1):
+                if occurrence > 1 and row[suffix_index]:
+                    row[suffix_index] = suffixed(row[suffix_index], occurrence)
+                    stats.coerce("duplicate key (suffixed)")
+                yield row
+            continue
+
+        first = next(group)
+        rest = list(group)
+        if not rest:
+            yield first
+            continue
+        stats.drop("duplicate key (merged)" if mode == "sum" else "duplicate key", len(rest))
+        if mode == "sum":
+            for i in sum_indexes:
+                values = [_decimal(row[i]) for row in (first, *rest)]
+                if None in values:
+                    stats.coerce("unparsable sum column (not summed)")
+                    continue
+                first[i] = str(sum(values))
+        yield first
+
+
+def dedupe(input_file: Path, output_file: Path, key_columns: list, mode: str = "suffix",
+           suffix_column: Optional[str] = None, sum_columns: tuple = (), date_columns: tuple = (),
+           memory_mb: float = DEFAULT_MEMORY_MB, tmp_dir: Optional[Path] = None) -> ExternalSorter:
+    """CSV 하나를 복합 키로 외부 정렬 + 모드별 중복 처리, 사용한 정렬기(run/병합 횟수) 반환"""
+    header = read_header(input_file)
+    missing = [c for c in (*key_columns, *sum_columns, *date_columns, *filter(None, [suffix_column]))
+               if c not in header]
+    if missing:
+        raise ValueError(f"Columns not in {input_file.name}: {', '.join(missing)}")
+    if mode == "suffix" and suffix_column is None:
+        raise ValueError("--suffix-column is required for mode 'suffix'")
+
+    index = {name: i for i, name in enumerate(header)}
+    key = itemgetter(*(index[c] for c in key_columns))
+    parsers = [(index[c], DateParser()) for c in date_columns]
+    width = len(header)
+
+    stats = current_stats()
+    with ExternalSorter(key, int(memory_mb * 1024 * 1024), tmp_dir) as sorter:
+        rows_read = 0
+        with open(input_file, "r", encoding="utf-8-sig", newline="") as f:
+            reader = csv.reader(f)
+            next(reader)
+            for row in reader:
+                if not row:
+                    continue
+                rows_read += 1
+                if len(row) != width:
+                    row = (row + [""] * width)[:width]
+                for i, parse_date in parsers:
+                    value = parse_date(row[i])
+                    if row[i] and not value:
+                        stats.coerce(f"unparsable {header[i]} (kept)")
+                        continue
+                    row[i] = value
+                sorter.add(row)
+        stats.read(input_file, rows_read)
+
+        with CsvSink(output_file, header) as out:
+            for row in resolve(sorter.sorted(), key, mode,
+                               index.get(suffix_column), tuple(index[c] for c in sum_columns)):
+                out.write_values(row)
+    return sorter
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deduplicate / group a CSV by a composite key "
+                                                 "with a bounded-memory external sort")
+    parser.add_argument("input", type=Path, help="CSV file (relative to data_migration/ or absolute)")
+    parser.add_argument("--key", nargs="+", required=True, help="key columns, e.g. lot_number product_id")
+    parser.add_argument("--mode", choices=MODES, default="suffix")
+    parser.add_argument("--suffix-column", help="column that gets -B, -C, ... (mode suffix)")
+    parser.add_argument("--sum", nargs="+", default=[], help="columns summed per key (mode sum)")
+    parser.add_argument("--dates", nargs="+", default=[], help="date columns normalized to YYYY-MM-DD")
+    parser.add_argument("--memory-mb", type=float, default=DEFAULT_MEMORY_MB, help="in-memory sort budget")
+    parser.add_argument("--tmp-dir", type=Path, help="where sorted runs are spilled (default: system temp)")
+    parser.add_argument("--out", type=Path, required=True, help="output CSV")
+    args = parser.parse_args()
+
+    input_file = args.input if args.input.is_absolute() or args.input.exists() else BASE_DIR / args.input
+    print(f"=== External sort: {input_file.name} by {', '.join(args.key)} ({args.mode}) ===\n")
+    try:
+        with instrument("external_sort") as stats:
+            sorter = dedupe(input_file, args.out, args.key, args.mode, args.suffix_column,
+                            tuple(args.sum), tuple(args.dates), args.memory_mb, args.tmp_dir)
+    except ValueError as e:
+        print(e)
+        sys.exit(1)
+
+    if sorter.spilled_runs:
+        print(f"Spilled {sorter.spilled_runs} sorted runs ({args.memory_mb:g} MB budget), "
+              f"{sorter.merge_passes} intermediate merges")
+    else:
+        print(f"Sorted in memory ({args.memory_mb:g} MB budget)")
+    print(f"[external_sort] {stats.summary()} in {stats.seconds:.2f}s")
+    print(f"Saved: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,23 @@
 패킹리스트 ID 정리 v2:
 - 원본에서 UUID → 새 pl_number 매핑 생성
 - 중복 pl_number에 -A, -B 접미사 추가
+- 헤더 합계(total_*)를 아이템 집계로 다시 계산 (packing_totals), 허용 오차를 넘는 불일치 보고
+- 빈 destination은 pl_number 약어로 채움 (destinations.PL_SUFFIXES, 같은 월 발주 목적지로 후보를 좁혀 하나일 때만)
 """
-import csv
 import re
+import sys
 from pathlib import Path
 from collections import defaultdict
+from operator import attrgetter
+
+from dates import DateParser
+from destinations import matcher
+from external_sort import suffixed
+from manifest import run_stage
+from packing_totals import HEADER_TOTALS, PackingTotals, print_mismatches
+from pipeline import CsvSink, read_header, read_records
+from records import record_class, table_record
+from run_report import current_stats
 
 BASE_DIR = Path(__file__).parent.parent
 OUTPUT_DIR = BASE_DIR / "supabase_ready"
@@ -19,106 +31,134 @@ def clean_pl_number(pl: str) -> str:
     return pl.strip()
 
 
+def order_destinations(items_file: Path = OUTPUT_DIR / "ru_order_items.csv") -> dict:
+    """ru_order_items.csv → {order_id: {목적지}} (파일이 없으면 빈 dict → PL 약어만으로 판단)"""
+    if not items_file.exists():
+        return {}
+    OrderItem = table_record("ru_order_items", ["order_id", "destination"])
+    destinations = defaultdict(set)
+    for item in read_records(items_file, OrderItem):
+        destinations[item.order_id].add(item.destination)
+    return destinations
+
+
 def process():
     # 원본 파일들
     orig_lists = BASE_DIR / "ru_packing_lists.csv"
     orig_items = BASE_DIR / "ru_packing_items_final.csv"
 
-    # 1. 원본 packing_lists 읽기 - UUID와 pl_number 매핑
+    # 1. 원본 packing_lists - UUID와 pl_number 매핑 생성
+    #    (헤더 합계는 아이템 집계 후에 정해지므로 헤더 행은 보관했다가 마지막에 저장)
+    stats = current_stats()
+    parse_date = DateParser()
     uuid_to_new_pl = {}
     pl_counter = defaultdict(int)
-    packing_lists = []
-
-    with open(orig_lists, "r", encoding="utf-8-sig") as f:
-        reader = csv.DictReader(f)
-        orig_fields = reader.fieldnames
-
-        for row in reader:
-            uuid = row['id']
-            old_pl = row['pl_number']
-            base_pl = clean_pl_number(old_pl)
-
-            # 중복 체크
-            pl_counter[base_pl] += 1
-            if pl_counter[base_pl] > 1:
-                new_pl = f"{base_pl}-{chr(ord('A') + pl_counter[base_pl] - 1)}"
+    pl_set = set()
+
+    # packing_lists 저장 시 id 필드 제거 (나머지는 원본 컬럼 순서, 원본에 없는 합계 컬럼은 끝에 추가)
+    header = read_header(orig_lists)
+    has_destination = 'destination' in header
+    destinations = matcher()
+    month_destinations = order_destinations() if has_destination else {}
+    unresolved = []
+    new_fields = [f for f in header if f != 'id'] + [f for f in HEADER_TOTALS if f not in header]
+    SourceList = record_class("SourcePackingList", header + [f for f in new_fields if f not in header])
+    output_values = attrgetter(*new_fields)
+    lists = []
+
+    for row in read_records(orig_lists, SourceList):
+        uuid = row.id
+        old_pl = row.pl_number
+        base_pl = clean_pl_number(old_pl)
+
+        # 중복 체크
+        pl_counter[base_pl] += 1
+        new_pl = suffixed(base_pl, pl_counter[base_pl])
+        if pl_counter[base_pl] > 1:
+            stats.coerce("duplicate pl_number (suffixed)")
+
+        uuid_to_new_pl[uuid] = new_pl
+        pl_set.add(new_pl)
+        row.pl_number = new_pl
+
+        # order_id 업데이트 (월 기준)
+        invoice_date = parse_date(row.invoice_date)
+        if invoice_date:
+            row.order_id = f"RU-{invoice_date[:7]}"
+        else:
+            stats.coerce("unparsable invoice_date (order_id kept)")
+
+        # 날짜 정리 (YYYY-MM-DD)
+        row.invoice_date = invoice_date
+
+        # 빈 목적지 → pl_number 약어
+        if has_destination and not row.destination.strip():
+            destination = destinations.classify_pl(new_pl, month_destinations.get(row.order_id))
+            if destination:
+                row.destination = destination.name
+                stats.coerce("empty destination (from pl_number suffix)")
             else:
-                new_pl = base_pl
-
-            uuid_to_new_pl[uuid] = new_pl
-
-            # 새 행 생성
-            new_row = dict(row)
-            new_row['pl_number'] = new_pl
-
-            # order_id 업데이트 (월 기준)
-            invoice_date = row.get('invoice_date', '')
-            if invoice_date:
-                match = re.match(r'(\d{4})-(\d{2})', invoice_date)
-                if match:
-                    new_row['order_id'] = f"RU-{match.group(1)}-{match.group(2)}"
-
-            # 날짜 정리
-            new_row['invoice_date'] = invoice_date.split()[0] if ' ' in invoice_date else invoice_date
+                unresolved.append(new_pl)
 
-            packing_lists.append(new_row)
+        lists.append(row)
 
-    print(f"Loaded {len(packing_lists)} packing lists")
+    print(f"Loaded {len(lists)} packing lists")
     print(f"UUID mappings: {len(uuid_to_new_pl)}")
 
     # 중복 확인
     duplicates = {k: v for k, v in pl_counter.items() if v > 1}
     if duplicates:
         print(f"Duplicates (fixed with suffix): {duplicates}")
-
-    # 2. packing_lists 저장 (id 필드 제거)
-    new_fields = [f for f in orig_fields if f != 'id']
-
-    with open(OUTPUT_DIR / "ru_packing_lists.csv", "w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=new_fields)
-        writer.writeheader()
-        for row in packing_lists:
-            row_clean = {k: v for k, v in row.items() if k != 'id'}
-            writer.writerow(row_clean)
-
-    print(f"Saved: ru_packing_lists.csv")
-
-    # 3. packing_items 업데이트
-    items = []
-    with open(orig_items, "r", encoding="utf-8-sig") as f:
-        reader = csv.DictReader(f)
-        items_fields = reader.fieldnames
-
-        for row in reader:
-            old_pl_id = row['packing_list_id']
-            if old_pl_id in uuid_to_new_pl:
-                row['packing_list_id'] = uuid_to_new_pl[old_pl_id]
+    if unresolved:
+        print(f"Destination left empty (ambiguous/unknown pl_number suffix): {', '.join(unresolved)}")
+
+    # 2. packing_items 스트리밍 업데이트 (원본 컬럼 = ru_packing_items 컬럼) + 헤더 합계 누적
+    items_pl_set = set()
+    totals = PackingTotals()
+    item_fields = read_header(orig_items)
+    Item = table_record("ru_packing_items", item_fields)
+    has_name = 'product_name' in item_fields
+    has_pallet = 'pallet_number' in item_fields
+
+    with CsvSink(OUTPUT_DIR / "ru_packing_items.csv", item_fields) as items_out:
+        for row in read_records(orig_items, Item):
+            new_pl_id = uuid_to_new_pl.get(row.packing_list_id)
+            if new_pl_id is not None:
+                row.packing_list_id = new_pl_id
+            else:
+                stats.coerce("unknown packing_list_id (kept)")
+            items_pl_set.add(row.packing_list_id)
 
             # product_name 정리
-            if 'product_name' in row:
-                row['product_name'] = row['product_name'].replace('\n', ' ').strip()
+            if has_name:
+                row.product_name = row.product_name.replace('\n', ' ').strip()
 
             # pallet_number 정리
-            if 'pallet_number' in row and row['pallet_number']:
+            if has_pallet and row.pallet_number:
                 try:
-                    row['pallet_number'] = str(int(float(row['pallet_number'])))
-                except:
-                    pass
+                    row.pallet_number = str(int(float(row.pallet_number)))
+                except (ValueError, OverflowError):
+                    stats.coerce("unparsable pallet_number (kept)")
+
+            items_out.write_values(row)
+            totals.add(row)
 
-            items.append(row)
+    item_count = items_out.count
 
-    with open(OUTPUT_DIR / "ru_packing_items.csv", "w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=items_fields)
-        writer.writeheader()
-        writer.writerows(items)
+    print(f"Saved: ru_packing_items.csv ({item_count} items)")
 
-    print(f"Saved: ru_packing_items.csv ({len(items)} items)")
+    # 3. 헤더 합계를 아이템 집계로 교체 후 packing_lists 저장
+    mismatches = []
+    with CsvSink(OUTPUT_DIR / "ru_packing_lists.csv", new_fields) as lists_out:
+        for row in lists:
+            mismatches += totals.reconcile(row)
+            lists_out.write_values(output_values(row))
+
+    print(f"Saved: ru_packing_lists.csv ({lists_out.count} lists)")
+    print_mismatches(mismatches)
 
     # 4. 검증
     print("\n=== Verification ===")
-    pl_set = set(row['pl_number'] for row in packing_lists)
-    items_pl_set = set(row['packing_list_id'] for row in items)
-
     print(f"Unique pl_numbers: {len(pl_set)}")
     print(f"Unique packing_list_ids in items: {len(items_pl_set)}")
     print(f"All items reference valid lists: {items_pl_set <= pl_set}")
@@ -130,5 +170,9 @@ def process():
 
 if __name__ == "__main__":
     print("=== Fixing Packing IDs v2 ===\n")
-    process()
+    run_stage("fix_packing_v2", process,
+              inputs=[BASE_DIR / "ru_packing_lists.csv", BASE_DIR / "ru_packing_items_final.csv",
+                      *[p for p in [OUTPUT_DIR / "ru_order_items.csv"] if p.exists()]],
+              outputs=[OUTPUT_DIR / "ru_packing_lists.csv", OUTPUT_DIR / "ru_packing_items.csv"],
+              sources=[__file__], force="--force" in sys.argv[1:])
     print("\n=== Done! ===")
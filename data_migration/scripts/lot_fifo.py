@@ -0,0 +1,267 @@
+"""
+LOT 잔여 수량 일괄 FIFO 계산 (_archive/create_lot_inventory.calculate_fifo 개선판)
+
+cm_calculate_lot_remaining(product_id) (plpgsql)와 동일한 규칙:
+- 품목별로 LOT을 production_date DESC, id DESC 순으로 정렬 (최신 먼저)
+- 현재고(bal_qty, 없으면 0)를 최신 LOT부터 배분
+  - 남은 재고 <= 0          → remaining 0, 'depleted'
+  - 남은 재고 >= 생산량      → remaining 생산량, 'active'
+  - 그 외                  → remaining 남은 재고, 'partial'
+- 전체 LOT을 한 번 정렬한 뒤 순차 1회 스캔으로 모든 품목 계산
+
+사용법:
+  python scripts/lot_fifo.py                   # cm_production_lots.csv + cm_erp_products.csv → cm_lot_remaining.csv
+  python scripts/lot_fifo.py --changed-stock stock_delta.csv
+                                               # 기존 cm_lot_remaining.csv에서 변경된 품목만 재계산
+  python scripts/lot_fifo.py --verify --dsn …  # DB의 plpgsql 함수/스냅샷과 결과 비교
+  python scripts/lot_fifo.py --lots-from-db --dsn …
+                                               # LOT(id 포함)을 CSV 대신 DB에서 읽음
+
+cm_production_lots.csv의 LOT id는 파일 순서로 정함 → 테이블을 이 파일로 전체 적재한 경우에만 DB id와 같음
+(load_supabase --diff가 LOT을 insert/delete/reload한 뒤에는 serial이 달라지므로 CSV 모드를 거부, --lots-from-db 사용)
+
+cm_erp_products.csv는 Supabase에서 export:
+  SELECT product_id, bal_qty FROM cm_erp_products
+
+DB에서는 204 마이그레이션의 트리거가 bal_qty/LOT 변경 시 해당 품목만 재계산한다.
+"""
+import argparse
+import os
+import sys
+from contextlib import closing
+from pathlib import Path
+
+import snapshot_diff
+from pipeline import read_rows, write_rows
+
+BASE_DIR = Path(__file__).parent.parent
+OUTPUT_DIR = BASE_DIR / "supabase_ready"
+
+REMAINING_FIELDS = ['lot_id', 'product_id', 'lot_number', 'produced_qty', 'remaining_qty',
+                    'production_date', 'expiry_date', 'status']
+
+
+def lot_sort_key(lot: dict) -> tuple:
+    """product_id ASC, production_date DESC, id DESC 정렬 키 (production_date가 빈 LOT은 품목 안에서 맨 뒤)"""
+    # production_date는 'YYYY-MM-DD' 문자열 → 역순 정렬을 위해 부호 반전한 정수로 변환
+    # DB는 NOT NULL이라 빈 값은 CSV에서만 나옴 (가장 오래된 LOT으로 보고 마지막에 배분)
+    date = lot['production_date']
+    return (lot['product_id'], 0 if date else 1, -int(date.replace('-', '')) if date else 0, -lot['id'])
+
+
+def allocate_fifo(lots: list, stock: dict) -> list:
+    """
+    전체 LOT에 현재고 배분
+
+    lots: [{'id', 'lot_number', 'product_id', 'produced_qty', 'production_date', 'expiry_date'}]
+    stock: {product_id: bal_qty}
+    반환: REMAINING_FIELDS 형태의 dict 목록 (품목별 최신순)
+    """
+    result = []
+    current_product = None
+    remaining_to_allocate = 0
+
+    for lot in sorted(lots, key=lot_sort_key):
+        if lot['product_id'] != current_product:
+            current_product = lot['product_id']
+            remaining_to_allocate = stock.get(current_product) or 0
+
+        produced_qty = lot['produced_qty']
+        if remaining_to_allocate <= 0:
+            remaining_qty = 0
+            status = 'depleted'
+        elif remaining_to_allocate >= produced_qty:
+            remaining_qty = produced_qty
+            remaining_to_allocate -= produced_qty
+            status = 'active'
+        else:
+            remaining_qty = remaining_to_allocate
+            remaining_to_allocate = 0
+            status = 'partial'
+
+        result.append({
+            'lot_id': lot['id'],
+            'product_id': lot['product_id'],
+            'lot_number': lot['lot_number'],
+            'produced_qty': produced_qty,
+            'remaining_qty': remaining_qty,
+            'production_date': lot['production_date'],
+            'expiry_date': lot['expiry_date'],
+            'status': status,
+        })
+
+    return result
+
+
+def load_lots_csv(path: Path) -> list:
+    """
+    cm_production_lots.csv 로드 (id = 파일 순서)
+
+    load_supabase로 이 파일을 전체 적재했을 때(--replace는 serial도 초기화)만 DB id와 같음
+    """
+    lots = []
+    for i, row in enumerate(read_rows(path), 1):
+        lots.append({
+            'id': i,
+            'lot_number': row['lot_number'],
+            'product_id': row['product_id'],
+            'produced_qty': int(row['produced_qty']),
+            'production_date': row['production_date'],
+            'expiry_date': row['expiry_date'],
+        })
+    return lots
+
+
+def load_stock_csv(path: Path) -> dict:
+    """cm_erp_products.csv export → {product_id: bal_qty}"""
+    stock = {}
+    for row in read_rows(path):
+        product_id = row.get('product_id', '').strip()
+        if product_id:
+            stock[product_id] = int(row.get('bal_qty') or 0)
+    return stock
+
+
+def update_products(previous: list, lots: list, stock: dict, product_ids: set) -> list:
+    """
+    기존 결과에서 product_ids 품목만 다시 배분 (나머지 행은 그대로)
+
+    previous: REMAINING_FIELDS 형태의 기존 결과 (품목별 최신순)
+    반환: 품목 순서를 유지한 새 결과
+    """
+    updated = allocate_fifo([lot for lot in lots if lot['product_id'] in product_ids], stock)
+
+    by_product = {}
+    for row in previous:
+        if row['product_id'] not in product_ids:
+            by_product.setdefault(row['product_id'], []).append(row)
+    for row in updated:
+        by_product.setdefault(row['product_id'], []).append(row)
+
+    return [row for product_id in sorted(by_product) for row in by_product[product_id]]
+
+
+def load_from_db(conn) -> tuple:
+    """DB에서 LOT/재고 로드"""
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT id, lot_number, product_id, produced_qty,
+                   to_char(production_date, 'YYYY-MM-DD'),
+                   COALESCE(to_char(expiry_date, 'YYYY-MM-DD'), '')
+            FROM cm_production_lots
+        """)
+        keys = ['id', 'lot_number', 'product_id', 'produced_qty', 'production_date', 'expiry_date']
+        lots = [dict(zip(keys, row)) for row in cur.fetchall()]
+
+        cur.execute("SELECT product_id, bal_qty FROM cm_erp_products")
+        stock = dict(cur.fetchall())
+    return lots, stock
+
+
+def verify(conn) -> int:
+    """Python 계산 결과를 plpgsql 함수 및 스냅샷 테이블과 비교, 불일치 건수 반환"""
+    lots, stock = load_from_db(conn)
+    expected = {(r['lot_id'], r['remaining_qty'], r['status']) for r in allocate_fifo(lots, stock)
+                if r['product_id'] in stock}
+
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT r.id, r.remaining_qty, r.status
+            FROM cm_erp_products p
+            CROSS JOIN LATERAL cm_calculate_lot_remaining(p.product_id) r
+        """)
+        plpgsql = set(cur.fetchall())
+
+        cur.execute("""
+            SELECT lot_id, remaining_qty, status FROM cm_lot_remaining
+            WHERE product_id IN (SELECT product_id FROM cm_erp_products)
+        """)
+        snapshot = set(cur.fetchall())
+
+    mismatches = 0
+    for name, actual in (("cm_calculate_lot_remaining", plpgsql), ("cm_lot_remaining", snapshot)):
+        diff = expected ^ actual
+        mismatches += len(diff)
+        status = "OK" if not diff else f"{len(diff)} mismatched rows"
+        print(f"{name}: {len(actual)} lots, {status}")
+        for row in sorted(diff)[:10]:
+            print(f"  {'python' if row in expected else 'db'}-only: {row}")
+
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch FIFO lot remaining calculation")
+    parser.add_argument("--lots", type=Path, default=OUTPUT_DIR / "cm_production_lots.csv")
+    parser.add_argument("--inventory", type=Path, default=BASE_DIR / "cm_erp_products.csv")
+    parser.add_argument("--output", type=Path, default=OUTPUT_DIR / "cm_lot_remaining.csv")
+    parser.add_argument("--changed-stock", type=Path, metavar="CSV",
+                        help="product_id,bal_qty rows that changed; recompute only those products")
+    parser.add_argument("--verify", action="store_true", help="compare with the database")
+    parser.add_argument("--lots-from-db", action="store_true",
+                        help="read lots (with their database ids) from --dsn instead of --lots")
+    parser.add_argument("--dsn", default=os.environ.get("SUPABASE_DB_URL"))
+    args = parser.parse_args()
+
+    if args.verify:
+        import psycopg2
+
+        if not args.dsn:
+            parser.error("--verify needs --dsn or SUPABASE_DB_URL")
+        print("=== Verifying FIFO allocation against database ===\n")
+        with closing(psycopg2.connect(args.dsn)) as conn:
+            mismatches = verify(conn)
+        sys.exit(1 if mismatches else 0)
+
+    if args.lots_from_db:
+        import psycopg2
+
+        if not args.dsn:
+            parser.error("--lots-from-db needs --dsn or SUPABASE_DB_URL")
+        with closing(psycopg2.connect(args.dsn)) as conn:
+            lots, _ = load_from_db(conn)
+    elif snapshot_diff.load_mode("cm_production_lots") == "diff":
+        parser.error("cm_production_lots was last loaded with load_supabase --diff, so its ids no longer "
+                     "follow the CSV row order; use --lots-from-db")
+    else:
+        lots = load_lots_csv(args.lots)
+
+    if args.changed_stock:
+        print("=== Updating LOT remaining for changed stock (FIFO) ===\n")
+        if not args.output.exists():
+            parser.error(f"{args.output} not found; run a full calculation first")
+
+        changed = load_stock_csv(args.changed_stock)
+        stock = load_stock_csv(args.inventory) if args.inventory.exists() else {}
+        stock.update(changed)
+
+        previous = list(read_rows(args.output))
+        result = update_products(previous, lots, stock, set(changed))
+        count = write_rows(args.output, REMAINING_FIELDS, result)
+
+        print(f"Recalculated: {len(changed)} products")
+        print(f"Updated: {args.output.name} ({count} rows)")
+        print("\n=== Done! ===")
+        return
+
+    print("=== Calculating LOT remaining (FIFO) ===\n")
+
+    if not args.inventory.exists():
+        print(f"WARNING: {args.inventory} not found!")
+        print("Please export cm_erp_products from Supabase:")
+        print("  SELECT product_id, bal_qty FROM cm_erp_products")
+        sys.exit(1)
+
+    stock = load_stock_csv(args.inventory)
+    result = allocate_fifo(lots, stock)
+    count = write_rows(args.output, REMAINING_FIELDS, result)
+
+    print(f"Created: {args.output.name} ({count} rows)")
+    for status in ('active', 'partial', 'depleted'):
+        print(f"  {status}: {sum(1 for r in result if r['status'] == status)}")
+
+    print("\n=== Done! ===")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""
+LOT 마스터 정합 (PRODUCTION2 ⋈ LOTHX ⋈ LOTHX_1, lot_number 해시 조인)
+
+- PRODUCTION2.csv: LOT × 제품 생산 실적 (수량, 생산일) → cm_production_lots 행
+- LOTHX.csv: PRODUCTION2와 같은 시트의 (Lot No, DATE) 내보내기, 행 순서가 같음 → {행 번호: (LOT, 날짜)}
+- LOTHX_1.csv: LOT 제조일 대장 (LOT 하나에 제조일 여러 개) → {lot_number: 제조일 집합}
+
+규칙 (PRODUCTION2 행마다)
+1. LOT 번호: 앞뒤 공백 제거, 중간 공백으로 LOT 두 개가 붙은 값은 대장에 있는 쪽 (없으면 첫 번째)
+2. 생산일: PRODUCTION2 생산일 / 같은 행 LOTHX 날짜 (LOT 번호가 같을 때만)
+   - 하나만 있거나 둘이 같으면 그 값
+   - 다르면 대장에 있는 쪽, 둘 다 있거나 둘 다 없으면 PRODUCTION2
+   - 둘 다 비었으면 같은 LOT의 다른 행이 쓰지 않은 대장 날짜가 하나뿐일 때 그 날짜, 아니면 제외
+3. 제조일 (cm_lot_manufacturing_dates) = LOT별 (확정 생산일 ∪ 대장 날짜)
+   → cm_production_lots의 (lot_number, production_date)는 모두 제조일 테이블에 있음
+
+보정/충돌 내역: lot_reconcile/conflicts.csv (적재 대상 아님)
+
+사용법:
+  python scripts/lot_reconcile.py              # 규칙별 건수 + 충돌 목록 (파일은 쓰지 않음)
+"""
+import argparse
+import csv
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from dates import DateParser
+from pipeline import CsvSink
+from records import record_class
+from run_report import current_stats
+
+BASE_DIR = Path(__file__).parent.parent
+REPORT_DIR = BASE_DIR / "lot_reconcile"
+CONFLICTS_FILE = REPORT_DIR / "conflicts.csv"
+
+PRODUCTION_FILE = BASE_DIR / "PRODUCTION2.csv"
+LOTHX_FILE = BASE_DIR / "LOTHX.csv"
+REGISTER_FILE = BASE_DIR / "LOTHX_1.csv"
+
+MFG_DATE_FIELDS = ["lot_number", "manufacturing_date"]
+CONFLICT_FIELDS = ["rule", "lot_number", "product_id", "source_row", "production2_date",
+                   "lothx_date", "lothx_1_dates", "resolved_date", "note"]
+
+# 규칙 → run_report coerced 사유
+RULES = {
+    "lot_number_split": "Lot No with two lots (registered lot used)",
+    "date_from_lothx": "empty 생산일 (filled from LOTHX)",
+    "date_from_lothx_1": "empty 생산일 (only unused LOTHX_1 date)",
+    "lothx_date_registered": "생산일 differs from LOTHX (LOTHX_1 confirms LOTHX)",
+    "production2_kept": "생산일 differs from LOTHX (PRODUCTION2 kept)",
+    "unresolved": None,
+    "lot_not_registered": None,
+    "registered_only": None,
+}
+
+Conflict = record_class("LotConflict", CONFLICT_FIELDS)
+
+
+def _cell(row: list, i: int) -> str:
+    return row[i] if len(row) > i else ""
+
+
+def load_register(path: Path = REGISTER_FILE) -> dict:
+    """LOTHX_1.csv → {lot_number: {제조일}}"""
+    parse_date = DateParser()  # '2025.6.13 0:00' → '2025-06-13'
+    register = defaultdict(set)
+    rows_read = 0
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f)
+        next(reader)
+        for row in reader:
+            rows_read += 1
+            lot_number = _cell(row, 0).strip()
+            date = parse_date(_cell(row, 1))
+            if lot_number and date:
+                register[lot_number].add(date)
+    current_stats().read(path, rows_read)
+    return register
+
+
+def load_row_dates(path: Path = LOTHX_FILE) -> dict:
+    """LOTHX.csv → {행 번호: (LOT 원본 값, 날짜)} (PRODUCTION2와 같은 행 번호)"""
+    parse_date = DateParser()
+    rows = {}
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f)
+        next(reader)
+        for line, row in enumerate(reader, 2):
+            rows[line] = (_cell(row, 0), parse_date(_cell(row, 1)))
+    current_stats().read(path, len(rows))
+    return rows
+
+
+def normalize_lot(raw: str, register: dict) -> str:
+    """LOT 번호 정리 (중간 공백으로 나뉜 값은 대장에 있는 첫 토큰, 없으면 첫 토큰)"""
+    tokens = raw.split()
+    if len(tokens) <= 1:
+        return raw.strip()
+    return next((t for t in tokens if t in register), tokens[0])
+
+
+def resolve_date(production_date: str, lothx_date: str, registered: set) -> tuple:
+    """(생산일, 규칙) - 규칙은 값이 그대로면 None, 둘 다 비었으면 ('', None)"""
+    if not lothx_date or lothx_date == production_date:
+        return production_date, None
+    if not production_date:
+        return lothx_date, "date_from_lothx"
+    if lothx_date in registered and production_date not in registered:
+        return lothx_date, "lothx_date_registered"
+    return production_date, "production2_kept"
+
+
+def reconcile(production_file: Path = PRODUCTION_FILE, lothx_file: Path = LOTHX_FILE,
+              register_file: Path = REGISTER_FILE) -> tuple:
+    """
+    세 원본 정합 → (cm_production_lots 행 dict 목록, [(lot_number, 제조일)], [Conflict])
+
+    생산 행 순서는 PRODUCTION2 그대로, 제조일은 (lot_number, 날짜) 순
+    """
+    stats = current_stats()
+    register = load_register(register_file)
+    row_dates = load_row_dates(lothx_file)
+    parse_date = DateParser()  # 'Mar 26, 2025 12:00 AM' → '2025-03-26'
+
+    lots = []
+    conflicts = []
+    pending = []             # 생산일을 못 정한 행
+    used = defaultdict(set)  # LOT별 확정 생산일
+
+    with open(production_file, "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f)
+        next(reader)
+        rows_read = 0
+        for line, row in enumerate(reader, 2):
+            rows_read += 1
+            if len(row) < 4:
+                stats.drop("fewer than 4 columns")
+                continue
+
+            lot_number = normalize_lot(row[0], register)
+            product_id = row[1].strip()
+            qty = row[2].strip()
+            if not lot_number or not product_id:
+                stats.drop("empty Lot No" if not lot_number else "empty prdcode")
+                continue
+            registered = register.get(lot_number, set())
+
+            if lot_number != row[0].strip():
+                conflicts.append(Conflict("lot_number_split", lot_number, product_id, line, "", "",
+                                          ";".join(sorted(registered)), "", f"Lot No '{row[0].strip()}'"))
+                stats.coerce(RULES["lot_number_split"])
+
+            production_date = parse_date(row[3])
+            lothx_lot, lothx_date = row_dates.get(line, ("", ""))
+            if normalize_lot(lothx_lot, register) != lot_number:
+                lothx_date = ""
+            date, rule = resolve_date(production_date, lothx_date, registered)
+
+            try:
+                produced_qty = int(float(qty))
+            except ValueError:
+                produced_qty = 0
+                stats.coerce("unparsable 생산 완료 수량" if qty else "empty 생산 완료 수량")
+
+            lot = {
+                'lot_number': lot_number,
+                'product_id': product_id,
+                'produced_qty': produced_qty,
+                'production_date': date,
+                '_line': line,
+            }
+            lots.append(lot)
+            if not date:
+                pending.append(lot)
+                continue
+            used[lot_number].add(date)
+            if rule:
+                conflicts.append(Conflict(rule, lot_number, product_id, line, production_date, lothx_date,
+                                          ";".join(sorted(registered)), date, ""))
+                stats.coerce(RULES[rule])
+    stats.read(production_file, rows_read)
+
+    # 생산일이 비어 있는 행: 같은 LOT 다른 행이 쓰지 않은 대장 날짜가 하나뿐이면 그 날짜
+    for lot in pending:
+        registered = register.get(lot['lot_number'], set())
+        unused = registered - used[lot['lot_number']]
+        rule = "date_from_lothx_1" if len(unused) == 1 else "unresolved"
+        if len(unused) == 1:
+            lot['production_date'] = next(iter(unused))
+            stats.coerce(RULES[rule])
+        else:
+            stats.drop("missing/unparsable 생산일 (not in LOTHX / LOTHX_1)")
+        conflicts.append(Conflict(rule, lot['lot_number'], lot['product_id'], lot['_line'], "", "",
+                                  ";".join(sorted(registered)), lot['production_date'], ""))
+    lots = [lot for lot in lots if lot['production_date']]
+
+    # 제조일 = 확정 생산일 ∪ 대장 날짜
+    produced = defaultdict(set)
+    for lot in lots:
+        produced[lot['lot_number']].add(lot['production_date'])
+        del lot['_line']
+    mfg_dates = []
+    for lot_number in sorted(produced.keys() | register.keys()):
+        dates = produced.get(lot_number, set())
+        registered = register.get(lot_number, set())
+        if not registered:
+            conflicts.append(Conflict("lot_not_registered", lot_number, "", "", ";".join(sorted(dates)),
+                                      "", "", ";".join(sorted(dates)), "not in LOTHX_1"))
+        elif registered - dates:
+            conflicts.append(Conflict("registered_only", lot_number, "", "", ";".join(sorted(dates)),
+                                      "", ";".join(sorted(registered)), ";".join(sorted(registered - dates)),
+                                      "LOTHX_1 dates without production rows"))
+        mfg_dates.extend((lot_number, date) for date in sorted(dates | registered))
+
+    return lots, mfg_dates, conflicts
+
+
+def write_conflicts(conflicts: list, path: Path = CONFLICTS_FILE) -> int:
+    path.parent.mkdir(exist_ok=True)
+    with CsvSink(path, CONFLICT_FIELDS) as out:
+        for conflict in conflicts:
+            out.write_values(conflict)
+    return out.count
+
+
+def print_conflicts(conflicts: list, limit: int = 20):
+    counts = Counter(c.rule for c in conflicts)
+    print("Lot reconciliation:")
+    for rule in RULES:
+        if counts[rule]:
+            print(f"  {rule:<24} {counts[rule]:>5}")
+
+    disagreements = [c for c in conflicts if c.rule in ("lothx_date_registered", "production2_kept")]
+    if disagreements:
+        print(f"\nProduction date differs from LOTHX ({len(disagreements)}):")
+        for c in disagreements[:limit]:
+            print(f"  {c.lot_number:<20} {c.product_id:<12} PRODUCTION2 {c.production2_date} "
+                  f"LOTHX {c.lothx_date} → {c.resolved_date} ({c.rule})")
+        if len(disagreements) > limit:
+            print(f"  ... {len(disagreements) - limit} more")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconcile lot dates across PRODUCTION2, LOTHX and LOTHX_1")
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    print("=== Lot reconciliation ===\n")
+    lots, mfg_dates, conflicts = reconcile()
+    print(f"cm_production_lots: {len(lots)} rows, cm_lot_manufacturing_dates: {len(mfg_dates)} rows\n")
+    print_conflicts(conflicts, args.limit)
+
+
+if __name__ == "__main__":
+    main()
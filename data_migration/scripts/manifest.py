@@ -0,0 +1,180 @@
+"""
+빌드 매니페스트 (증분 재생성)
+- 입력 파일 / 변환 스크립트의 sha256 지문을 supabase_ready/.build_manifest.json에 기록
+- 입력과 로직이 그대로면 단계를 건너뛰고 기존 supabase_ready/*.csv 재사용
+  - 로직 = 단계 스크립트 + 그 스크립트가 (간접적으로) import하는 scripts/ 모듈
+  - 출력도 기록한 sha256과 같아야 재사용 (다른 스크립트가 같은 파일을 덮어썼으면 다시 실행)
+  - 출력을 바꾸는 실행 옵션(create_orders_v3 --fix-shifted-prices)이 달라도 다시 실행
+- 파일 크기+mtime이 같으면 이전 해시를 재사용 (큰 파일 재해시 방지)
+- 실행한 단계는 run_report.json에 통계 기록
+"""
+import ast
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Callable, Iterable
+
+from run_report import RunReport, instrument
+
+BASE_DIR = Path(__file__).parent.parent
+OUTPUT_DIR = BASE_DIR / "supabase_ready"
+MANIFEST_FILE = OUTPUT_DIR / ".build_manifest.json"
+
+SCRIPTS_DIR = Path(__file__).parent
+
+
+def sha256_file(path: Path, chunk_size: int = 1 << 20) -> str:
+    """파일 내용 sha256"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _key(path: Path) -> str:
+    """매니페스트 키 (BASE_DIR 기준 상대경로)"""
+    path = Path(path).resolve()
+    try:
+        return path.relative_to(BASE_DIR.resolve()).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+
+def local_imports(source: Path) -> set:
+    """source가 import하는 scripts/ 모듈 경로 (함수 안 import 포함, 표준/외부 모듈 제외)"""
+    tree = ast.parse(Path(source).read_text(encoding="utf-8"), filename=str(source))
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module.split(".")[0])
+    return {path for path in (SCRIPTS_DIR / f"{name}.py" for name in names) if path.exists()}
+
+
+def logic_sources(sources: Iterable[Path]) -> set:
+    """단계 스크립트 + import로 닿는 scripts/ 모듈 전체"""
+    seen = set()
+    todo = [Path(s).resolve() for s in sources]
+    while todo:
+        source = todo.pop()
+        if source in seen:
+            continue
+        seen.add(source)
+        todo.extend(p.resolve() for p in local_imports(source))
+    return seen
+
+
+class BuildManifest:
+    """단계별 입력/로직 지문 저장소"""
+
+    def __init__(self, path: Path = MANIFEST_FILE):
+        self.path = Path(path)
+        self.stages = {}
+        self.file_cache = {}
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.stages = data.get("stages", {})
+            self.file_cache = data.get("files", {})
+
+    def fingerprint(self, path: Path) -> str:
+        """파일 지문 (크기+mtime 변화 없으면 캐시 사용)"""
+        stat = os.stat(path)
+        key = _key(path)
+        cached = self.file_cache.get(key)
+        if cached and cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns:
+            return cached["sha256"]
+
+        digest = sha256_file(path)
+        self.file_cache[key] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": digest,
+        }
+        return digest
+
+    def logic_fingerprint(self, sources: Iterable[Path]) -> str:
+        """변환 로직 지문 (스크립트 + import하는 scripts/ 모듈 해시를 합산)"""
+        digest = hashlib.sha256()
+        for source in sorted(logic_sources(sources)):
+            digest.update(_key(source).encode("utf-8"))
+            digest.update(self.fingerprint(source).encode("ascii"))
+        return digest.hexdigest()
+
+    def signature(self, inputs: Iterable[Path], sources: Iterable[Path], options: dict = None) -> dict:
+        """단계 서명: 입력 파일별 지문 + 로직 지문 + 출력에 영향을 주는 실행 옵션"""
+        return {
+            "inputs": {_key(p): self.fingerprint(p) for p in inputs},
+            "logic": self.logic_fingerprint(sources),
+            "options": options or {},
+        }
+
+    def is_fresh(self, stage: str, signature: dict, outputs: Iterable[Path]) -> bool:
+        """서명이 같고 출력이 모두 이 단계가 기록한 내용 그대로면 True"""
+        previous = self.stages.get(stage)
+        if previous is None:
+            return False
+        if previous["inputs"] != signature["inputs"] or previous["logic"] != signature["logic"] or \
+                previous.get("options", {}) != signature["options"]:
+            return False
+        recorded = previous.get("outputs")
+        if not isinstance(recorded, dict):  # 출력 해시가 없는 이전 형식
+            return False
+        for path in outputs:
+            if not Path(path).exists() or recorded.get(_key(path)) != self.fingerprint(path):
+                return False
+        return True
+
+    def record(self, stage: str, signature: dict, outputs: Iterable[Path]):
+        self.stages[stage] = {
+            **signature,
+            "outputs": {_key(p): self.fingerprint(p) for p in outputs if Path(p).exists()},
+        }
+
+    def save(self):
+        self.path.parent.mkdir(exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"stages": self.stages, "files": self.file_cache}, f,
+                      ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+def run_stage(
+    name: str,
+    func: Callable[[], None],
+    inputs: list,
+    outputs: list,
+    sources: list,
+    force: bool = False,
+    options: dict = None,
+) -> bool:
+    """입력/로직/옵션이 바뀐 경우에만 func 실행, 실행했으면 True 반환"""
+    manifest = BuildManifest()
+    signature = manifest.signature(inputs, sources, options)
+    report = RunReport()
+
+    if not force and manifest.is_fresh(name, signature, outputs):
+        print(f"Skipped: {name} (inputs unchanged)")
+        manifest.save()
+        report.record_skipped(name)
+        report.save()
+        return False
+
+    stats = None
+    try:
+        with instrument(name) as stats:
+            func()
+    finally:
+        # instrument()가 시작 전에 실패하면 기록할 통계가 없음
+        if stats is not None:
+            report.record(name, stats.as_dict())
+            report.save()
+    print(f"[{name}] {stats.summary()} in {stats.seconds:.2f}s")
+
+    manifest.record(name, signature, outputs)
+    manifest.save()
+    return True
@@ -0,0 +1,218 @@
+"""
+발주 물류 추정 (카톤 수 / CBM / 예상 중량) - 제품 마스터 해시 조인
+
+- ProductIndex: ru_products.csv를 한 번 읽어 {product_code: ProductSpec}
+  - 예상 중량: ru_products.weight_kg (원본에 없으면) → 패킹 아이템 실적 G.W. 합 / 수량 합
+- 아이템별
+  - 입수: 제품 마스터 pcs_per_carton 우선, 마스터에 없으면 아이템 pcs_per_ctn
+  - 카톤 = ceil(수량 / 입수), CBM = 카톤 × 제품 cbm(카톤당), 중량 = 수량 × 개당 중량
+- 마스터에 없는 product_code, 아이템 pcs_per_ctn ≠ 마스터 pcs_per_carton 은 목록으로 보고
+- ru_orders.total_cartons는 create_orders_v3가 같은 ProductIndex로 계산
+
+출력: logistics/order_items.csv (아이템별), logistics/orders.csv (발주별 합계)
+
+사용법:
+  python scripts/order_logistics.py
+"""
+import argparse
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from manifest import run_stage
+from pipeline import CsvSink, read_header, read_records
+from records import record_class, table_record
+from run_report import current_stats
+
+BASE_DIR = Path(__file__).parent.parent
+OUTPUT_DIR = BASE_DIR / "supabase_ready"
+LOGISTICS_DIR = BASE_DIR / "logistics"
+PRODUCTS_FILE = OUTPUT_DIR / "ru_products.csv"
+
+ITEM_FIELDS = ["order_id", "product_code", "destination", "requested_qty", "pcs_per_carton",
+               "cartons", "cbm", "weight_kg", "note"]
+ORDER_FIELDS = ["order_id", "items", "total_qty", "total_cartons", "total_cbm", "total_weight_kg",
+                "unknown_products", "pcs_conflicts", "items_without_cbm", "items_without_weight"]
+
+
+class ProductSpec(NamedTuple):
+    pcs_per_carton: int
+    cbm: Optional[float]             # 카톤당 m³
+    unit_weight_kg: Optional[float]  # 개당 kg
+
+
+def _number(value: str) -> Optional[float]:
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+class UnitStats(NamedTuple):
+    """패킹 실적 기준 개당 값"""
+    nw_kg: float
+    gw_kg: float
+    cbm: float
+
+
+def packing_unit_stats(packing_items: Path) -> dict:
+    """패킹 아이템 실적 → {product_code: UnitStats} (각 합계 / 수량 합)"""
+    Item = table_record("ru_packing_items", ["product_code", "qty", "nw_kg", "gw_kg", "cbm"])
+    totals = defaultdict(lambda: [0.0, 0.0, 0.0, 0.0])   # 수량, N.W., G.W., CBM
+    for item in read_records(packing_items, Item):
+        q = _number(item.qty)
+        values = [_number(item.nw_kg), _number(item.gw_kg), _number(item.cbm)]
+        if not q or q <= 0 or None in values:
+            continue
+        t = totals[item.product_code]
+        t[0] += q
+        for i, value in enumerate(values, 1):
+            t[i] += value
+    return {code: UnitStats(nw / q, gw / q, cbm / q) for code, (q, nw, gw, cbm) in totals.items()}
+
+
+class ProductIndex:
+    """제품 마스터 해시 인덱스 (같은 product_code가 여러 번이면 첫 행)"""
+
+    def __init__(self, specs: dict, units: Optional[dict] = None):
+        self.specs = specs
+        self.units = units or {}   # 패킹 실적 개당 값 {product_code: UnitStats}
+
+    @classmethod
+    def load(cls, products_file: Path = PRODUCTS_FILE, packing_items: Optional[Path] = None) -> "ProductIndex":
+        columns = [c for c in ("product_code", "pcs_per_carton", "cbm", "weight_kg")
+                   if c in read_header(products_file)]
+        Product = table_record("ru_products", columns)
+        units = packing_unit_stats(packing_items) if packing_items and packing_items.exists() else {}
+
+        specs = {}
+        for row in read_records(products_file, Product):
+            if row.product_code in specs:
+                continue
+            pcs = _number(getattr(row, "pcs_per_carton", ""))
+            weight = _number(getattr(row, "weight_kg", ""))
+            specs[row.product_code] = ProductSpec(
+                int(pcs) if pcs and pcs > 0 else 0,
+                _number(getattr(row, "cbm", "")),
+                weight if weight is not None else getattr(units.get(row.product_code), "gw_kg", None),
+            )
+        return cls(specs, units)
+
+    def get(self, product_code: str) -> Optional[ProductSpec]:
+        return self.specs.get(product_code)
+
+    def pcs_per_carton(self, product_code: str, item_pcs: int = 0) -> int:
+        """입수 (마스터 우선, 없으면 아이템 값)"""
+        spec = self.specs.get(product_code)
+        return spec.pcs_per_carton if spec and spec.pcs_per_carton else item_pcs
+
+    def cartons(self, product_code: str, item_pcs: int, qty: int) -> int:
+        """카톤 수 (입수를 모르면 0)"""
+        pcs = self.pcs_per_carton(product_code, item_pcs)
+        return -(-qty // pcs) if pcs > 0 else 0
+
+
+def load_product_index() -> Optional[ProductIndex]:
+    """create_orders_v3용: ru_products.csv가 없으면 None (카톤 수 0)"""
+    if not PRODUCTS_FILE.exists():
+        print(f"{PRODUCTS_FILE.name} not found: total_cartons left at 0 (run clean_csv.py first)")
+        return None
+    return ProductIndex.load(PRODUCTS_FILE)
+
+
+def _new_order() -> dict:
+    return {"items": 0, "total_qty": 0, "total_cartons": 0, "total_cbm": 0.0, "total_weight_kg": 0.0,
+            "unknown_products": 0, "pcs_conflicts": 0, "items_without_cbm": 0, "items_without_weight": 0}
+
+
+def build_logistics():
+    """ru_order_items.csv ⋈ ru_products.csv (+ 패킹 실적 중량) → logistics/*.csv"""
+    stats = current_stats()
+    index = ProductIndex.load(PRODUCTS_FILE, OUTPUT_DIR / "ru_packing_items.csv")
+    OrderItem = table_record("ru_order_items", ["order_id", "product_code", "destination",
+                                                "requested_qty", "pcs_per_ctn"])
+    ItemRow = record_class("LogisticsItem", ITEM_FIELDS)
+
+    orders = defaultdict(_new_order)
+    unknown = Counter()
+    conflicts = {}
+
+    LOGISTICS_DIR.mkdir(exist_ok=True)
+    with CsvSink(LOGISTICS_DIR / "order_items.csv", ITEM_FIELDS) as items_out:
+        for item in read_records(OUTPUT_DIR / "ru_order_items.csv", OrderItem):
+            qty = int(_number(item.requested_qty) or 0)
+            item_pcs = int(_number(item.pcs_per_ctn) or 0)
+            spec = index.get(item.product_code)
+            order = orders[item.order_id]
+            order["items"] += 1
+            order["total_qty"] += qty
+            notes = []
+
+            if spec is None:
+                unknown[item.product_code] += 1
+                order["unknown_products"] += 1
+                stats.coerce("product_code not in ru_products (no cbm/weight)")
+                notes.append("unknown product")
+            elif item_pcs and spec.pcs_per_carton and item_pcs != spec.pcs_per_carton:
+                conflicts.setdefault((item.product_code, item_pcs, spec.pcs_per_carton), item.order_id)
+                order["pcs_conflicts"] += 1
+                stats.coerce("pcs_per_ctn differs from ru_products (master used)")
+                notes.append(f"pcs_per_ctn {item_pcs} != master {spec.pcs_per_carton}")
+
+            pcs = index.pcs_per_carton(item.product_code, item_pcs)
+            cartons = index.cartons(item.product_code, item_pcs, qty)
+            cbm = cartons * spec.cbm if spec and spec.cbm is not None and cartons else None
+            weight = qty * spec.unit_weight_kg if spec and spec.unit_weight_kg is not None else None
+            if spec is not None and cbm is None:
+                order["items_without_cbm"] += 1
+            if spec is not None and weight is None:
+                order["items_without_weight"] += 1
+
+            order["total_cartons"] += cartons
+            order["total_cbm"] += cbm or 0.0
+            order["total_weight_kg"] += weight or 0.0
+            items_out.write_values(ItemRow(
+                item.order_id, item.product_code, item.destination, qty, pcs or "", cartons,
+                "" if cbm is None else round(cbm, 4), "" if weight is None else round(weight, 2),
+                "; ".join(notes)))
+
+    with CsvSink(LOGISTICS_DIR / "orders.csv", ORDER_FIELDS) as orders_out:
+        for order_id in sorted(orders):
+            o = orders[order_id]
+            orders_out.write_values([order_id, o["items"], o["total_qty"], o["total_cartons"],
+                                     round(o["total_cbm"], 4), round(o["total_weight_kg"], 2),
+                                     o["unknown_products"], o["pcs_conflicts"],
+                                     o["items_without_cbm"], o["items_without_weight"]])
+
+    print(f"Created: logistics/order_items.csv ({items_out.count} items)")
+    print(f"Created: logistics/orders.csv ({orders_out.count} orders)")
+    print(f"\n  {'order':<12} {'cartons':>8} {'cbm':>10} {'weight kg':>12}")
+    for order_id in sorted(orders):
+        o = orders[order_id]
+        print(f"  {order_id:<12} {o['total_cartons']:>8} {o['total_cbm']:>10.3f} {o['total_weight_kg']:>12.1f}")
+
+    if unknown:
+        print(f"\nProduct codes not in ru_products ({len(unknown)}):")
+        for code, count in unknown.most_common():
+            print(f"  {code}: {count} items")
+    if conflicts:
+        print(f"\npcs_per_ctn conflicts ({len(conflicts)}):")
+        for (code, item_pcs, master_pcs), order_id in sorted(conflicts.items()):
+            print(f"  {code}: item {item_pcs} vs master {master_pcs} (first in {order_id})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Estimate cartons / CBM / weight per order item and order")
+    parser.add_argument("--force", action="store_true")
+    args = parser.parse_args()
+
+    print("=== Order logistics ===\n")
+    run_stage("order_logistics", build_logistics,
+              inputs=[OUTPUT_DIR / "ru_order_items.csv", PRODUCTS_FILE, OUTPUT_DIR / "ru_packing_items.csv"],
+              outputs=[LOGISTICS_DIR / "order_items.csv", LOGISTICS_DIR / "orders.csv"],
+              sources=[__file__], force=args.force)
+    print("\n=== Done! ===")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+패킹리스트 헤더 합계 ← 패킹 아이템 집계 (packing_list_id별)
+
+- total_qty / total_cartons / total_nw_kg / total_gw_kg / total_cbm: 아이템 합계
+- total_pallets: 아이템의 고유 pallet_number 수
+- 아이템을 한 번 읽으면서 누적 (fix_packing_v2가 아이템을 기록하는 루프에서 add 호출)
+- 헤더 값과 집계가 허용 오차를 넘게 다르면 집계 값으로 교체하고 불일치로 보고
+  - 아이템이 없는 패킹리스트, pallet_number가 하나도 없는 패킹리스트의 팔레트 수는 헤더 유지
+
+사용법:
+  python scripts/packing_totals.py            # supabase_ready 패킹리스트 헤더 ↔ 아이템 합계 비교
+"""
+import argparse
+import sys
+from collections import defaultdict
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from pipeline import read_records
+from records import table_record
+from run_report import current_stats
+
+BASE_DIR = Path(__file__).parent.parent
+OUTPUT_DIR = BASE_DIR / "supabase_ready"
+
+
+class HeaderTotal(NamedTuple):
+    item_column: Optional[str]   # None: 팔레트 수 (고유 pallet_number)
+    scale: int                   # 기록할 소수 자리 (DDL numeric 스케일)
+    tolerance: Decimal           # 이 값보다 크게 다르면 불일치
+
+
+# ru_packing_lists 합계 컬럼
+HEADER_TOTALS = {
+    "total_qty": HeaderTotal("qty", 0, Decimal(0)),
+    "total_cartons": HeaderTotal("cartons", 0, Decimal(0)),
+    "total_nw_kg": HeaderTotal("nw_kg", 2, Decimal("0.05")),
+    "total_gw_kg": HeaderTotal("gw_kg", 2, Decimal("0.05")),
+    "total_cbm": HeaderTotal("cbm", 4, Decimal("0.001")),
+    "total_pallets": HeaderTotal(None, 0, Decimal(0)),
+}
+SUM_COLUMNS = [(column, total.item_column) for column, total in HEADER_TOTALS.items() if total.item_column]
+
+
+class Mismatch(NamedTuple):
+    pl_number: str
+    column: str
+    header: str
+    items: str
+
+
+def _decimal(value: str) -> Optional[Decimal]:
+    try:
+        return Decimal(value) if value else Decimal(0)
+    except InvalidOperation:
+        return None
+
+
+def _format(value: Decimal, scale: int) -> str:
+    return str(value.quantize(Decimal(1).scaleb(-scale)))
+
+
+class PackingTotals:
+    """packing_list_id별 합계 누적"""
+
+    def __init__(self):
+        self._sums = {}
+        self._pallets = defaultdict(set)
+
+    def add(self, item):
+        """ru_packing_items 레코드 하나 누적"""
+        sums = self._sums.get(item.packing_list_id)
+        if sums is None:
+            sums = self._sums[item.packing_list_id] = [Decimal(0)] * len(SUM_COLUMNS)
+        for i, (_, item_column) in enumerate(SUM_COLUMNS):
+            value = _decimal(getattr(item, item_column))
+            if value is None:
+                current_stats().coerce(f"unparsable {item_column} (not in header totals)")
+                continue
+            sums[i] += value
+        pallet = getattr(item, "pallet_number", "")
+        if pallet:
+            self._pallets[item.packing_list_id].add(pallet)
+
+    def totals(self, packing_list_id: str) -> Optional[dict]:
+        """{헤더 컬럼: 집계 값 문자열}, 아이템이 없으면 None (팔레트 번호가 없으면 total_pallets 제외)"""
+        sums = self._sums.get(packing_list_id)
+        if sums is None:
+            return None
+        result = {column: _format(value, HEADER_TOTALS[column].scale)
+                  for (column, _), value in zip(SUM_COLUMNS, sums)}
+        if self._pallets.get(packing_list_id):
+            result["total_pallets"] = str(len(self._pallets[packing_list_id]))
+        return result
+
+    def reconcile(self, header) -> list:
+        """
+        헤더 레코드(pl_number, total_* 필드)를 집계 값으로 교체, 허용 오차를 넘은 불일치 목록 반환
+
+        원본에 없는 컬럼(빈 값)은 불일치로 보지 않고 채움
+        """
+        stats = current_stats()
+        totals = self.totals(header.pl_number)
+        if totals is None:
+            stats.coerce("packing list without items (header totals kept)")
+            return []
+        if "total_pallets" not in totals:
+            stats.coerce("no pallet_number on items (total_pallets kept)")
+
+        mismatches = []
+        for column, computed in totals.items():
+            original = getattr(header, column)
+            setattr(header, column, computed)
+            if original == "":
+                continue
+            value = _decimal(original)
+            if value is None or abs(value - Decimal(computed)) > HEADER_TOTALS[column].tolerance:
+                mismatches.append(Mismatch(header.pl_number, column, original, computed))
+                stats.coerce(f"{column} differs from items (recomputed)")
+        return mismatches
+
+
+def print_mismatches(mismatches: list, limit: int = 20):
+    if not mismatches:
+        print("Packing list totals match items")
+        return
+    print(f"Packing list totals differing from items ({len(mismatches)}):")
+    for m in mismatches[:limit]:
+        print(f"  {m.pl_number:<24} {m.column:<14} header {m.header:>12} → items {m.items:>12}")
+    if len(mismatches) > limit:
+        print(f"  ... {len(mismatches) - limit} more")
+
+
+def compare(output_dir: Path = OUTPUT_DIR) -> list:
+    """supabase_ready의 패킹리스트 헤더와 아이템 합계 비교 (파일은 변경하지 않음)"""
+    totals = PackingTotals()
+    Item = table_record("ru_packing_items", ["packing_list_id", "qty", "cartons", "nw_kg", "gw_kg",
+                                             "cbm", "pallet_number"])
+    for item in read_records(output_dir / "ru_packing_items.csv", Item):
+        totals.add(item)
+
+    Header = table_record("ru_packing_lists", ["pl_number", *HEADER_TOTALS])
+    mismatches = []
+    for header in read_records(output_dir / "ru_packing_lists.csv", Header):
+        mismatches += totals.reconcile(header)
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare packing list header totals with their items")
+    parser.add_argument("--dir", type=Path, default=OUTPUT_DIR)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    print("=== Packing list totals ===\n")
+    mismatches = compare(args.dir)
+    print_mismatches(mismatches, args.limit)
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""
+팔레트 적재 계획 (발주 아이템 → 팔레트별 ru_packing_items + ru_packing_lists 합계)
+
+- 발주(order_id)의 아이템을 Destination별 패킹리스트 1개로 묶고, 품목별 카톤 묶음으로 변환
+  - 입수/카톤 CBM: 제품 마스터 (order_logistics.ProductIndex)
+  - 카톤 CBM이 없으면 패킹 실적 개당 CBM × 입수, 카톤 중량은 패킹 실적 개당 N.W./G.W. × 입수
+- First-fit decreasing: 카톤 CBM이 큰 품목부터, 열린 팔레트 중 첫 번째로 들어가는 곳에
+  들어가는 만큼 (CBM / 중량 한도) 넣고 남으면 새 팔레트
+  - 카톤 단위가 아니라 품목 묶음 단위로 계산 → 품목 수 × 팔레트 수에 비례
+- 높이 한도는 (적재 높이 - 팔레트 높이) × 바닥 면적 × 적재율 = CBM 한도로 환산,
+  카톤 한 개 높이(CBM 세제곱근 추정)가 적재 높이를 넘으면 문제로 보고
+- 헤더 합계는 packing_totals.PackingTotals로 계획한 아이템에서 집계
+- --destination은 목적지 분류기(destinations)로 해석 (MOSCOW → 모스크바 거래처 목적지 전체)
+
+출력: packing_plan/ru_packing_items.csv (supabase_ready와 같은 컬럼),
+      packing_plan/ru_packing_lists.csv (order_id, pl_number, destination + 헤더 합계 컬럼만)
+
+사용법:
+  python scripts/pallet_planner.py RU-2025-01
+  python scripts/pallet_planner.py RU-2025-01 --destination MOSCOW --max-weight 800
+"""
+import argparse
+import sys
+import time
+import uuid
+from collections import defaultdict
+from pathlib import Path
+from typing import Callable, NamedTuple, Optional
+
+from clean_csv import PACKING_ITEM_FIELDS
+from destinations import classify
+from order_logistics import PRODUCTS_FILE, ProductIndex
+from packing_totals import HEADER_TOTALS, PackingTotals
+from pipeline import CsvSink, read_records
+from records import table_record
+
+BASE_DIR = Path(__file__).parent.parent
+OUTPUT_DIR = BASE_DIR / "supabase_ready"
+PLAN_DIR = BASE_DIR / "packing_plan"
+
+PLAN_LIST_FIELDS = ["order_id", "pl_number", "destination", *HEADER_TOTALS]
+
+# 같은 입력이면 같은 id (재실행해도 diff가 생기지 않음)
+_ID_NAMESPACE = uuid.UUID("3f1c7a52-6f0e-4f0b-9a59-2d6d2f4b8c11")
+
+
+class PalletLimits(NamedTuple):
+    length_m: float = 1.1
+    width_m: float = 1.1
+    max_height_m: float = 1.5      # 팔레트 포함 적재 높이
+    base_height_m: float = 0.15    # 팔레트 자체 높이
+    max_weight_kg: float = 1000.0
+    fill_ratio: float = 0.85       # 카톤 사이 빈 공간을 뺀 적재율
+
+    @property
+    def stack_height_m(self) -> float:
+        return self.max_height_m - self.base_height_m
+
+    @property
+    def max_cbm(self) -> float:
+        return self.length_m * self.width_m * self.stack_height_m * self.fill_ratio
+
+
+class CartonGroup(NamedTuple):
+    """같은 품목 카톤 묶음 (값은 카톤 1개 기준)"""
+    product_code: str
+    product_name: str
+    qty: int
+    pcs_per_carton: int
+    cartons: int
+    cbm: float
+    nw_kg: float
+    gw_kg: float
+
+
+class Pallet:
+    __slots__ = ("number", "cbm", "weight_kg", "lines")
+
+    def __init__(self, number: int):
+        self.number = number
+        self.cbm = 0.0
+        self.weight_kg = 0.0
+        self.lines = []   # [(CartonGroup, 카톤 수)]
+
+    def room(self, group: CartonGroup, limits: PalletLimits) -> int:
+        """이 팔레트에 더 넣을 수 있는 group 카톤 수"""
+        by_cbm = int((limits.max_cbm - self.cbm) / group.cbm + 1e-9) if group.cbm > 0 else group.cartons
+        by_weight = int((limits.max_weight_kg - self.weight_kg) / group.gw_kg + 1e-9) \
+            if group.gw_kg > 0 else group.cartons
+        return max(0, min(by_cbm, by_weight))
+
+    def add(self, group: CartonGroup, cartons: int):
+        self.cbm += group.cbm * cartons
+        self.weight_kg += group.gw_kg * cartons
+        self.lines.append((group, cartons))
+
+
+def plan_pallets(groups: list, limits: PalletLimits = PalletLimits()) -> tuple:
+    """카톤 묶음 → (팔레트 목록, 문제 목록), first-fit decreasing"""
+    pallets = []
+    problems = []
+    for group in sorted(groups, key=lambda g: (-g.cbm, -g.gw_kg, g.product_code)):
+        remaining = group.cartons
+
+        if group.cbm > limits.max_cbm or group.gw_kg > limits.max_weight_kg or \
+                group.cbm ** (1 / 3) > limits.stack_height_m:
+            problems.append(f"{group.product_code}: carton exceeds pallet limits "
+                            f"({group.cbm:.4f} m3, {group.gw_kg:.1f} kg), one carton per pallet")
+            for _ in range(remaining):
+                pallet = Pallet(len(pallets) + 1)
+                pallet.add(group, 1)
+                pallets.append(pallet)
+            continue
+
+        for pallet in pallets:
+            if not remaining:
+                break
+            fit = min(remaining, pallet.room(group, limits))
+            if fit:
+                pallet.add(group, fit)
+                remaining -= fit
+
+        while remaining:
+            pallet = Pallet(len(pallets) + 1)
+            fit = min(remaining, pallet.room(group, limits))
+            pallet.add(group, fit)
+            pallets.append(pallet)
+            remaining -= fit
+
+    return pallets, problems
+
+
+def carton_groups(items: list, index: ProductIndex) -> tuple:
+    """발주 아이템 (같은 품목은 합침) → (카톤 묶음 목록, 문제 목록)"""
+    qty = defaultdict(int)
+    names = {}
+    item_pcs = {}
+    for item in items:
+        qty[item.product_code] += int(float(item.requested_qty or 0))
+        names.setdefault(item.product_code, item.product_name)
+        item_pcs.setdefault(item.product_code, int(float(item.pcs_per_ctn or 0)))
+
+    groups, problems = [], []
+    for code, total in qty.items():
+        spec = index.get(code)
+        unit = index.units.get(code)
+        pcs = index.pcs_per_carton(code, item_pcs[code])
+        cbm = spec.cbm if spec and spec.cbm else (unit.cbm * pcs if unit else None)
+        if not pcs or not cbm or unit is None and (spec is None or spec.unit_weight_kg is None):
+            problems.append(f"{code}: missing pcs_per_carton / cbm / weight, not planned ({total} pcs)")
+            continue
+        gw = (spec.unit_weight_kg if spec and spec.unit_weight_kg is not None else unit.gw_kg) * pcs
+        nw = unit.nw_kg * pcs if unit else gw
+        groups.append(CartonGroup(code, names[code], total, pcs, -(-total // pcs), cbm, nw, gw))
+    return groups, problems
+
+
+def packing_rows(pl_number: str, pallets: list) -> list:
+    """팔레트 적재 결과 → ru_packing_items 레코드 (수량은 카톤 순서대로 배분, 마지막 카톤이 잔량)"""
+    Item = table_record("ru_packing_items", PACKING_ITEM_FIELDS)
+    remaining = {}
+    rows = []
+    for pallet in pallets:
+        for group, cartons in pallet.lines:
+            left = remaining.setdefault(group.product_code, group.qty)
+            qty = min(left, cartons * group.pcs_per_carton)
+            remaining[group.product_code] = left - qty
+            item_id = uuid.uuid5(_ID_NAMESPACE, f"{pl_number}/{pallet.number}/{group.product_code}")
+            rows.append(Item(str(item_id), pl_number, group.product_code, group.product_name, qty, cartons,
+                             round(group.nw_kg * cartons, 3), round(group.gw_kg * cartons, 3),
+                             round(group.cbm * cartons, 5), pallet.number))
+    return rows
+
+
+def destination_filter(destination: Optional[str]) -> Callable[[str], bool]:
+    """
+    --destination 값 → 아이템 목적지 판정 함수
+
+    목적지 분류기로 인식되면 같은 목적지 (상위 도시면 그 거래처 목적지 포함: MOSCOW → MOSCOW PFO 등),
+    인식되지 않으면 부분 문자열 (대소문자 무시)
+    """
+    if destination is None:
+        return lambda _: True
+    wanted = classify(destination)
+    if wanted is None:
+        needle = destination.lower()
+        return lambda value: needle in value.lower()
+
+    def selected(value: str) -> bool:
+        found = classify(value)
+        return found is not None and wanted.name in (found.name, found.parent)
+    return selected
+
+
+def plan_order(order_id: str, destination: Optional[str] = None, limits: PalletLimits = PalletLimits(),
+               output_dir: Path = OUTPUT_DIR, plan_dir: Path = PLAN_DIR) -> dict:
+    """발주 1건 계획 → packing_plan/*.csv, {pl_number: (팔레트 목록, 문제 목록)} 반환"""
+    OrderItem = table_record("ru_order_items", ["order_id", "product_code", "product_name", "destination",
+                                                "requested_qty", "pcs_per_ctn"])
+    selected = destination_filter(destination)
+    by_destination = defaultdict(list)
+    for item in read_records(output_dir / "ru_order_items.csv", OrderItem):
+        if item.order_id == order_id and selected(item.destination):
+            by_destination[item.destination].append(item)
+    if not by_destination:
+        raise ValueError(f"No items for {order_id}" + (f" / {destination}" if destination else ""))
+
+    index = ProductIndex.load(output_dir / PRODUCTS_FILE.name, output_dir / "ru_packing_items.csv")
+    Header = table_record("ru_packing_lists", PLAN_LIST_FIELDS)
+    totals = PackingTotals()
+    plans = {}
+
+    plan_dir.mkdir(exist_ok=True)
+    with CsvSink(plan_dir / "ru_packing_items.csv", PACKING_ITEM_FIELDS) as items_out:
+        for n, (dest, items) in enumerate(sorted(by_destination.items()), 1):
+            pl_number = f"{order_id}-P{n}"
+            groups, problems = carton_groups(items, index)
+            pallets, pallet_problems = plan_pallets(groups, limits)
+            plans[pl_number] = (dest, pallets, problems + pallet_problems)
+            for row in packing_rows(pl_number, pallets):
+                totals.add(row)
+                items_out.write_values(row)
+
+    with CsvSink(plan_dir / "ru_packing_lists.csv", PLAN_LIST_FIELDS) as lists_out:
+        for pl_number, (dest, _, _) in plans.items():
+            header = Header(order_id, pl_number, dest)
+            totals.reconcile(header)
+            lists_out.write_values(header)
+    return plans
+
+
+def actual_pallets(order_id: str, output_dir: Path = OUTPUT_DIR) -> Optional[int]:
+    """실제 패킹리스트의 팔레트 수 합계 (비교용)"""
+    path = output_dir / "ru_packing_lists.csv"
+    if not path.exists():
+        return None
+    Header = table_record("ru_packing_lists", ["order_id", "total_pallets"])
+    return sum(int(float(h.total_pallets or 0)) for h in read_records(path, Header) if h.order_id == order_id)
+
+
+def main():
+    defaults = PalletLimits()
+    parser = argparse.ArgumentParser(description="Plan pallets for an order (first-fit decreasing)")
+    parser.add_argument("order_id", help="e.g. RU-2025-01")
+    parser.add_argument("--destination", help="only items for this destination (e.g. MOSCOW, 크라스노다르, PFO); "
+                                              "unrecognized text matches as a substring")
+    parser.add_argument("--max-height", type=float, default=defaults.max_height_m, help="m, pallet included")
+    parser.add_argument("--max-weight", type=float, default=defaults.max_weight_kg, help="kg per pallet")
+    parser.add_argument("--fill-ratio", type=float, default=defaults.fill_ratio)
+    args = parser.parse_args()
+
+    if args.max_weight <= 0:
+        parser.error(f"--max-weight must be positive (got {args.max_weight:g})")
+    if args.max_height <= defaults.base_height_m:
+        parser.error(f"--max-height must exceed the pallet base height {defaults.base_height_m:g} m "
+                     f"(got {args.max_height:g})")
+    if not 0 < args.fill_ratio <= 1:
+        parser.error(f"--fill-ratio must be in (0, 1] (got {args.fill_ratio:g})")
+    limits = defaults._replace(max_height_m=args.max_height, max_weight_kg=args.max_weight,
+                               fill_ratio=args.fill_ratio)
+    print(f"=== Pallet plan: {args.order_id} ===")
+    print(f"Limits: {limits.max_cbm:.2f} m3 / {limits.max_weight_kg:.0f} kg per pallet\n")
+
+    started = time.perf_counter()
+    try:
+        plans = plan_order(args.order_id, args.destination, limits)
+    except ValueError as e:
+        print(e)
+        sys.exit(1)
+    elapsed = time.perf_counter() - started
+
+    total = 0
+    for pl_number, (dest, pallets, problems) in plans.items():
+        total += len(pallets)
+        cartons = sum(c for p in pallets for _, c in p.lines)
+        print(f"{pl_number}  {dest}: {len(pallets)} pallets, {cartons} cartons")
+        for pallet in pallets:
+            print(f"  #{pallet.number:<3} {len(pallet.lines):>3} SKUs  {pallet.cbm:6.3f} m3  {pallet.weight_kg:7.1f} kg")
+        for problem in problems:
+            print(f"  ! {problem}")
+
+    actual = actual_pallets(args.order_id)
+    print(f"\nPlanned {total} pallets in {elapsed:.3f}s" +
+          (f" (packing lists for {args.order_id}: {actual} pallets)" if actual else ""))
+    print(f"Saved: {PLAN_DIR / 'ru_packing_items.csv'}, {PLAN_DIR / 'ru_packing_lists.csv'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+스트리밍 CSV 파이프라인 (read → transform → write)
+- 입력을 한 행씩 읽어 바로 출력 파일에 기록 (메모리 사용량 일정)
+- 집계가 필요한 경우 호출하는 쪽에서 누적 변수로 처리
+- 출력은 임시 파일에 쓴 뒤 완료 시 교체 (중간 실패 시 기존 파일 유지)
+- read_records / write_values: dict 대신 records.py의 __slots__ 레코드를 위치 기반으로 읽고 씀
+- 읽은/쓴 행 수는 실행 중인 단계의 통계(run_report)에 파일별로 기록
+"""
+import csv
+import os
+from operator import itemgetter
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional
+
+from run_report import current_stats
+
+
+def read_header(path: Path, encoding: str = "utf-8-sig") -> list:
+    """CSV 헤더(컬럼명)만 읽기"""
+    with open(path, "r", encoding=encoding) as f:
+        return next(csv.reader(f), [])
+
+
+def read_rows(path: Path, encoding: str = "utf-8-sig") -> Iterator[dict]:
+    """CSV 파일을 dict 행 단위로 스트리밍"""
+    count = 0
+    try:
+        with open(path, "r", encoding=encoding) as f:
+            for row in csv.DictReader(f):
+                count += 1
+                yield row
+    finally:
+        current_stats().read(path, count)
+
+
+def read_records(path: Path, record: type, encoding: str = "utf-8-sig") -> Iterator:
+    """
+    CSV를 record 클래스(records.record_class/table_record) 단위로 스트리밍
+
+    - 헤더에서 record._fields의 위치를 한 번만 계산, 행마다 위치로 값을 꺼냄
+    - 헤더에 없는 필드는 '' (DictReader와 같이 빈 줄은 건너뜀)
+    """
+    count = 0
+    try:
+        with open(path, "r", encoding=encoding, newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            index = {name: i for i, name in enumerate(header)}
+            width = len(header)
+
+            if list(record._fields) == header:
+                for row in reader:
+                    if not row:
+                        continue
+                    if len(row) != width:
+                        row = (row + [""] * width)[:width]
+                    count += 1
+                    yield record(*row)
+                return
+
+            # 헤더에 없는 필드는 맨 끝에 붙인 빈 칸을 가리킴
+            positions = [index.get(name, width) for name in record._fields]
+            getter = itemgetter(*positions) if len(positions) > 1 else (lambda r: (r[positions[0]],))
+            for row in reader:
+                if not row:
+                    continue
+                if len(row) != width:
+                    row = (row + [""] * width)[:width]
+                row.append("")
+                count += 1
+                yield record(*getter(row))
+    finally:
+        current_stats().read(path, count)
+
+
+class CsvSink:
+    """행을 받는 즉시 기록하는 CSV 출력 (with 문으로 사용, 원자적 교체)"""
+
+    def __init__(self, path: Path, fieldnames: list, encoding: str = "utf-8"):
+        self.path = Path(path)
+        self.fieldnames = list(fieldnames)
+        self.encoding = encoding
+        self.tmp_path = self.path.with_name(self.path.name + ".tmp")
+        self.count = 0
+        self._file = None
+        self._writer = None
+        self._values_writer = None
+
+    def __enter__(self):
+        self._file = open(self.tmp_path, "w", encoding=self.encoding, newline="")
+        self._writer = csv.DictWriter(self._file, fieldnames=self.fieldnames)
+        self._values_writer = csv.writer(self._file)
+        self._writer.writeheader()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._file.close()
+        if exc_type is None:
+            os.replace(self.tmp_path, self.path)
+            current_stats().wrote(self.path, self.count)
+        else:
+            self.tmp_path.unlink(missing_ok=True)
+        return False
+
+    def write(self, row: dict):
+        self._writer.writerow(row)
+        self.count += 1
+
+    def write_values(self, values: Iterable):
+        """fieldnames 순서의 값 목록(또는 레코드)을 그대로 기록 (dict 변환 없음)"""
+        self._values_writer.writerow(values)
+        self.count += 1
+
+    def write_all(self, rows: Iterable[dict]) -> int:
+        for row in rows:
+            self.write(row)
+        return self.count
+
+
+def write_rows(path: Path, fieldnames: list, rows: Iterable[dict]) -> int:
+    """rows(iterable)를 소비하면서 CSV로 기록, 기록한 행 수 반환"""
+    with CsvSink(path, fieldnames) as sink:
+        return sink.write_all(rows)
+
+
+def transform_csv(
+    input_path: Path,
+    output_path: Path,
+    fieldnames: list,
+    transform: Callable[[dict], Optional[dict]],
+    encoding: str = "utf-8-sig",
+) -> int:
+    """input → transform → output 스트리밍 (transform이 None을 반환하면 행 제외)"""
+    rows = (transform(row) for row in read_rows(input_path, encoding))
+    return write_rows(output_path, fieldnames, (row for row in rows if row is not None))
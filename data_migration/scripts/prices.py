@@ -0,0 +1,197 @@
+"""
+가격 이력 (ru_prices) + 시점 기준(as-of) 가격 조회
+
+ru_prices.csv 생성 (product_info.csv + merged_order_history.csv):
+- 주문 이력에서 공급가 + 수수료 = 결제단가인 행만 가격 근거로 사용
+- 품목별 주문일마다 가장 많이 나온 (공급가, 수수료, 결제단가) → 직전과 달라진 날짜만 이력으로 기록
+- product_info의 현재 가격이 마지막 이력과 다르면 마지막 주문일 다음 날부터 적용된 것으로 추가
+- 주문 이력이 없는 품목은 현재 가격 1건 (DEFAULT_EFFECTIVE_DATE)
+- product_info에서 product_code가 중복된 행(BTBC008, FJAP003)은 첫 행만 사용 ((product_code, effective_date) 중복 방지)
+
+PriceIndex: 품목별 적용일 정렬 목록 + bisect → 주문일 기준 가격 조회 (create_orders_v3에서 사용)
+
+사용법:
+  python scripts/prices.py                        # ru_prices.csv 생성
+  python scripts/prices.py --lookup VMSP007 2025-08-01
+"""
+import argparse
+import sys
+from bisect import bisect_right
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from clean_csv import ProductInfoRow, clean_price
+from dates import normalize_date
+from manifest import run_stage
+from pipeline import CsvSink, read_records
+from records import record_class, table_record
+from run_report import current_stats
+
+BASE_DIR = Path(__file__).parent.parent
+OUTPUT_DIR = BASE_DIR / "supabase_ready"
+PRICES_FILE = OUTPUT_DIR / "ru_prices.csv"
+
+PRICE_FIELDS = ["product_code", "supply_price", "commission", "final_price", "effective_date"]
+DEFAULT_EFFECTIVE_DATE = "2025-01-01"
+
+# 공급가 + 수수료와 결제단가의 허용 오차 (원본 소수점 오차)
+PRICE_TOLERANCE = 1
+
+HistoryPriceRow = record_class("HistoryPriceRow", [
+    "OrderDate", "ProductCode", "SupplyPriceUnit", "CommissionUnit", "PaymentAmountUnit"])
+
+
+class Price(NamedTuple):
+    supply_price: int
+    commission: int
+    final_price: int
+
+
+def _to_int(value: str) -> Optional[int]:
+    try:
+        return int(float(value)) if value else 0
+    except (ValueError, OverflowError):
+        return None
+
+
+def consistent(price: Price) -> bool:
+    """공급가 > 0 이고 공급가 + 수수료 = 결제단가"""
+    return price.supply_price > 0 and \
+        abs(price.supply_price + price.commission - price.final_price) <= PRICE_TOLERANCE
+
+
+class PriceIndex:
+    """품목별 (적용일 정렬 목록, 가격 목록), 조회는 bisect"""
+
+    def __init__(self):
+        self._dates = defaultdict(list)
+        self._prices = defaultdict(list)
+        self._cache = {}
+
+    def add(self, product_code: str, effective_date: str, price: Price):
+        dates = self._dates[product_code]
+        i = bisect_right(dates, effective_date)
+        dates.insert(i, effective_date)
+        self._prices[product_code].insert(i, price)
+        self._cache.clear()
+
+    def lookup(self, product_code: str, on_date: str) -> Optional[Price]:
+        """on_date에 적용 중인 가격 (첫 적용일 이전이거나 품목이 없으면 None)"""
+        key = (product_code, on_date)
+        if key not in self._cache:
+            dates = self._dates.get(product_code)
+            i = bisect_right(dates, on_date) if dates else 0
+            self._cache[key] = self._prices[product_code][i - 1] if i else None
+        return self._cache[key]
+
+    def history(self, product_code: str) -> list:
+        """[(적용일, 가격)]"""
+        return list(zip(self._dates.get(product_code, []), self._prices.get(product_code, [])))
+
+    def __len__(self) -> int:
+        return len(self._dates)
+
+    @classmethod
+    def from_csv(cls, path: Path = PRICES_FILE) -> "PriceIndex":
+        """ru_prices.csv → 인덱스 (파일이 없으면 빈 인덱스)"""
+        index = cls()
+        if not Path(path).exists():
+            return index
+        PriceRow = table_record("ru_prices", PRICE_FIELDS)
+        for row in read_records(path, PriceRow):
+            numbers = [_to_int(v) for v in (row.supply_price, row.commission, row.final_price)]
+            if row.product_code and row.effective_date and None not in numbers:
+                index.add(row.product_code, row.effective_date, Price(*numbers))
+        return index
+
+
+def derive_history(history_file: Path) -> dict:
+    """주문 이력 → {품목: [(적용일, 가격)]} (가격이 바뀐 날짜만)"""
+    stats = current_stats()
+    daily = defaultdict(Counter)   # (품목, 주문일) → 가격별 행 수
+
+    for row in read_records(history_file, HistoryPriceRow):
+        code = row.ProductCode.strip()
+        numbers = [_to_int(v) for v in (row.SupplyPriceUnit, row.CommissionUnit, row.PaymentAmountUnit)]
+        order_date = normalize_date(row.OrderDate)
+        if not code or not order_date or None in numbers:
+            continue
+        price = Price(*numbers)
+        if consistent(price):
+            daily[code, order_date][price] += 1
+        else:
+            stats.coerce("history price not used (supply + commission != unit)")
+
+    points = defaultdict(list)
+    for code, order_date in sorted(daily):
+        price = daily[code, order_date].most_common(1)[0][0]
+        if not points[code] or points[code][-1][1] != price:
+            points[code].append((order_date, price))
+    return points
+
+
+def build_prices():
+    """product_info.csv + merged_order_history.csv → ru_prices.csv"""
+    stats = current_stats()
+    history = derive_history(BASE_DIR / "merged_order_history.csv")
+    PriceRow = table_record("ru_prices", PRICE_FIELDS)
+    with_history = 0
+    written = set()
+
+    with CsvSink(PRICES_FILE, PRICE_FIELDS) as prices:
+        for row in read_records(BASE_DIR / "product_info.csv", ProductInfoRow, encoding="utf-8"):
+            code = row.product_code
+            if not code.strip():
+                stats.drop("empty product_code")
+                continue
+            # 같은 코드가 여러 번이면 첫 행만 (ProductIndex / NameIndex와 같은 규칙)
+            if code in written:
+                stats.drop("duplicate product_code (first row kept)")
+                continue
+            written.add(code)
+
+            current = Price(clean_price(row.price_supply), clean_price(row.commission),
+                            clean_price(row.price_unit))
+            points = history.get(code, [])
+            if points:
+                with_history += 1
+            for effective_date, price in points:
+                prices.write_values(PriceRow(code, *price, effective_date))
+
+            if not points:
+                prices.write_values(PriceRow(code, *current, DEFAULT_EFFECTIVE_DATE))
+            elif points[-1][1] != current:
+                # 현재 가격은 마지막 주문 이후 적용된 것으로 간주
+                since = date.fromisoformat(points[-1][0]) + timedelta(days=1)
+                prices.write_values(PriceRow(code, *current, since.isoformat()))
+
+    print(f"Created: {PRICES_FILE.name} ({prices.count} rows, {with_history} products with order history)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build ru_prices history / look up as-of prices")
+    parser.add_argument("--lookup", nargs=2, metavar=("PRODUCT_CODE", "DATE"),
+                        help="print the price valid on DATE from ru_prices.csv")
+    parser.add_argument("--force", action="store_true")
+    args = parser.parse_args()
+
+    if args.lookup:
+        code, on_date = args.lookup
+        index = PriceIndex.from_csv()
+        for effective_date, price in index.history(code):
+            print(f"  {effective_date}  {price.supply_price:>8} {price.commission:>6} {price.final_price:>8}")
+        price = index.lookup(code, normalize_date(on_date))
+        print(f"{code} @ {on_date}: {price}")
+        sys.exit(0 if price else 1)
+
+    print("=== Building price history ===\n")
+    run_stage("prices", build_prices,
+              inputs=[BASE_DIR / "product_info.csv", BASE_DIR / "merged_order_history.csv"],
+              outputs=[PRICES_FILE], sources=[__file__], force=args.force)
+    print("\n=== Done! ===")
+
+
+if __name__ == "__main__":
+    main()
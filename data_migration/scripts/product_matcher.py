@@ -0,0 +1,199 @@
+"""
+발주 이력 EnglishName → product_code 매칭 (제품 마스터 문자 n-gram 역색인)
+
+- NameIndex: ru_products.csv의 name_en을 정규화(소문자, 줄바꿈/기호 → 공백)해 문자 3-gram 집합으로 만들고
+  {3-gram: [제품 번호]} 역색인 구성
+- 조회: 이름의 3-gram마다 역색인 목록을 따라가 제품별 공유 3-gram 수를 세고(후보는 색인에서만 나옴),
+  Dice 계수 2·공유 / (이름 + 제품 3-gram 수)로 점수 → 1위가 MIN_SCORE 이상이고 2위와 MIN_MARGIN 이상 차이나면 확정
+  - 용량만 다른 형제 품목(500ml / 2L)은 점수 차이가 작아 확정하지 않음 (후보로만 보고)
+- 같은 이름은 한 번만 계산 (캐시)
+
+create_orders_v3는 ProductCode가 빈 행을 버리지 않고 이 색인으로 확정된 코드를 채움 (확정 못 하면 제외)
+
+출력 (CLI): product_matches/history_matches.csv
+  - ProductCode가 비었거나 제품 마스터에 없는 행, 코드의 name_en과 EnglishName 점수가 MIN_SCORE 미만인 행
+  - 행마다 제안 코드 / 점수 / 2위 후보
+
+사용법:
+  python scripts/product_matcher.py                                # 이력 전체 검사 + 리포트
+  python scripts/product_matcher.py --name "Fraijour Heartleaf Blemish Renew Ampoule 50ml"
+"""
+import argparse
+import re
+from bisect import bisect_left
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from pipeline import CsvSink, read_records
+from records import record_class, table_record
+
+BASE_DIR = Path(__file__).parent.parent
+OUTPUT_DIR = BASE_DIR / "supabase_ready"
+MATCH_DIR = BASE_DIR / "product_matches"
+PRODUCTS_FILE = OUTPUT_DIR / "ru_products.csv"
+HISTORY_FILE = BASE_DIR / "merged_order_history.csv"
+
+NGRAM = 3
+MIN_SCORE = 0.75     # 이 점수 이상이어야 확정
+MIN_MARGIN = 0.05    # 2위와 이만큼 차이나야 확정
+CANDIDATES = 5       # 리포트에 남기는 후보 수
+
+REPORT_FIELDS = ["row", "order_date", "product_code", "english_name", "reason",
+                 "suggested_code", "score", "runner_up_code", "runner_up_score", "resolved"]
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+class Match(NamedTuple):
+    product_code: str
+    score: float
+
+
+def normalize_name(name: str) -> str:
+    """'Fraijour  Heartleaf\\nAmpoule (50ml)' → 'fraijour heartleaf ampoule 50ml'"""
+    return _NON_WORD.sub(" ", name.lower()).strip()
+
+
+def ngrams(name: str, n: int = NGRAM) -> set:
+    """정규화한 이름의 문자 n-gram 집합 (앞뒤 공백 패딩으로 단어 경계 포함)"""
+    text = f" {normalize_name(name)} "
+    return {text[i:i + n] for i in range(len(text) - n + 1)} if len(text) > n else set()
+
+
+class NameIndex:
+    """제품명 문자 n-gram 역색인"""
+
+    def __init__(self, products: list):
+        """products: [(product_code, name)] (같은 코드가 여러 번이면 첫 번째)"""
+        self.codes = []
+        self.sizes = []
+        self.ids = {}        # product_code → 제품 번호
+        self.postings = defaultdict(list)
+        self._cache = {}
+        seen = set()
+        for code, name in products:
+            if code in seen or not name.strip():
+                continue
+            seen.add(code)
+            grams = ngrams(name)
+            for gram in grams:
+                self.postings[gram].append(len(self.codes))
+            self.ids[code] = len(self.codes)
+            self.codes.append(code)
+            self.sizes.append(len(grams))
+        self.names = dict(products[::-1]) if products else {}
+
+    @classmethod
+    def load(cls, products_file: Path = PRODUCTS_FILE) -> "NameIndex":
+        Product = table_record("ru_products", ["product_code", "name_en"])
+        return cls([(p.product_code, p.name_en) for p in read_records(products_file, Product)])
+
+    def candidates(self, name: str, limit: int = CANDIDATES) -> list:
+        """[Match] 점수 내림차순 (공유 n-gram이 있는 제품만)"""
+        key = normalize_name(name)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached[:limit]
+
+        grams = ngrams(key)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.postings.get(gram, ()))
+        scored = sorted(((2 * count / (len(grams) + self.sizes[i]), self.codes[i])
+                         for i, count in shared.items()), reverse=True)
+        result = [Match(code, round(score, 4)) for score, code in scored[:CANDIDATES]]
+        self._cache[key] = result
+        return result[:limit]
+
+    def match(self, name: str) -> Optional[Match]:
+        """확정 매칭 (1위 점수 MIN_SCORE 이상 + 2위와 MIN_MARGIN 이상 차이), 없으면 None"""
+        found = self.candidates(name, 2)
+        if not found or found[0].score < MIN_SCORE:
+            return None
+        if len(found) > 1 and found[0].score - found[1].score < MIN_MARGIN:
+            return None
+        return found[0]
+
+    def score(self, name: str, product_code: str) -> float:
+        """이름과 특정 제품의 점수 (후보 순위와 무관하게 역색인에서 직접 계산, 색인에 없는 코드는 0)"""
+        i = self.ids.get(product_code)
+        grams = ngrams(name)
+        if i is None or not grams:
+            return 0.0
+        # 역색인 목록은 제품 번호 오름차순 → 이분 탐색
+        shared = 0
+        for gram in grams:
+            posting = self.postings.get(gram, ())
+            j = bisect_left(posting, i)
+            shared += j < len(posting) and posting[j] == i
+        return round(2 * shared / (len(grams) + self.sizes[i]), 4)
+
+
+def load_name_index() -> NameIndex:
+    """create_orders_v3용: ru_products.csv가 없으면 빈 색인 (매칭 없음)"""
+    if not PRODUCTS_FILE.exists():
+        print(f"{PRODUCTS_FILE.name} not found: rows without ProductCode are dropped (run clean_csv.py first)")
+        return NameIndex([])
+    return NameIndex.load(PRODUCTS_FILE)
+
+
+def check_history(history_file: Path = HISTORY_FILE, index: Optional[NameIndex] = None,
+                  report_file: Path = MATCH_DIR / "history_matches.csv") -> Counter:
+    """발주 이력 전체를 검사해 리포트 작성, {사유: 행 수} 반환"""
+    index = index or NameIndex.load()
+    History = record_class("HistoryRow", ["OrderDate", "ProductCode", "EnglishName"])
+    Report = record_class("MatchReport", REPORT_FIELDS)
+    reasons = Counter()
+
+    report_file.parent.mkdir(exist_ok=True)
+    with CsvSink(report_file, REPORT_FIELDS) as out:
+        for n, row in enumerate(read_records(history_file, History), 2):
+            code = row.ProductCode.strip()
+            name = row.EnglishName.replace("\n", " ").strip()
+            if not code:
+                reason = "empty ProductCode"
+            elif code not in index.names:
+                reason = "ProductCode not in ru_products"
+            elif index.score(name, code) < MIN_SCORE:
+                reason = "EnglishName differs from name_en"
+            else:
+                continue
+            reasons[reason] += 1
+            found = index.candidates(name, 2) + [Match("", 0.0)] * 2
+            resolved = index.match(name)
+            out.write_values(Report(n, row.OrderDate, code, name, reason, found[0].product_code, found[0].score,
+                                    found[1].product_code, found[1].score,
+                                    "yes" if resolved else "no"))
+    return reasons
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Match order-history product names to ru_products codes")
+    parser.add_argument("--name", help="match one name and print its candidates")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    index = NameIndex.load()
+    print(f"Indexed {len(index.codes)} products ({len(index.postings)} {NGRAM}-grams) "
+          f"in {time.perf_counter() - started:.3f}s\n")
+
+    if args.name:
+        resolved = index.match(args.name)
+        for m in index.candidates(args.name):
+            print(f"  {m.product_code:<12} {m.score:.3f}  {index.names[m.product_code]}")
+        print(f"\nResolved: {resolved.product_code if resolved else '(none)'}")
+        return
+
+    print("=== Order history name check ===\n")
+    started = time.perf_counter()
+    reasons = check_history(index=index)
+    print(f"Checked in {time.perf_counter() - started:.3f}s")
+    for reason, count in reasons.most_common():
+        print(f"  {reason}: {count} rows")
+    print(f"Saved: {MATCH_DIR / 'history_matches.csv'}")
+
+
+if __name__ == "__main__":
+    main()
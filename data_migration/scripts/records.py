@@ -0,0 +1,97 @@
+"""
+행 레코드 클래스 (__slots__, 행마다 dict를 만들지 않음)
+- table_record: supabase/migrations의 테이블 정의에서 필드/타입을 가져와 클래스 생성
+- record_class: 원본 CSV처럼 테이블이 없는 입력용
+- 레코드는 필드 순서대로 iterable → CsvSink.write_values(record)로 바로 기록
+- 읽기는 pipeline.read_records (헤더 → 필드 위치를 한 번만 계산하고 위치로 읽음)
+"""
+import keyword
+import re
+from decimal import Decimal
+from functools import lru_cache
+from typing import Optional, Sequence
+
+from schema import load_schema
+
+
+def _python_type(col_type: str) -> type:
+    """컬럼 타입 → 파이썬 타입 (어노테이션용)"""
+    if re.match(r"(smallint|integer|bigint|int[248]?|serial|bigserial)\b", col_type):
+        return int
+    if re.match(r"(numeric|decimal)\b", col_type):
+        return Decimal
+    if re.match(r"(real|double precision|float[48]?)\b", col_type):
+        return float
+    if col_type in ("boolean", "bool"):
+        return bool
+    return str
+
+
+def record_class(name: str, fields: Sequence[str], types: Optional[dict] = None) -> type:
+    """
+    fields 순서의 __slots__ 레코드 클래스 생성
+
+    - Record(v1, v2, ...) 위치 인자 (생략한 필드는 '')
+    - iter(record) / tuple(record) → 필드 순서의 값
+    - 필드 값은 대입으로 변경 가능 (record.qty = 0)
+    """
+    fields = tuple(fields)
+    for field in fields:
+        if not field.isidentifier() or keyword.iskeyword(field):
+            raise ValueError(f"{name}: invalid field name {field!r}")
+    if len(set(fields)) != len(fields):
+        raise ValueError(f"{name}: duplicate field names")
+
+    # namedtuple과 같은 방식으로 필드별 대입 코드를 생성 (setattr 반복보다 빠름)
+    args = ", ".join(f"{f}=''" for f in fields)
+    body = "".join(f"\n    self.{f} = {f}" for f in fields) or "\n    pass"
+    values = "".join(f"self.{f}, " for f in fields)
+    namespace = {}
+    exec(f"def __init__(self, {args}):{body}\n"
+         f"def __iter__(self):\n    return iter(({values}))\n"
+         f"def __eq__(self, other):\n"
+         f"    return type(other) is type(self) and tuple(self) == tuple(other)\n",
+         namespace)
+
+    def __repr__(self):
+        return f"{name}({', '.join(f'{f}={getattr(self, f)!r}' for f in fields)})"
+
+    def as_dict(self) -> dict:
+        return dict(zip(fields, self))
+
+    return type(name, (), {
+        "__slots__": fields,
+        "__annotations__": {f: (types or {}).get(f, str) for f in fields},
+        "_fields": fields,
+        "__init__": namespace["__init__"],
+        "__iter__": namespace["__iter__"],
+        "__eq__": namespace["__eq__"],
+        "__hash__": None,
+        "__repr__": __repr__,
+        "as_dict": as_dict,
+    })
+
+
+@lru_cache(maxsize=None)
+def _schema() -> dict:
+    """마이그레이션 파싱은 프로세스당 1회"""
+    return load_schema()
+
+
+def table_record(table: str, fields: Optional[Sequence[str]] = None) -> type:
+    """
+    테이블 정의로 레코드 클래스 생성
+
+    fields: CSV 컬럼 순서 (생략하면 DDL의 전체 컬럼), 테이블에 없는 컬럼이면 ValueError
+    """
+    definition = _schema().get(table)
+    if definition is None:
+        raise ValueError(f"Unknown table: {table}")
+    fields = tuple(definition.columns) if fields is None else tuple(fields)
+    unknown = [f for f in fields if f not in definition.columns]
+    if unknown:
+        raise ValueError(f"{table}: no such column(s) {', '.join(unknown)}")
+
+    name = "".join(part.capitalize() for part in table.split("_")) + "Record"
+    types = {f: _python_type(definition.columns[f].type) for f in fields}
+    return record_class(name, fields, types)
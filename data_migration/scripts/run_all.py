@@ -0,0 +1,230 @@
+"""
+전체 마이그레이션 실행 (의존성 기반 병렬 실행)
+- 각 단계의 입력/출력을 선언하고, 다른 단계의 출력을 입력으로 쓰면 의존성으로 처리
+- 서로 독립된 단계는 프로세스 풀에서 동시에 실행
+- 입력/로직이 바뀌지 않은 단계는 매니페스트 기준으로 건너뜀
+- 단계별 소요 시간 / 행 수 출력, 상세 통계는 run_report.json에 기록
+
+사용법: python scripts/run_all.py [--force] [--jobs N] [--only STAGE ...]
+                                  [--profile] [--trace-memory]
+"""
+import argparse
+import importlib
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import NamedTuple
+
+from manifest import BuildManifest
+from run_report import RunReport, instrument
+
+SCRIPTS_DIR = Path(__file__).parent
+BASE_DIR = SCRIPTS_DIR.parent
+OUTPUT_DIR = BASE_DIR / "supabase_ready"
+OUTPUT_DIR.mkdir(exist_ok=True)
+
+
+class Stage(NamedTuple):
+    name: str
+    module: str
+    func: str
+    inputs: tuple
+    outputs: tuple
+
+
+# 적재 대상 출력 CSV (검사 단계 입력)
+READY_FILES = ("supabase_ready/ru_products.csv", "supabase_ready/ru_prices.csv",
+               "supabase_ready/ru_orders.csv", "supabase_ready/ru_order_items.csv",
+               "supabase_ready/ru_packing_lists.csv", "supabase_ready/ru_packing_items.csv",
+               "supabase_ready/cm_production_lots.csv", "supabase_ready/cm_lot_manufacturing_dates.csv")
+
+# 입력/출력 경로는 BASE_DIR 기준 상대경로
+STAGES = [
+    Stage("clean_csv.product_info", "clean_csv", "process_product_info",
+          inputs=("product_info.csv",),
+          outputs=("supabase_ready/ru_products.csv",)),
+    Stage("prices", "prices", "build_prices",
+          inputs=("product_info.csv", "merged_order_history.csv"),
+          outputs=("supabase_ready/ru_prices.csv",)),
+    Stage("create_orders_v3.order_history", "create_orders_v3", "process_order_history",
+          inputs=("merged_order_history.csv", "supabase_ready/ru_prices.csv", "supabase_ready/ru_products.csv"),
+          outputs=("supabase_ready/ru_orders.csv", "supabase_ready/ru_order_items.csv",
+                   "price_reconcile/shifted_prices.csv")),
+    Stage("fix_packing_v2", "fix_packing_v2", "process",
+          inputs=("ru_packing_lists.csv", "ru_packing_items_final.csv", "supabase_ready/ru_order_items.csv"),
+          outputs=("supabase_ready/ru_packing_lists.csv", "supabase_ready/ru_packing_items.csv")),
+    Stage("create_lot_csv", "create_lot_csv", "main",
+          inputs=("PRODUCTION2.csv", "LOTHX.csv", "LOTHX_1.csv"),
+          outputs=("supabase_ready/cm_production_lots.csv", "supabase_ready/cm_lot_manufacturing_dates.csv",
+                   "lot_reconcile/conflicts.csv")),
+    # 발주 아이템 × 제품 마스터 → 카톤/CBM/예상 중량 (적재 대상 아님)
+    Stage("order_logistics", "order_logistics", "build_logistics",
+          inputs=("supabase_ready/ru_order_items.csv", "supabase_ready/ru_products.csv",
+                  "supabase_ready/ru_packing_items.csv"),
+          outputs=("logistics/order_items.csv", "logistics/orders.csv")),
+    # 출력 CSV 전체의 PK/UNIQUE/FK 검사 (위반 시 실패)
+    Stage("check_integrity", "check_integrity", "validate",
+          inputs=READY_FILES, outputs=()),
+    # 출력 CSV 전체의 컬럼 타입/길이/CHECK 검사 (위반 시 실패)
+    Stage("check_columns", "check_columns", "validate",
+          inputs=READY_FILES, outputs=()),
+]
+
+
+def build_dependencies(stages: list) -> dict:
+    """단계별 선행 단계 집합 (입력이 다른 단계의 출력이면 의존)"""
+    producers = {}
+    for stage in stages:
+        for output in stage.outputs:
+            if output in producers:
+                raise ValueError(f"{output} is produced by both {producers[output]} and {stage.name}")
+            producers[output] = stage.name
+
+    deps = {}
+    for stage in stages:
+        deps[stage.name] = {producers[i] for i in stage.inputs if i in producers} - {stage.name}
+
+    # 순환 검사 (위상 정렬)
+    remaining = {name: set(d) for name, d in deps.items()}
+    while remaining:
+        ready = [name for name, d in remaining.items() if not d]
+        if not ready:
+            raise ValueError(f"Dependency cycle between stages: {sorted(remaining)}")
+        for name in ready:
+            del remaining[name]
+        for d in remaining.values():
+            d.difference_update(ready)
+
+    return deps
+
+
+def execute_stage(name: str, module: str, func: str) -> dict:
+    """(워커 프로세스) 단계 함수를 계측하며 실행, 통계 dict 반환"""
+    with instrument(name) as stats:
+        getattr(importlib.import_module(module), func)()
+    return stats.as_dict()
+
+
+def run(stages: list, jobs: int = None, force: bool = False) -> dict:
+    """DAG 순서대로 단계 실행, {단계명: (상태, 소요시간)} 반환"""
+    deps = build_dependencies(stages)
+    by_name = {stage.name: stage for stage in stages}
+    manifest = BuildManifest()
+    report = RunReport()
+    results = {}
+    pending = set(by_name)
+    running = {}
+
+    def paths(rel_paths):
+        return [BASE_DIR / p for p in rel_paths]
+
+    # 워커는 여러 단계에 재사용 (instrument가 단계 시작 시 최대 RSS를 되돌려 max_rss_mb는 단계별 값)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        while pending or running:
+            # 선행 단계가 모두 끝난 단계 시작
+            for name in sorted(pending):
+                if any(d not in results for d in deps[name]):
+                    continue
+                pending.discard(name)
+                stage = by_name[name]
+
+                if any(results[d][0] == "failed" for d in deps[name]):
+                    results[name] = ("failed", 0.0)
+                    print(f"[{name}] not run: upstream stage failed")
+                    continue
+
+                signature = manifest.signature(paths(stage.inputs),
+                                               [SCRIPTS_DIR / f"{stage.module}.py"])
+                if not force and manifest.is_fresh(name, signature, paths(stage.outputs)):
+                    results[name] = ("skipped", 0.0)
+                    report.record_skipped(name)
+                    print(f"[{name}] skipped (inputs unchanged)")
+                    continue
+
+                print(f"[{name}] started")
+                future = pool.submit(execute_stage, name, stage.module, stage.func)
+                running[future] = (name, signature)
+
+            if not running:
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, signature = running.pop(future)
+                try:
+                    stats = future.result()
+                except Exception as e:
+                    results[name] = ("failed", 0.0)
+                    report.record(name, {"status": "failed", "error": repr(e)})
+                    report.save()
+                    print(f"[{name}] FAILED: {e!r}")
+                    continue
+                results[name] = ("done", stats["seconds"])
+                report.record(name, stats)
+                report.save()
+                manifest.record(name, signature, paths(by_name[name].outputs))
+                manifest.save()
+                print(f"[{name}] done in {stats['seconds']:.2f}s")
+
+    manifest.save()
+    report.save()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run all data migration stages")
+    parser.add_argument("--force", action="store_true", help="rebuild every stage")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes")
+    parser.add_argument("--only", nargs="+", metavar="STAGE", help="run only these stages")
+    parser.add_argument("--profile", action="store_true",
+                        help="cProfile each stage into run_profiles/<stage>.prof")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="record per-stage tracemalloc peak (slower)")
+    args = parser.parse_args()
+
+    # 워커 프로세스도 같은 설정을 쓰도록 환경변수로 전달
+    if args.profile:
+        os.environ["MIGRATION_PROFILE"] = "1"
+    if args.trace_memory:
+        os.environ["MIGRATION_TRACE_MEMORY"] = "1"
+
+    stages = STAGES
+    if args.only:
+        unknown = set(args.only) - {s.name for s in STAGES}
+        if unknown:
+            parser.error(f"unknown stage(s): {', '.join(sorted(unknown))}")
+        stages = [s for s in STAGES if s.name in args.only]
+
+    print("=== Running Data Migration ===\n")
+    started = time.perf_counter()
+    results = run(stages, jobs=args.jobs, force=args.force)
+    total = time.perf_counter() - started
+
+    report = RunReport()
+    report.record_run("run_all", total, [s.name for s in stages])
+    report.save()
+
+    print("\n=== Stage Timing ===")
+    for stage in stages:
+        status, elapsed = results[stage.name]
+        stats = report.stages.get(stage.name, {})
+        rows = (f"{stats.get('rows_in', 0):>8} in {stats.get('rows_out', 0):>8} out"
+                if status == "done" else "")
+        dropped = sum(stats.get("dropped", {}).values()) if status == "done" else 0
+        print(f"  {stage.name:<34} {status:<8} {elapsed:6.2f}s  {rows}"
+              + (f"  ({dropped} dropped)" if dropped else ""))
+    print(f"  {'total (wall clock)':<34} {'':<8} {total:6.2f}s")
+    print(f"\nRun report: {report.path}")
+
+    failed = [name for name, (status, _) in results.items() if status == "failed"]
+    if failed:
+        print(f"\nFailed stages: {', '.join(failed)}")
+        sys.exit(1)
+
+    print("\n=== Done! ===")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+단계별 실행 계측 + JSON 실행 보고서 (run_report.json)
+
+- 단계마다 소요 시간, 입력/출력 행 수(파일별), 제외된 행과 사유, 기본값으로 대체된 값과 사유,
+  최대 RSS를 기록
+- 입력/출력 행 수는 pipeline(read_rows/CsvSink)이 자동으로 기록하고,
+  제외/대체 사유는 각 스크립트가 current_stats().drop(...) / .coerce(...)로 남김
+- 선택: cProfile (MIGRATION_PROFILE=1 → run_profiles/<단계>.prof),
+        tracemalloc (MIGRATION_TRACE_MEMORY=1 → 단계 내 Python 할당 최대치)
+- 보고서는 supabase_ready 옆 run_report.json에 단계 이름 기준으로 갱신 (다른 단계 기록은 유지)
+
+※ max_rss_mb는 단계 시작 시 프로세스 최대치를 현재 RSS로 되돌린 뒤(/proc/self/clear_refs) 잰 값이라
+  run_all 워커가 여러 단계를 실행해도 단계별 값 (Linux 외에는 되돌릴 수 없어 앞 단계 값이 섞일 수 있음)
+  → Python 할당만 보려면 MIGRATION_TRACE_MEMORY=1의 traced_peak_mb 참고
+"""
+import json
+import os
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+BASE_DIR = Path(__file__).parent.parent
+REPORT_FILE = BASE_DIR / "run_report.json"
+PROFILE_DIR = BASE_DIR / "run_profiles"
+
+
+def _env_flag(name: str) -> bool:
+    return os.environ.get(name, "") not in ("", "0")
+
+
+def max_rss_mb() -> Optional[float]:
+    """
+    프로세스 최대 RSS (MB, resource 모듈이 없는 Windows는 None)
+
+    Linux는 /proc/self/status의 VmHWM (exec한 프로세스 자신의 최대치),
+    ru_maxrss는 부모 프로세스의 최대치를 물려받아 자식이 더 적게 쓰면 부모 값이 나옴
+    """
+    try:
+        with open("/proc/self/status", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 byte 단위
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def reset_peak_rss() -> bool:
+    """프로세스 최대 RSS(VmHWM)를 현재 RSS로 되돌림 (Linux만, 실패하면 False)"""
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+class StageStats:
+    """단계 하나의 실행 통계"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.inputs = Counter()
+        self.outputs = Counter()
+        self.dropped = Counter()
+        self.coerced = Counter()
+        self.status = "running"
+        self.seconds = 0.0
+        self.max_rss_mb = None
+        self.traced_peak_mb = None
+        self.profile = None
+
+    def read(self, path: Path, rows: int):
+        self.inputs[Path(path).name] += rows
+
+    def wrote(self, path: Path, rows: int):
+        self.outputs[Path(path).name] += rows
+
+    def drop(self, reason: str, count: int = 1):
+        """출력에서 제외된 행"""
+        self.dropped[reason] += count
+
+    def coerce(self, reason: str, count: int = 1):
+        """행은 유지하되 값을 기본값으로 대체했거나 이상값을 그대로 둔 경우"""
+        self.coerced[reason] += count
+
+    def as_dict(self) -> dict:
+        return {
+            "status": self.status,
+            "finished_at": datetime.now().isoformat(timespec="seconds"),
+            "seconds": round(self.seconds, 3),
+            "inputs": dict(self.inputs),
+            "outputs": dict(self.outputs),
+            "rows_in": sum(self.inputs.values()),
+            "rows_out": sum(self.outputs.values()),
+            "dropped": dict(self.dropped.most_common()),
+            "coerced": dict(self.coerced.most_common()),
+            "max_rss_mb": round(self.max_rss_mb, 1) if self.max_rss_mb is not None else None,
+            "traced_peak_mb": (round(self.traced_peak_mb, 1)
+                               if self.traced_peak_mb is not None else None),
+            "profile": self.profile,
+        }
+
+    def summary(self) -> str:
+        """한 줄 요약 (제외/대체 사유 포함)"""
+        parts = [f"{sum(self.inputs.values())} rows in", f"{sum(self.outputs.values())} rows out"]
+        parts += [f"dropped {n} ({reason})" for reason, n in self.dropped.most_common()]
+        parts += [f"coerced {n} ({reason})" for reason, n in self.coerced.most_common()]
+        return ", ".join(parts)
+
+
+_current: Optional[StageStats] = None
+
+
+def current_stats() -> StageStats:
+    """실행 중인 단계의 통계 (계측 밖에서 호출하면 버려지는 임시 객체)"""
+    return _current if _current is not None else StageStats("")
+
+
+@contextmanager
+def instrument(name: str, profile: Optional[bool] = None, trace_memory: Optional[bool] = None):
+    """with 블록을 단계 하나로 계측 (profile/trace_memory 기본값은 환경변수)"""
+    global _current
+    profile = _env_flag("MIGRATION_PROFILE") if profile is None else profile
+    trace_memory = _env_flag("MIGRATION_TRACE_MEMORY") if trace_memory is None else trace_memory
+
+    stats = StageStats(name)
+    previous, _current = _current, stats
+    if previous is None:
+        # 같은 워커가 앞서 실행한 단계의 최대치 제외 (중첩 계측이면 바깥 단계 값 유지)
+        reset_peak_rss()
+
+    profiler = None
+    if profile:
+        import cProfile
+        profiler = cProfile.Profile()
+    if trace_memory:
+        import tracemalloc
+        tracemalloc.start()
+
+    started = time.perf_counter()
+    if profiler:
+        profiler.enable()
+    try:
+        yield stats
+        stats.status = "done"
+    except BaseException:
+        stats.status = "failed"
+        raise
+    finally:
+        if profiler:
+            profiler.disable()
+        stats.seconds = time.perf_counter() - started
+        stats.max_rss_mb = max_rss_mb()
+        if trace_memory:
+            stats.traced_peak_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+            tracemalloc.stop()
+        if profiler:
+            PROFILE_DIR.mkdir(exist_ok=True)
+            profile_path = PROFILE_DIR / f"{name}.prof"
+            profiler.dump_stats(profile_path)
+            stats.profile = profile_path.relative_to(BASE_DIR).as_posix()
+        _current = previous
+
+
+class RunReport:
+    """run_report.json (단계 이름별 최신 실행 결과)"""
+
+    def __init__(self, path: Path = REPORT_FILE):
+        self.path = Path(path)
+        self.stages = {}
+        self.runs = {}
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.stages = data.get("stages", {})
+            self.runs = data.get("runs", {})
+
+    def record(self, name: str, stage: dict):
+        self.stages[name] = stage
+
+    def record_skipped(self, name: str):
+        """건너뛴 단계 (출력은 이전 실행 결과이므로 이전 통계 유지)"""
+        stage = self.stages.setdefault(name, {})
+        stage["status"] = "skipped"
+        stage["skipped_at"] = datetime.now().isoformat(timespec="seconds")
+
+    def record_run(self, entry: str, seconds: float, stages: list):
+        """실행 단위(run_all 등) 전체 소요 시간"""
+        self.runs[entry] = {
+            "finished_at": datetime.now().isoformat(timespec="seconds"),
+            "seconds": round(seconds, 3),
+            "stages": list(stages),
+        }
+
+    def save(self):
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"stages": self.stages, "runs": self.runs}, f,
+                      ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,228 @@
+"""
+supabase/migrations/*.sql의 테이블 정의 파싱
+- create table (if not exists) / alter table ... add column / add constraint 반영 (파일명 순서)
+- 컬럼(타입, NOT NULL, 기본값 여부)과 PK / UNIQUE / FOREIGN KEY / CHECK 제약 추출
+- _archive 폴더는 제외
+
+supabase_ready/<테이블명>.csv 와 테이블 이름이 같으므로 출력 CSV 검증에 사용
+"""
+import re
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+BASE_DIR = Path(__file__).parent.parent
+MIGRATIONS_DIR = BASE_DIR.parent / "supabase" / "migrations"
+
+
+class Column(NamedTuple):
+    name: str
+    type: str            # 소문자 원문 (예: 'character varying(20)', 'numeric(10, 3)')
+    not_null: bool
+    has_default: bool
+
+
+class ForeignKey(NamedTuple):
+    name: str
+    columns: tuple
+    ref_table: str
+    ref_columns: tuple
+
+
+class Check(NamedTuple):
+    name: str
+    expression: str      # 괄호 안 원문
+
+
+class Table:
+    """테이블 하나의 컬럼/제약"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.columns = {}
+        self.primary_key = ()
+        self.unique = []          # [(제약명, (컬럼, ...))]
+        self.foreign_keys = []
+        self.checks = []
+
+    def __repr__(self):
+        return f"Table({self.name!r}, columns={list(self.columns)})"
+
+
+_COMMENT = re.compile(r"--[^\n]*")
+_DOLLAR_QUOTED = re.compile(r"\$(\w*)\$.*?\$\1\$", re.S)  # 함수 본문
+_IDENT = r'"?([A-Za-z_][A-Za-z0-9_]*)"?'
+_CREATE = re.compile(rf"create\s+table\s+(if\s+not\s+exists\s+)?(?:{_IDENT}\.)?{_IDENT}\s*\(", re.I)
+_ALTER = re.compile(rf"alter\s+table\s+(?:only\s+)?(?:if\s+exists\s+)?(?:{_IDENT}\.)?{_IDENT}\s+", re.I)
+_REFERENCES = re.compile(rf"references\s+(?:{_IDENT}\.)?{_IDENT}\s*(?:\(([^)]*)\))?", re.I)
+_TYPE_END = re.compile(
+    r"\s+(not\s+null|null|default|constraint|primary\s+key|unique|references|check|generated|collate)\b",
+    re.I)
+
+
+def _matching_paren(text: str, start: int) -> int:
+    """text[start] == '(' 와 짝이 맞는 ')' 위치 (문자열 리터럴 안의 괄호는 무시)"""
+    depth = 0
+    in_string = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if ch == "'":
+                in_string = False
+        elif ch == "'":
+            in_string = True
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+            if depth == 0:
+                return i
+    raise ValueError("unbalanced parentheses in DDL")
+
+
+def _split_top_level(body: str) -> list:
+    """괄호/문자열 밖의 콤마로 분리"""
+    parts, depth, in_string, current = [], 0, False, []
+    for ch in body:
+        if in_string:
+            in_string = ch != "'"
+        elif ch == "'":
+            in_string = True
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == "," and depth == 0:
+            parts.append("".join(current).strip())
+            current = []
+            continue
+        current.append(ch)
+    if "".join(current).strip():
+        parts.append("".join(current).strip())
+    return parts
+
+
+def _column_list(text: str) -> tuple:
+    return tuple(c.strip().strip('"').lower() for c in text.split(",") if c.strip())
+
+
+def _paren_content(text: str, keyword: str) -> Optional[str]:
+    """keyword 다음 괄호 안 내용"""
+    match = re.search(rf"{keyword}\s*\(", text, re.I)
+    if not match:
+        return None
+    start = match.end() - 1
+    return text[start + 1:_matching_paren(text, start)]
+
+
+def _apply_constraint(table: Table, definition: str, name: str = ""):
+    """테이블 제약 (constraint 이름 다음 부분, 이름이 없으면 Postgres 기본 규칙으로 명명)"""
+    lowered = definition.lower()
+    if lowered.startswith("primary key"):
+        table.primary_key = _column_list(_paren_content(definition, "primary key"))
+    elif lowered.startswith("unique"):
+        columns = _column_list(_paren_content(definition, "unique"))
+        table.unique.append((name or f"{table.name}_{'_'.join(columns)}_key", columns))
+    elif lowered.startswith("foreign key"):
+        columns = _column_list(_paren_content(definition, "foreign key"))
+        ref = _REFERENCES.search(definition)
+        ref_columns = _column_list(ref.group(3)) if ref.group(3) else ("id",)
+        table.foreign_keys.append(ForeignKey(name or f"{table.name}_{'_'.join(columns)}_fkey",
+                                             columns, ref.group(2).lower(), ref_columns))
+    elif lowered.startswith("check"):
+        table.checks.append(Check(name or f"{table.name}_check",
+                                  _paren_content(definition, "check").strip()))
+
+
+def _apply_column(table: Table, definition: str):
+    """컬럼 정의 (인라인 제약 포함)"""
+    match = re.match(rf"{_IDENT}\s+", definition)
+    name = match.group(1).lower()
+    rest = definition[match.end():]
+    end = _TYPE_END.search(rest)
+    col_type = re.sub(r"\s+", " ", rest[:end.start()] if end else rest).strip().lower()
+    options = rest[end.start():] if end else ""
+    lowered = options.lower()
+
+    table.columns[name] = Column(
+        name=name,
+        type=col_type,
+        not_null=bool(re.search(r"\bnot\s+null\b", lowered) or "primary key" in lowered),
+        has_default=bool(re.search(r"\bdefault\b", lowered)) or col_type in ("serial", "bigserial"),
+    )
+
+    if re.search(r"\bprimary\s+key\b", lowered):
+        table.primary_key = (name,)
+    if re.search(r"\bunique\b", lowered):
+        table.unique.append((f"{table.name}_{name}_key", (name,)))
+    ref = _REFERENCES.search(options)
+    if ref:
+        ref_columns = _column_list(ref.group(3)) if ref.group(3) else ("id",)
+        table.foreign_keys.append(
+            ForeignKey(f"{table.name}_{name}_fkey", (name,), ref.group(2).lower(), ref_columns))
+    check = _paren_content(options, r"\bcheck")
+    if check is not None:
+        table.checks.append(Check(f"{table.name}_{name}_check", check.strip()))
+
+
+def _apply_element(table: Table, element: str):
+    """create table 본문의 항목 하나 (컬럼 또는 제약)"""
+    match = re.match(rf"constraint\s+{_IDENT}\s+", element, re.I)
+    if match:
+        _apply_constraint(table, element[match.end():], match.group(1).lower())
+    elif re.match(r"(primary\s+key|unique|foreign\s+key|check)\b", element, re.I):
+        _apply_constraint(table, element)
+    else:
+        _apply_column(table, element)
+
+
+def _apply_alter(tables: dict, name: str, actions: str):
+    table = tables.get(name)
+    if table is None:
+        return
+    for action in _split_top_level(actions):
+        match = re.match(r"add\s+column\s+(if\s+not\s+exists\s+)?", action, re.I)
+        if match:
+            column = re.match(_IDENT, action[match.end():]).group(1).lower()
+            if not (match.group(1) and column in table.columns):
+                _apply_column(table, action[match.end():])
+            continue
+        match = re.match(r"add\s+", action, re.I)
+        if match:
+            _apply_element(table, action[match.end():])
+
+
+def parse_sql(sql: str, tables: Optional[dict] = None) -> dict:
+    """SQL 텍스트의 create table / alter table 반영, {테이블명: Table}"""
+    tables = {} if tables is None else tables
+    sql = _DOLLAR_QUOTED.sub("''", _COMMENT.sub("", sql))
+
+    for statement in sql.split(";"):
+        statement = statement.strip()
+        match = _CREATE.match(statement)
+        if match:
+            name = match.group(3).lower()
+            if match.group(1) and name in tables:
+                continue
+            table = Table(name)
+            start = match.end() - 1
+            for element in _split_top_level(statement[start + 1:_matching_paren(statement, start)]):
+                _apply_element(table, element)
+            tables[name] = table
+            continue
+
+        match = _ALTER.match(statement)
+        if match:
+            _apply_alter(tables, match.group(2).lower(), statement[match.end():])
+
+    return tables
+
+
+def load_schema(migrations_dir: Path = MIGRATIONS_DIR) -> dict:
+    """마이그레이션 파일을 이름 순서로 적용한 최종 테이블 정의"""
+    paths = sorted(Path(migrations_dir).glob("*.sql"))
+    if not paths:
+        raise FileNotFoundError(f"No migrations found in {migrations_dir}")
+    tables = {}
+    for path in paths:
+        parse_sql(path.read_text(encoding="utf-8"), tables)
+    return tables
@@ -0,0 +1,326 @@
+"""
+supabase_ready/*.csv 와 마지막으로 적재한 스냅샷(supabase_snapshot/) 비교 → 변경분만 적재용 CSV 생성
+
+- 테이블별 자연키로 해시 조인 (DIFF_KEYS)
+  - 키당 1행 테이블: 새 키 → insert, 값이 바뀐 키 → update, 없어진 키 → delete
+  - 그룹 테이블(주문/패킹 아이템): 키(order_id, packing_list_id)의 행 묶음이 바뀌면
+    묶음 전체를 delete + insert (아이템에는 자연키가 없음)
+  - 키당 1행 테이블이라도 키가 중복된 경우 해당 키는 그룹처럼 교체
+- 행은 blake2b digest(16 byte)만 보관하고, 새 파일을 한 번 더 읽으면서 바뀐 행만 기록 (메모리 = 키 + digest)
+- 컬럼 구성이 바뀐 테이블은 전체 교체 (reload)
+- ON DELETE CASCADE 자식 (CASCADES): 부모 행을 지우면 DB에서 자식 행도 함께 지워지므로
+  - 부모가 reload → 자식도 reload
+  - 부모 키가 delete(묶음 교체 포함) → 그 키를 참조하던 자식 키를 다시 insert (자식 diff가 unchanged/update여도)
+- 출력: supabase_diff/<테이블>.insert.csv / .update.csv / .delete.csv + diff.json
+  → load_supabase.py --diff 로 적재, 적재에 성공하면 스냅샷 갱신
+
+사용법:
+  python scripts/snapshot_diff.py             # supabase_diff/ 생성 + 요약
+"""
+import argparse
+import csv
+import hashlib
+import json
+import shutil
+from collections import defaultdict
+from pathlib import Path
+from typing import NamedTuple
+
+BASE_DIR = Path(__file__).parent.parent
+OUTPUT_DIR = BASE_DIR / "supabase_ready"
+SNAPSHOT_DIR = BASE_DIR / "supabase_snapshot"
+DIFF_DIR = BASE_DIR / "supabase_diff"
+DIFF_FILE = "diff.json"
+LOAD_MODES_FILE = "load_modes.json"   # 테이블별 마지막 적재 방식 (replace / copy / diff)
+
+
+class DiffKey(NamedTuple):
+    columns: tuple
+    group: bool = False    # True: 키당 여러 행, 묶음 단위로 교체
+
+
+DIFF_KEYS = {
+    "ru_products": DiffKey(("product_code",)),
+    "ru_prices": DiffKey(("product_code", "effective_date")),
+    "ru_orders": DiffKey(("id",)),
+    "ru_order_items": DiffKey(("order_id",), group=True),
+    "ru_packing_lists": DiffKey(("pl_number",)),
+    "ru_packing_items": DiffKey(("packing_list_id",), group=True),
+    "cm_production_lots": DiffKey(("lot_number", "product_id")),
+    "cm_lot_manufacturing_dates": DiffKey(("lot_number", "manufacturing_date")),
+}
+
+# 자식 테이블 → (부모 테이블, FK 컬럼), FK는 부모의 키 컬럼(1개)을 참조하고 ON DELETE CASCADE
+CASCADES = {
+    "ru_prices": ("ru_products", "product_code"),
+    "ru_order_items": ("ru_orders", "order_id"),
+    "ru_packing_lists": ("ru_orders", "order_id"),
+    "ru_packing_items": ("ru_packing_lists", "packing_list_id"),
+}
+
+
+def _read(path: Path):
+    """(헤더, 행 iterator) - 파일이 없으면 빈 테이블"""
+    if not path.exists():
+        return None, iter(())
+    f = open(path, "r", encoding="utf-8-sig", newline="")
+    reader = csv.reader(f)
+    header = next(reader, [])
+
+    def rows():
+        with f:
+            for row in reader:
+                if row:
+                    yield row
+    return header, rows()
+
+
+def row_digest(values) -> bytes:
+    """행 내용 digest (blake2b 16 byte, 셀마다 길이를 앞에 붙여 구분자가 든 값도 구별)"""
+    return hashlib.blake2b("".join(f"{len(v)}:{v}" for v in values).encode("utf-8"),
+                           digest_size=16).digest()
+
+
+def _row_hashes(rows, key_positions: list, order: list = None) -> dict:
+    """{키: [행 digest, ...]} (order가 있으면 그 컬럼 순서로 맞춘 뒤 계산)"""
+    hashes = defaultdict(list)
+    for row in rows:
+        values = [row[i] for i in order] if order else row
+        hashes[tuple(row[i] for i in key_positions)].append(row_digest(values))
+    return hashes
+
+
+class TableDiff:
+    """테이블 하나의 비교 결과"""
+
+    def __init__(self, table: str, header: list, key: DiffKey):
+        self.table = table
+        self.header = header
+        self.key = key
+        self.reload = False
+        self.insert_keys = set()
+        self.update_keys = set()
+        self.delete_keys = set()
+        self.cascaded = set()      # 부모 delete로 DB에서 함께 지워지는 기존 키
+        self.unchanged = 0
+
+    @property
+    def changed(self) -> bool:
+        return self.reload or bool(self.insert_keys or self.update_keys or self.delete_keys)
+
+    @property
+    def removed(self) -> set:
+        """delete 단계가 끝난 뒤 DB에서 없어지는 기존 키 (reload 제외)"""
+        return self.delete_keys | self.cascaded
+
+    def summary(self) -> dict:
+        return {
+            "key": list(self.key.columns),
+            "reload": self.reload,
+            "insert_keys": len(self.insert_keys),
+            "update_keys": len(self.update_keys),
+            "delete_keys": len(self.delete_keys),
+            "cascade_keys": len(self.cascaded),
+            "unchanged_keys": self.unchanged,
+        }
+
+
+def diff_table(table: str, key: DiffKey, new_path: Path, old_path: Path) -> TableDiff:
+    """새 CSV와 스냅샷의 키별 행 해시 비교"""
+    new_header, new_rows = _read(new_path)
+    if new_header is None:
+        raise FileNotFoundError(new_path)
+    missing = [c for c in key.columns if c not in new_header]
+    if missing:
+        raise ValueError(f"{table}: key column(s) {', '.join(missing)} not in {new_path.name}")
+
+    result = TableDiff(table, new_header, key)
+    new_key_pos = [new_header.index(c) for c in key.columns]
+    new = _row_hashes(new_rows, new_key_pos)
+
+    old_header, old_rows = _read(old_path)
+    if old_header is None:
+        old = {}
+    elif set(old_header) != set(new_header):
+        # 컬럼 구성 변경 → 전체 교체
+        result.reload = True
+        result.insert_keys = set(new)
+        return result
+    else:
+        order = [old_header.index(c) for c in new_header]
+        old = _row_hashes(old_rows, [old_header.index(c) for c in key.columns], order)
+
+    for k, hashes in new.items():
+        previous = old.pop(k, None)
+        if previous is None:
+            result.insert_keys.add(k)
+        elif sorted(previous) == sorted(hashes):
+            result.unchanged += 1
+        elif key.group or len(previous) > 1 or len(hashes) > 1:
+            # 묶음 교체: 기존 행 delete + 새 행 insert
+            result.delete_keys.add(k)
+            result.insert_keys.add(k)
+        else:
+            result.update_keys.add(k)
+    result.delete_keys.update(old)
+    return result
+
+
+def _select_keys(path: Path, key: DiffKey, match) -> set:
+    """path 행 중 match(컬럼 이름 → 값 조회 함수)가 참인 행의 키"""
+    header, rows = _read(path)
+    if header is None:
+        return set()
+    key_pos = [header.index(c) for c in key.columns]
+    positions = {c: i for i, c in enumerate(header)}
+    return {tuple(row[i] for i in key_pos) for row in rows
+            if match(lambda column: row[positions[column]] if column in positions else None)}
+
+
+def apply_cascade(result: TableDiff, parent: TableDiff, fk: str, new_path: Path, old_path: Path):
+    """
+    부모 변경이 ON DELETE CASCADE로 지우는 자식 행을 diff에 반영
+
+    - 부모 reload(DELETE FROM) → 자식도 reload
+    - 부모 키 delete → 그 키를 참조하던 기존 자식 키는 cascaded, 새 파일에 남아 있는 키는 insert로
+      (update/unchanged였던 키도 DB에는 더 이상 없으므로 insert)
+    """
+    if parent.reload:
+        if not result.reload:
+            result.reload = True
+            result.insert_keys = _select_keys(new_path, result.key, lambda get: True)
+            result.update_keys = set()
+            result.delete_keys = set()
+            result.unchanged = 0
+        return
+    removed = {k[0] for k in parent.removed}
+    if not removed or result.reload:
+        return
+
+    result.cascaded = _select_keys(old_path, result.key, lambda get: get(fk) in removed)
+    reinsert = _select_keys(new_path, result.key,
+                            lambda get: get(fk) in removed or
+                            tuple(get(c) for c in result.key.columns) in result.cascaded)
+    result.unchanged -= len(reinsert - result.insert_keys - result.update_keys)
+    result.update_keys -= reinsert
+    result.insert_keys |= reinsert
+
+
+def write_diff(result: TableDiff, new_path: Path, diff_dir: Path) -> dict:
+    """바뀐 키의 행만 새 CSV에서 골라 insert/update/delete 파일로 기록, 파일별 행 수 반환"""
+    key_pos = [result.header.index(c) for c in result.key.columns]
+    counts = {"insert": 0, "update": 0, "delete": len(result.delete_keys)}
+
+    paths = {kind: diff_dir / f"{result.table}.{kind}.csv" for kind in counts}
+    with open(paths["insert"], "w", encoding="utf-8", newline="") as ins, \
+            open(paths["update"], "w", encoding="utf-8", newline="") as upd:
+        writers = {"insert": csv.writer(ins), "update": csv.writer(upd)}
+        for writer in writers.values():
+            writer.writerow(result.header)
+        _, rows = _read(new_path)
+        for row in rows:
+            k = tuple(row[i] for i in key_pos)
+            if k in result.insert_keys:
+                writers["insert"].writerow(row)
+                counts["insert"] += 1
+            elif k in result.update_keys:
+                writers["update"].writerow(row)
+                counts["update"] += 1
+
+    with open(paths["delete"], "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(result.key.columns)
+        writer.writerows(sorted(result.delete_keys))
+    return counts
+
+
+def build_diff(output_dir: Path = OUTPUT_DIR, snapshot_dir: Path = SNAPSHOT_DIR,
+               diff_dir: Path = DIFF_DIR, keys: dict = DIFF_KEYS) -> dict:
+    """전체 테이블 비교 → diff_dir에 변경분 CSV + diff.json, {테이블: 요약} 반환"""
+    if diff_dir.exists():
+        shutil.rmtree(diff_dir)
+    diff_dir.mkdir(parents=True)
+
+    results = {}
+    for table, key in keys.items():
+        new_path = output_dir / f"{table}.csv"
+        if not new_path.exists():
+            continue
+        old_path = snapshot_dir / f"{table}.csv"
+        result = diff_table(table, key, new_path, old_path)
+        if table in CASCADES and CASCADES[table][0] in results:
+            parent, fk = CASCADES[table]
+            apply_cascade(result, results[parent], fk, new_path, old_path)
+        results[table] = result
+
+    # 부모만 적재하면 cascade로 지워진 자식 행을 되돌릴 수 없음
+    for child, (parent, _) in CASCADES.items():
+        if parent in results and child not in results and (output_dir / f"{child}.csv").exists() and \
+                (results[parent].reload or results[parent].removed):
+            raise ValueError(f"{parent}: deleting rows cascades to {child}; include {child} in the diff")
+
+    summary = {}
+    for table, result in results.items():
+        info = result.summary()
+        info["rows"] = write_diff(result, output_dir / f"{table}.csv", diff_dir) if result.changed else \
+            {"insert": 0, "update": 0, "delete": 0}
+        summary[table] = info
+
+    (diff_dir / DIFF_FILE).write_text(json.dumps(summary, indent=2, ensure_ascii=False), encoding="utf-8")
+    return summary
+
+
+def promote_snapshot(output_dir: Path = OUTPUT_DIR, snapshot_dir: Path = SNAPSHOT_DIR,
+                     tables: list = None):
+    """적재에 성공한 supabase_ready CSV를 다음 비교 기준으로 복사"""
+    snapshot_dir.mkdir(parents=True, exist_ok=True)
+    for table in tables or DIFF_KEYS:
+        source = output_dir / f"{table}.csv"
+        if source.exists():
+            shutil.copy2(source, snapshot_dir / f"{table}.csv")
+
+
+def record_load_modes(modes: dict, snapshot_dir: Path = SNAPSHOT_DIR):
+    """테이블별 적재 방식 기록 (기록하지 않은 테이블은 이전 값 유지)"""
+    path = snapshot_dir / LOAD_MODES_FILE
+    recorded = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+    recorded.update(modes)
+    snapshot_dir.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(recorded, indent=2, sort_keys=True), encoding="utf-8")
+
+
+def load_mode(table: str, snapshot_dir: Path = SNAPSHOT_DIR):
+    """마지막 적재 방식, 적재 기록이 없으면 None"""
+    path = snapshot_dir / LOAD_MODES_FILE
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8")).get(table)
+
+
+def print_summary(summary: dict):
+    print(f"  {'table':<20} {'insert':>8} {'update':>8} {'delete':>8} {'same keys':>10}")
+    for table, info in summary.items():
+        rows = info["rows"]
+        note = "  (full reload)" if info["reload"] else \
+            f"  ({info['cascade_keys']} keys cascaded from parent)" if info["cascade_keys"] else ""
+        print(f"  {table:<20} {rows['insert']:>8} {rows['update']:>8} {rows['delete']:>8} "
+              f"{info['unchanged_keys']:>10}{note}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Diff supabase_ready against the last loaded snapshot")
+    parser.add_argument("--snapshot", type=Path, default=SNAPSHOT_DIR)
+    parser.add_argument("--out", type=Path, default=DIFF_DIR)
+    args = parser.parse_args()
+
+    print("=== Diffing supabase_ready against snapshot ===\n")
+    if not args.snapshot.exists():
+        print(f"No snapshot at {args.snapshot}: every row is an insert")
+    summary = build_diff(OUTPUT_DIR, args.snapshot, args.out)
+    print_summary(summary)
+    print(f"\nSaved: {args.out}")
+    print("\n=== Done! ===")
+
+
+if __name__ == "__main__":
+    main()
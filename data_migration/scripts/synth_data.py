@@ -0,0 +1,348 @@
+"""
+합성 원본 데이터 생성 (벤치마크/부하 테스트용)
+
+실제 원본과 같은 형식의 입력 파일을 원하는 배수로 생성:
+- product_info.csv           (가격 "5,840" 형식, 일부 상품 규격 누락)
+- merged_order_history.csv   (월별 파일, 'pcs / 1 CTN' 등 잘못된 Destination 포함)
+- ru_packing_lists.csv       (날짜 형식 혼재, 중복 pl_number 포함)
+- ru_packing_items_final.csv (줄바꿈이 들어간 따옴표 제품명 포함)
+- PRODUCTION2.csv            ("Mar 26, 2025 12:00 AM" 날짜, LOT/날짜 누락 행 포함)
+- LOTHX.csv                  (PRODUCTION2와 같은 행의 LOT/날짜, PRODUCTION2에서 빠진 날짜 포함)
+- LOTHX_1.csv                ("2025.6.13 0:00" 날짜, LOT별 제조일 대장)
+
+scale=1 이면 현재 원본과 비슷한 행 수 (BASE_COUNTS)
+
+사용법:
+  python scripts/synth_data.py --scale 10 --out /tmp/synth   # /tmp/synth/*.csv 생성
+"""
+import argparse
+import csv
+import random
+import uuid
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+# scale=1 기준 행 수 (2025년 실제 원본의 CSV 레코드 수 - 헤더/빈 행 제외, 따옴표 안 줄바꿈은 한 레코드)
+BASE_COUNTS = {
+    "product_info.csv": 306,
+    "merged_order_history.csv": 3670,
+    "ru_packing_lists.csv": 56,
+    "ru_packing_items_final.csv": 10818,
+    "PRODUCTION2.csv": 3912,
+}
+
+HISTORY_FIELDS = ["OrderDate", "SourceFile", "ProductCode", "EnglishName", "PcsPerCtn",
+                  "SupplyPriceUnit", "CommissionUnit", "PaymentAmountUnit", "Destination",
+                  "Quantity", "SupplyPriceTotal", "CommissionTotal", "PaymentAmountTotal"]
+PRODUCT_INFO_FIELDS = ["product_code", "brand", "name_ko", "barcode", "name_en", "name_ru",
+                       "pcs_per_carton", "price_supply", "commission", "price_unit",
+                       "W", "H", "L", "CBM", "hscode"]
+PACKING_LIST_FIELDS = ["invoice_date", "pl_number", "invoice_number", "consignee_name",
+                       "consignee_address", "consignee_tel", "consignee_email", "exporter_name",
+                       "manufacturer", "shipping_port", "departure_date", "payment_term",
+                       "destination", "vessel_flight", "total_cartons", "total_nw_kg",
+                       "total_gw_kg", "total_cbm", "total_pallets", "id", "order_id"]
+PACKING_ITEM_FIELDS = ["id", "packing_list_id", "product_code", "product_name", "qty",
+                       "cartons", "nw_kg", "gw_kg", "cbm", "pallet_number"]
+PRODUCTION_FIELDS = ["Lot No", "prdcode", "생산 완료 수량", "생산일"]
+LOT_DATE_FIELDS = ["Lot No", "DATE"]
+
+# (코드 접두어, 브랜드, 한글 브랜드, 영문 브랜드)
+BRANDS = [
+    ("FJ", "FRAIJOUR", "프레쥬르", "Fraijour"),
+    ("RM", "ROSEMINE", "로즈마인", "Rosemine"),
+    ("VM", "VALMONA", "발모나", "VALMONA"),
+    ("PD", "PEDISON", "페디슨", "PEDISON"),
+    ("CC", "CERACLINIC", "세라클리닉", "Ceraclinic"),
+    ("BT", "BATHPA", "바스파", "Bathpa"),
+    ("CH", "CHAR CHAR", "차르차르", "Char Char"),
+    ("NT", "NATURIA", "나투리아", "Naturia"),
+]
+
+# (코드 중간 2자리, 영문, 한글, 러시아어, HS 코드)
+KINDS = [
+    ("SP", "Shampoo", "샴푸", "Шампунь", "3305.10-0000"),
+    ("RS", "Nutrient Conditioner", "컨디셔너", "Кондиционер", "3305.90-1000"),
+    ("BC", "Body Cleanser", "바디워시", "Гель для душа", "3401.30-0000"),
+    ("CR", "Cream", "크림", "Крем", "3304.99-1000"),
+    ("HC", "Hand Cream", "핸드크림", "Крем для рук", "3304.99-1000"),
+    ("SL", "Serum", "세럼", "Сыворотка", "3304.99-1000"),
+    ("CL", "Bubble Cleanser", "클렌저", "Пенка", "3401.30-0000"),
+    ("BB", "Core Blemish Balm", "비비크림", "BB крем", "3304.99-1000"),
+]
+
+SERIES = ["Sugar Velvet Milk", "Black Cumin", "Aronia Color Protection", "Retin-Collagen 3D",
+          "Pro Moisture", "Perfumed Petit Baby", "Ayurvedic Scalp Solution", "Heartleaf Blemish",
+          "Yuja Niacin", "Centella Calming", "Ceramide Barrier", "Peony Seoritae"]
+SIZES = ["", " 100ml", " 500ml", " 2L", " 50ml", " 200g", " 300ml"]
+PCS_PER_CARTON = [6, 20, 24, 30, 40, 60, 77, 80, 240, 400]
+
+DESTINATIONS = ["크라스노다르 KRASNODAR", "블라디보스톡 VLADIVOSTOK", "모스크바 MOSCOW PFO",
+                "노보시비르스크 NOVOSIBIRSK", "모스크바 MOSCOW EFIMOV", "예카테린부르크 EKATERINBURG",
+                "하바롭스크 KHABAROVSK", "이르쿠츠크 IRKUTSK"]
+BAD_DESTINATION = "pcs / 1 CTN"  # 원본 엑셀에서 단위 칸이 밀려 들어온 값
+
+PALLET_CODES = ["OV", "FO", "스크", "VL", "KR", "MS"]
+LOT_PREFIXES = "BBBCCCSSHHMEY"
+
+
+class SynthData:
+    """시드 고정 합성 데이터 생성기"""
+
+    def __init__(self, scale: float = 1.0, seed: int = 42, year: int = 2025):
+        self.scale = scale
+        self.rng = random.Random(seed)
+        self.year = year
+        self.products = []
+
+    def count(self, file_name: str) -> int:
+        return max(1, round(BASE_COUNTS[file_name] * self.scale))
+
+    def uuid(self) -> str:
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+    def random_date(self) -> date:
+        return date(self.year, 1, 1) + timedelta(days=self.rng.randrange(365))
+
+    def generate_products(self) -> list:
+        """상품 마스터 (product_info.csv 행 목록, 다른 파일에서 참조)"""
+        rng = self.rng
+        seq = {}
+        rows = []
+        for _ in range(self.count("product_info.csv")):
+            prefix, brand, brand_ko, brand_en = rng.choice(BRANDS)
+            kind, kind_en, kind_ko, kind_ru, hscode = rng.choice(KINDS)
+            seq[prefix, kind] = seq.get((prefix, kind), 0) + 1
+            series = rng.choice(SERIES)
+            size = rng.choice(SIZES)
+
+            supply = rng.randrange(600, 12000)
+            commission = round(supply * rng.uniform(0.08, 0.14))
+            pcs = rng.choice(PCS_PER_CARTON)
+            w, h, l = (round(rng.uniform(8, 60), 1) for _ in range(3))
+            has_dims = rng.random() > 0.05
+
+            rows.append({
+                "product_code": f"{prefix}{kind}{seq[prefix, kind]:03d}",
+                "brand": brand,
+                "name_ko": f"{brand_ko} {series} {kind_ko}{size}",
+                "barcode": f"880{rng.randrange(10 ** 10):010d}",
+                "name_en": f"{brand_en} {series} {kind_en}{size}",
+                "name_ru": f"[{brand_en}] {kind_ru} {series}{size}" if rng.random() > 0.1 else "",
+                "pcs_per_carton": pcs,
+                "price_supply": f"{supply:,}",
+                "commission": f"{commission:,}",
+                "price_unit": f"{supply + commission:,}",
+                "W": w if has_dims else "",
+                "H": h if has_dims else "",
+                "L": l if has_dims else "",
+                "CBM": round(w * h * l / 1_000_000, 5) if has_dims else "",
+                "hscode": hscode,
+            })
+        self.products = rows
+        return rows
+
+    def iter_order_history(self):
+        """merged_order_history.csv 행 (월 순서, 월초 날짜)"""
+        rng = self.rng
+        n = self.count("merged_order_history.csv")
+        months = sorted(rng.randrange(1, 13) for _ in range(n))
+        for month in months:
+            product = rng.choice(self.products)
+            supply = float(product["price_supply"].replace(",", ""))
+            commission = float(product["commission"].replace(",", ""))
+            pcs = float(product["pcs_per_carton"])
+            qty = pcs * rng.randrange(1, 30)
+            yield {
+                "OrderDate": f"{self.year}-{month:02d}-01",
+                "SourceFile": f"{month:02d}월.xlsx",
+                "ProductCode": product["product_code"],
+                "EnglishName": product["name_en"],
+                "PcsPerCtn": pcs if rng.random() > 0.05 else "",
+                "SupplyPriceUnit": supply,
+                "CommissionUnit": commission,
+                "PaymentAmountUnit": supply + commission,
+                "Destination": BAD_DESTINATION if rng.random() < 0.18 else rng.choice(DESTINATIONS),
+                "Quantity": qty,
+                "SupplyPriceTotal": supply * qty,
+                "CommissionTotal": commission * qty,
+                "PaymentAmountTotal": (supply + commission) * qty,
+            }
+
+    def generate_packing(self) -> tuple:
+        """(ru_packing_lists 행, ru_packing_items_final 행 iterator)"""
+        rng = self.rng
+        lists = []
+        seen_pl = []
+        for _ in range(self.count("ru_packing_lists.csv")):
+            invoice = self.random_date()
+            fmt = rng.random()
+            if fmt < 0.6:
+                invoice_date = f"{invoice.isoformat()} 00:00:00"
+                invoice_number = f"{invoice:%Y%m%d} 00:00:00"
+            elif fmt < 0.9:
+                invoice_date = invoice.isoformat()
+                invoice_number = f"{invoice:%Y%m%d}"
+            else:
+                invoice_date = f"{invoice:%Y%m%d}"
+                invoice_number = f"{invoice:%Y%m%d}"
+
+            # 약 4%는 이미 나온 pl_number 재사용 (fix_packing_v2의 -B/-C 처리 대상)
+            if seen_pl and rng.random() < 0.04:
+                pl_number = rng.choice(seen_pl)
+            else:
+                pl_number = f"PL-{invoice_number}-{rng.choice(PALLET_CODES)}{rng.randrange(1, 9)}파렛트"
+                seen_pl.append(pl_number)
+
+            lists.append({
+                "invoice_date": invoice_date,
+                "pl_number": pl_number,
+                "invoice_number": invoice_number,
+                "consignee_name": "Afrodita Co., Ltd",
+                "consignee_address": "XXV, 4 D Vatutina, Vladivistok, Primorsky region,",
+                "consignee_tel": "+7-904-628-5476",
+                "consignee_email": "icon.brand.manager@gmail.com",
+                "exporter_name": "EVAS cosmetic CO., LTD",
+                "manufacturer": "EVAS cosmetic CO., LTD",
+                "shipping_port": "",
+                "departure_date": "",
+                "payment_term": "",
+                "destination": "",
+                "vessel_flight": "",
+                "total_cartons": 0,
+                "total_nw_kg": round(rng.uniform(300, 2500), 6),
+                "total_gw_kg": round(rng.uniform(320, 2700), 6),
+                "total_cbm": round(rng.uniform(0.5, 6), 6),
+                "total_pallets": rng.randrange(1, 8),
+                "id": self.uuid(),
+                "order_id": self.uuid(),
+            })
+
+        return lists, self.iter_packing_items(lists)
+
+    def iter_packing_items(self, lists: list):
+        """ru_packing_items_final.csv 행 (PL마다 연속, 팔레트 번호 "1.0" 형식)"""
+        rng = self.rng
+        n = self.count("ru_packing_items_final.csv")
+        per_list = [n // len(lists)] * len(lists)
+        for i in range(n % len(lists)):
+            per_list[i] += 1
+
+        for pl, count in zip(lists, per_list):
+            pallets = max(1, pl["total_pallets"])
+            for i in range(count):
+                product = rng.choice(self.products)
+                name = product["name_en"]
+                # 약 1%는 엑셀 셀 안 줄바꿈이 그대로 남은 제품명
+                if rng.random() < 0.01 and " " in name:
+                    head, tail = name.rsplit(" ", 1)
+                    name = f"{head}\n{tail}"
+                nw = round(rng.uniform(2, 25), 1)
+                yield {
+                    "id": self.uuid(),
+                    "packing_list_id": pl["id"],
+                    "product_code": product["product_code"],
+                    "product_name": name,
+                    "qty": int(product["pcs_per_carton"]) * rng.randrange(1, 6),
+                    "cartons": 0,
+                    "nw_kg": nw,
+                    "gw_kg": round(nw + rng.uniform(0.5, 2), 1),
+                    "cbm": product["CBM"] or 0.03366,
+                    "pallet_number": f"{i * pallets // count + 1}.0",
+                }
+
+    def iter_production(self):
+        """PRODUCTION2.csv 행 (약 12% LOT 번호 없음, 일부 날짜 없음)"""
+        rng = self.rng
+        lot_seq = 5000
+        for _ in range(self.count("PRODUCTION2.csv")):
+            product = rng.choice(self.products)
+            prdcode = f"B{product['product_code']}0"[:9]
+            if rng.random() < 0.12:
+                yield {"Lot No": "", "prdcode": prdcode, "생산 완료 수량": "", "생산일": ""}
+                continue
+            lot_seq += 1
+            produced = self.random_date()
+            yield {
+                "Lot No": f"{rng.choice(LOT_PREFIXES)}{lot_seq}",
+                "prdcode": prdcode,
+                "생산 완료 수량": rng.choice([85, 150, 250, 300, 470, 500, 800, 1000, 2000]),
+                "생산일": f"{produced:%b} {produced.day}, {produced.year} 12:00 AM",
+            }
+
+    def generate_lot_dates(self, production: list) -> tuple:
+        """
+        (LOTHX 행, LOTHX_1 행) - LOTHX는 PRODUCTION2와 같은 행 순서
+        약 3%는 PRODUCTION2 생산일을 비우고 LOTHX에만 남김, 대장에는 약 5% LOT에 다른 제조일 추가
+        """
+        rng = self.rng
+        lothx, register = [], []
+        for row in production:
+            lothx.append({"Lot No": row["Lot No"], "DATE": row["생산일"]})
+            if not row["Lot No"]:
+                continue
+            produced = datetime.strptime(row["생산일"], "%b %d, %Y %I:%M %p").date()
+            register.append({"Lot No": row["Lot No"], "DATE": _dotted(produced)})
+            if rng.random() < 0.05:
+                extra = produced + timedelta(days=rng.randint(1, 3))
+                register.append({"Lot No": row["Lot No"], "DATE": _dotted(extra)})
+            if rng.random() < 0.03:
+                row["생산일"] = ""
+        return lothx, register
+
+    def write_all(self, out_dir: Path) -> dict:
+        """모든 원본 파일 생성, {파일명: 행 수} 반환"""
+        out_dir.mkdir(parents=True, exist_ok=True)
+        counts = {}
+        counts["product_info.csv"] = _write(out_dir / "product_info.csv", PRODUCT_INFO_FIELDS,
+                                            self.generate_products(), encoding="utf-8")
+        counts["merged_order_history.csv"] = _write(out_dir / "merged_order_history.csv",
+                                                    HISTORY_FIELDS, self.iter_order_history())
+        lists, items = self.generate_packing()
+        counts["ru_packing_lists.csv"] = _write(out_dir / "ru_packing_lists.csv",
+                                                PACKING_LIST_FIELDS, lists)
+        counts["ru_packing_items_final.csv"] = _write(out_dir / "ru_packing_items_final.csv",
+                                                      PACKING_ITEM_FIELDS, items)
+        production = list(self.iter_production())
+        lothx, register = self.generate_lot_dates(production)
+        counts["PRODUCTION2.csv"] = _write(out_dir / "PRODUCTION2.csv", PRODUCTION_FIELDS,
+                                           production, encoding="utf-8")
+        counts["LOTHX.csv"] = _write(out_dir / "LOTHX.csv", LOT_DATE_FIELDS, lothx, encoding="utf-8")
+        counts["LOTHX_1.csv"] = _write(out_dir / "LOTHX_1.csv", LOT_DATE_FIELDS, register,
+                                       encoding="utf-8")
+        return counts
+
+
+def _dotted(value: date) -> str:
+    """LOTHX_1 날짜 형식 ('2025.6.13 0:00')"""
+    return f"{value.year}.{value.month}.{value.day} 0:00"
+
+
+def _write(path: Path, fieldnames: list, rows, encoding: str = "utf-8-sig") -> int:
+    """원본과 같은 형식(BOM 여부, LF 줄바꿈)으로 저장"""
+    count = 0
+    with open(path, "w", encoding=encoding, newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, lineterminator="\n")
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic migration source files")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiple of today's volume")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", type=Path, required=True, help="output directory")
+    args = parser.parse_args()
+
+    print(f"=== Generating synthetic data (scale {args.scale:g}) ===\n")
+    counts = SynthData(args.scale, args.seed).write_all(args.out)
+    for file_name, rows in counts.items():
+        print(f"Created: {file_name} ({rows} rows)")
+    print(f"\n=== Done! Output files in: {args.out} ===")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+-- =============================================
+-- LOT 잔여 수량 스냅샷 (일괄 FIFO 계산)
+-- =============================================
+-- cm_calculate_lot_remaining(product_id)를 품목마다 호출(cross join lateral)하던 뷰를
+-- 스냅샷 테이블 조회로 변경. 스냅샷은 전체 품목을 한 번의 정렬/윈도우 연산으로 계산.
+-- 결과는 cm_calculate_lot_remaining과 동일 (production_date DESC, id DESC 순으로 현재고 배분)
+--
+-- 재계산: SELECT cm_refresh_lot_remaining();  (ERP 재고 동기화 / LOT 임포트 후)
+
+-- 1. 스냅샷 테이블 (LOT id 기준 PK)
+CREATE TABLE IF NOT EXISTS cm_lot_remaining (
+  lot_id INTEGER PRIMARY KEY REFERENCES cm_production_lots(id) ON DELETE CASCADE,
+  product_id TEXT NOT NULL,
+  lot_number VARCHAR(20) NOT NULL,
+  produced_qty INTEGER NOT NULL,
+  remaining_qty INTEGER NOT NULL,
+  production_date DATE NOT NULL,
+  expiry_date DATE,
+  status TEXT NOT NULL,
+  refreshed_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_cm_lot_remaining_product
+  ON cm_lot_remaining(product_id, production_date DESC, lot_id DESC);
+
+-- 2. 일괄 FIFO 계산 (전 품목 1회 정렬)
+-- before_qty: 더 최신 LOT들의 생산량 합계
+-- max_before: 지금까지의 before_qty 최대값 (현재고 - max_before <= 0 이면 이미 소진)
+CREATE OR REPLACE VIEW cm_lot_remaining_calc AS
+WITH ordered AS (
+  SELECT
+    l.id,
+    l.product_id,
+    l.lot_number,
+    l.produced_qty,
+    l.production_date,
+    l.expiry_date,
+    COALESCE(p.bal_qty, 0) AS stock,
+    COALESCE(SUM(l.produced_qty) OVER w_before, 0) AS before_qty
+  FROM cm_production_lots l
+  LEFT JOIN cm_erp_products p ON p.product_id = l.product_id
+  WINDOW w_before AS (
+    PARTITION BY l.product_id
+    ORDER BY l.production_date DESC, l.id DESC
+    ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+  )
+),
+running AS (
+  SELECT
+    o.*,
+    MAX(o.before_qty) OVER (
+      PARTITION BY o.product_id
+      ORDER BY o.production_date DESC, o.id DESC
+      ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
+    ) AS max_before
+  FROM ordered o
+)
+SELECT
+  id AS lot_id,
+  product_id,
+  lot_number,
+  produced_qty,
+  CASE
+    WHEN stock - max_before <= 0 THEN 0
+    WHEN stock - before_qty >= produced_qty THEN produced_qty
+    ELSE (stock - before_qty)::INTEGER
+  END AS remaining_qty,
+  production_date,
+  expiry_date,
+  CASE
+    WHEN stock - max_before <= 0 THEN 'depleted'
+    WHEN stock - before_qty >= produced_qty THEN 'active'
+    ELSE 'partial'
+  END AS status
+FROM running;
+
+-- 3. 스냅샷 전체 재계산
+CREATE OR REPLACE FUNCTION cm_refresh_lot_remaining()
+RETURNS INTEGER AS $$
+DECLARE
+  v_count INTEGER;
+BEGIN
+  DELETE FROM cm_lot_remaining;
+
+  INSERT INTO cm_lot_remaining (
+    lot_id, product_id, lot_number, produced_qty, remaining_qty,
+    production_date, expiry_date, status
+  )
+  SELECT
+    lot_id, product_id, lot_number, produced_qty, remaining_qty,
+    production_date, expiry_date, status
+  FROM cm_lot_remaining_calc;
+
+  GET DIAGNOSTICS v_count = ROW_COUNT;
+  RETURN v_count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 4. 기존 뷰를 스냅샷 조회로 교체 (컬럼명/타입 동일)
+CREATE OR REPLACE VIEW cm_lot_inventory AS
+SELECT
+  p.product_id,
+  p.name AS product_name,
+  p.bal_qty AS current_stock,
+  r.lot_id AS id,
+  r.lot_number::VARCHAR AS lot_number,
+  r.produced_qty,
+  r.remaining_qty,
+  r.production_date,
+  r.expiry_date,
+  r.status
+FROM cm_erp_products p
+JOIN cm_lot_remaining r ON r.product_id = p.product_id
+WHERE p.bal_qty > 0;
+
+CREATE OR REPLACE VIEW cm_product_lot_fifo AS
+SELECT
+  p.product_id,
+  p.name AS product_name,
+  p.bal_qty AS current_stock,
+  ARRAY_AGG(r.lot_number::VARCHAR ORDER BY r.production_date DESC, r.lot_id DESC) AS lot_numbers,
+  ARRAY_AGG(r.produced_qty ORDER BY r.production_date DESC, r.lot_id DESC) AS produced_quantities,
+  ARRAY_AGG(r.remaining_qty ORDER BY r.production_date DESC, r.lot_id DESC) AS remaining_quantities,
+  ARRAY_AGG(r.status ORDER BY r.production_date DESC, r.lot_id DESC) AS lot_statuses,
+  SUM(r.remaining_qty) AS total_remaining
+FROM cm_erp_products p
+JOIN cm_lot_remaining r ON r.product_id = p.product_id
+WHERE p.bal_qty > 0
+GROUP BY p.product_id, p.name, p.bal_qty;
+
+-- cm_lots_expiring_soon은 cm_lot_inventory를 조회하므로 그대로 사용
+
+-- 초기 계산
+SELECT cm_refresh_lot_remaining();
+
+-- 코멘트
+COMMENT ON TABLE cm_lot_remaining IS 'LOT별 잔여 수량 스냅샷 (FIFO, cm_refresh_lot_remaining()으로 갱신)';
+COMMENT ON VIEW cm_lot_remaining_calc IS 'LOT별 잔여 수량 일괄 계산 (cm_calculate_lot_remaining과 동일 결과)';
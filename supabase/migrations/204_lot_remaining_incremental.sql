@@ -0,0 +1,147 @@
+-- =============================================
+-- LOT 잔여 수량 스냅샷 증분 갱신
+-- =============================================
+-- cm_erp_products.bal_qty 또는 cm_production_lots가 바뀌면
+-- 영향받은 product_id만 다시 계산해서 cm_lot_remaining을 갱신.
+-- (문장 단위 트리거 + transition table → 변경 건수에 비례하는 비용)
+
+-- 1. 지정 품목만 재계산
+-- 같은 품목을 동시에 갱신하는 세션은 품목별 advisory lock으로 순서대로 실행
+-- (정렬된 순서로 잡아 교착 방지, 잠금 이후 문장은 앞 세션이 커밋한 값을 봄)
+-- 행은 lot_id 기준 UPSERT, 계산 결과에 없는 LOT만 삭제 (DELETE 후 INSERT의 PK 충돌 방지)
+CREATE OR REPLACE FUNCTION cm_refresh_lot_remaining(p_product_ids TEXT[])
+RETURNS INTEGER AS $$
+DECLARE
+  v_count INTEGER;
+BEGIN
+  IF p_product_ids IS NULL OR cardinality(p_product_ids) = 0 THEN
+    RETURN 0;
+  END IF;
+
+  PERFORM pg_advisory_xact_lock(hashtextextended('cm_lot_remaining:' || id, 0))
+  FROM (SELECT DISTINCT unnest(p_product_ids) AS id ORDER BY 1) ids;
+
+  -- product_id 조건은 윈도우 PARTITION 키라서 cm_lot_remaining_calc 안으로 내려감
+  INSERT INTO cm_lot_remaining (
+    lot_id, product_id, lot_number, produced_qty, remaining_qty,
+    production_date, expiry_date, status
+  )
+  SELECT
+    lot_id, product_id, lot_number, produced_qty, remaining_qty,
+    production_date, expiry_date, status
+  FROM cm_lot_remaining_calc
+  WHERE product_id = ANY(p_product_ids)
+  ON CONFLICT (lot_id) DO UPDATE SET
+    product_id = EXCLUDED.product_id,
+    lot_number = EXCLUDED.lot_number,
+    produced_qty = EXCLUDED.produced_qty,
+    remaining_qty = EXCLUDED.remaining_qty,
+    production_date = EXCLUDED.production_date,
+    expiry_date = EXCLUDED.expiry_date,
+    status = EXCLUDED.status,
+    refreshed_at = NOW();
+
+  GET DIAGNOSTICS v_count = ROW_COUNT;
+
+  -- 없어진 LOT (삭제됐거나 다른 품목으로 옮겨진 LOT)
+  DELETE FROM cm_lot_remaining r
+  WHERE r.product_id = ANY(p_product_ids)
+    AND NOT EXISTS (
+      SELECT 1 FROM cm_lot_remaining_calc c
+      WHERE c.product_id = r.product_id AND c.lot_id = r.lot_id
+    );
+
+  RETURN v_count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 2. 트리거 함수
+-- INSERT/DELETE: 추가/삭제된 행의 품목
+CREATE OR REPLACE FUNCTION cm_lot_remaining_on_insert()
+RETURNS TRIGGER AS $$
+BEGIN
+  PERFORM cm_refresh_lot_remaining(ARRAY(SELECT DISTINCT product_id FROM new_rows));
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION cm_lot_remaining_on_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+  PERFORM cm_refresh_lot_remaining(ARRAY(SELECT DISTINCT product_id FROM old_rows));
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ERP 재고 UPDATE: bal_qty가 바뀐 품목만
+CREATE OR REPLACE FUNCTION cm_lot_remaining_on_stock_update()
+RETURNS TRIGGER AS $$
+BEGIN
+  PERFORM cm_refresh_lot_remaining(ARRAY(
+    SELECT n.product_id
+    FROM new_rows n
+    LEFT JOIN old_rows o ON o.product_id = n.product_id
+    WHERE o.product_id IS NULL OR o.bal_qty IS DISTINCT FROM n.bal_qty
+    UNION
+    SELECT o.product_id
+    FROM old_rows o
+    LEFT JOIN new_rows n ON n.product_id = o.product_id
+    WHERE n.product_id IS NULL
+  ));
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 3. ERP 재고 트리거
+DROP TRIGGER IF EXISTS tr_cm_erp_products_lot_remaining_upd ON cm_erp_products;
+CREATE TRIGGER tr_cm_erp_products_lot_remaining_upd
+AFTER UPDATE ON cm_erp_products
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION cm_lot_remaining_on_stock_update();
+
+DROP TRIGGER IF EXISTS tr_cm_erp_products_lot_remaining_ins ON cm_erp_products;
+CREATE TRIGGER tr_cm_erp_products_lot_remaining_ins
+AFTER INSERT ON cm_erp_products
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION cm_lot_remaining_on_insert();
+
+DROP TRIGGER IF EXISTS tr_cm_erp_products_lot_remaining_del ON cm_erp_products;
+CREATE TRIGGER tr_cm_erp_products_lot_remaining_del
+AFTER DELETE ON cm_erp_products
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION cm_lot_remaining_on_delete();
+
+-- LOT UPDATE: 변경 전/후 품목 모두
+CREATE OR REPLACE FUNCTION cm_lot_remaining_on_lots_update()
+RETURNS TRIGGER AS $$
+BEGIN
+  PERFORM cm_refresh_lot_remaining(ARRAY(
+    SELECT product_id FROM new_rows
+    UNION
+    SELECT product_id FROM old_rows
+  ));
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 4. LOT 트리거
+DROP TRIGGER IF EXISTS tr_cm_production_lots_remaining_upd ON cm_production_lots;
+CREATE TRIGGER tr_cm_production_lots_remaining_upd
+AFTER UPDATE ON cm_production_lots
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION cm_lot_remaining_on_lots_update();
+
+DROP TRIGGER IF EXISTS tr_cm_production_lots_remaining_ins ON cm_production_lots;
+CREATE TRIGGER tr_cm_production_lots_remaining_ins
+AFTER INSERT ON cm_production_lots
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION cm_lot_remaining_on_insert();
+
+DROP TRIGGER IF EXISTS tr_cm_production_lots_remaining_del ON cm_production_lots;
+CREATE TRIGGER tr_cm_production_lots_remaining_del
+AFTER DELETE ON cm_production_lots
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION cm_lot_remaining_on_delete();
+
+-- 스냅샷을 현재 상태로 맞춤
+SELECT cm_refresh_lot_remaining();
@@ -0,0 +1,94 @@
+-- =============================================
+-- 발주 합계 문장 단위 갱신
+-- =============================================
+-- tr_ru_order_items_totals(행 단위)는 아이템 1행마다 해당 발주의 SUM 2개를 다시 계산함
+-- → COPY/대량 INSERT 시 같은 발주를 수천 번 재집계.
+-- 문장 단위 트리거 + transition table로 바뀐 order_id만 모아 한 번에 재계산.
+
+-- 1. 지정 발주만 재계산 (NULL이면 전체)
+CREATE OR REPLACE FUNCTION ru_refresh_order_totals(p_order_ids TEXT[] DEFAULT NULL)
+RETURNS INTEGER AS $$
+DECLARE
+  v_count INTEGER;
+BEGIN
+  IF p_order_ids IS NOT NULL AND cardinality(p_order_ids) = 0 THEN
+    RETURN 0;
+  END IF;
+
+  UPDATE ru_orders o SET
+    total_qty = COALESCE(t.total_qty, 0),
+    total_amount = COALESCE(t.total_amount, 0)
+  FROM ru_orders target
+  LEFT JOIN (
+    SELECT
+      order_id,
+      SUM(COALESCE(confirmed_qty, requested_qty)) AS total_qty,
+      SUM(subtotal) AS total_amount
+    FROM ru_order_items
+    WHERE p_order_ids IS NULL OR order_id = ANY(p_order_ids)
+    GROUP BY order_id
+  ) t ON t.order_id = target.id
+  WHERE o.id = target.id
+    AND (p_order_ids IS NULL OR target.id = ANY(p_order_ids))
+    AND (o.total_qty IS DISTINCT FROM COALESCE(t.total_qty, 0)
+         OR o.total_amount IS DISTINCT FROM COALESCE(t.total_amount, 0));
+
+  GET DIAGNOSTICS v_count = ROW_COUNT;
+  RETURN v_count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 2. 트리거 함수
+CREATE OR REPLACE FUNCTION ru_order_totals_on_insert()
+RETURNS TRIGGER AS $$
+BEGIN
+  PERFORM ru_refresh_order_totals(ARRAY(SELECT DISTINCT order_id::TEXT FROM new_rows));
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION ru_order_totals_on_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+  PERFORM ru_refresh_order_totals(ARRAY(SELECT DISTINCT order_id::TEXT FROM old_rows));
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- UPDATE: 변경 전/후 발주 모두 (order_id 변경 포함)
+CREATE OR REPLACE FUNCTION ru_order_totals_on_update()
+RETURNS TRIGGER AS $$
+BEGIN
+  PERFORM ru_refresh_order_totals(ARRAY(
+    SELECT order_id::TEXT FROM new_rows
+    UNION
+    SELECT order_id::TEXT FROM old_rows
+  ));
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 3. 행 단위 트리거 → 문장 단위 트리거
+-- (transition table은 이벤트 1개인 트리거에만 지정 가능 → 이벤트별로 분리)
+DROP TRIGGER IF EXISTS tr_ru_order_items_totals ON ru_order_items;
+
+DROP TRIGGER IF EXISTS tr_ru_order_items_totals_ins ON ru_order_items;
+CREATE TRIGGER tr_ru_order_items_totals_ins
+AFTER INSERT ON ru_order_items
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION ru_order_totals_on_insert();
+
+DROP TRIGGER IF EXISTS tr_ru_order_items_totals_upd ON ru_order_items;
+CREATE TRIGGER tr_ru_order_items_totals_upd
+AFTER UPDATE ON ru_order_items
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION ru_order_totals_on_update();
+
+DROP TRIGGER IF EXISTS tr_ru_order_items_totals_del ON ru_order_items;
+CREATE TRIGGER tr_ru_order_items_totals_del
+AFTER DELETE ON ru_order_items
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION ru_order_totals_on_delete();
+
+-- 합계를 현재 아이템 기준으로 맞춤
+SELECT ru_refresh_order_totals();